@@ -0,0 +1,5 @@
+from aweber_tools.cli import main
+
+import sys
+
+sys.exit(main())
@@ -2,21 +2,37 @@
 
 from abc import ABCMeta, abstractmethod
 
+from aweber_tools.client import ClientException
 from aweber_tools.include.msg import *
 
+from aweber_tools.models.bulk_delete import \
+    BulkDelete, BulkDeleteException, DeleteJournal
+
+from aweber_tools.models.filters.planner import QueryPlanner
+
 from aweber_tools.models.filters.subscribers import \
     FilterAddedBeforeDaysAgo, FilterException, FilterNoOpensSinceDaysAgo
 
+from aweber_tools.models.store import \
+    SubscriberStore, SubscriberStoreException, SubscribersStored
+
 from aweber_tools.models.subscribers import \
-    SubscribersAll, SubscriberException, SubscribersException, \
-    SubscribersSubscribed
+    FindAll, FindSubscribed, Subscribers, SubscribersException
 
-from aweber_tools.utils.export_csv import ExportCsv, ExportCsvException
+from aweber_tools.utils.export import ExportException, STDOUT_FILENAME
+from aweber_tools.utils.export_formats import create_exporter
+from aweber_tools.utils.profiler import Profiler, ProfilerException
+from aweber_tools.utils.py_compat import input
 
-from future.builtins.misc import input
+from datetime import datetime
+import glob
 import os
 import sys
 
+JOURNAL_DATE_FORMAT = 'delete_%Y-%m-%d_%H.%M.%S'
+JOURNAL_EXTENSION = '.journal'
+PROFILE_DATE_FORMAT = '%Y-%m-%d_%H.%M.%S'
+PROFILE_PREFIX = 'profile_'
 TIMEDELTA_30_DAYS_AGO = 30
 
 class ActionException(Exception):
@@ -45,7 +61,15 @@ class Action(object):
 
 class ActionSubscriberBase(object):
 
-    """Base subscriber-related action class."""
+    """
+    Base subscriber-related action class.
+
+    Non-interactive actions don't prompt: every confirmation gets its
+    default answer.
+
+    With a local subscriber store configured, 'full_sync' downloads it in
+    full before the action runs instead of only syncing changes.
+    """
 
     @property
     def client(self):
@@ -55,11 +79,36 @@ class ActionSubscriberBase(object):
     def client(self, client):
         self._client = client
 
+    @property
+    def full_sync(self):
+        return self._full_sync
+
+    @full_sync.setter
+    def full_sync(self, full_sync):
+        self._full_sync = full_sync
+
+    @property
+    def interactive(self):
+        return self._interactive
+
+    @interactive.setter
+    def interactive(self, interactive):
+        self._interactive = interactive
+
     def __init__(self, client=None):
         self._client = client
+        self._full_sync = False
+        self._interactive = True
         self._save_path = None
+        self._store = None
+
+    def _ask_confirmation(self, default=False):
+
+        # Asks a yes or no question, returns 'default' without asking if
+        # the action isn't interactive.
 
-    def _ask_confirmation(self):
+        if (not self._interactive):
+            return default
 
         key = ''
         keys = [INPUT_YES, INPUT_NO]
@@ -77,6 +126,12 @@ class ActionSubscriberBase(object):
 
         return False
 
+    def _close_store(self):
+
+        if (self._store is not None):
+            self._store.close()
+            self._store = None
+
     def _create_directory(self, directory):
 
         try:
@@ -85,19 +140,124 @@ class ActionSubscriberBase(object):
         except:
             raise ActionException(ERROR_DIR_CREATE.format(directory))
 
-    def _export_csv(self, subscribers, save_path):
+    def _dump_metrics(self):
+
+        # Writes the client metrics if a metrics file is configured.
+
+        metrics_file = self.client.config.metrics_file
+
+        if (not metrics_file):
+            return
+
+        filename = os.path.join(self._save_path, metrics_file)
+
+        try:
+            self.client.dump_stats(filename)
+        except ClientException as e:
+            raise ActionException(SPACE12 + ERROR_CAPTION + str(e))
+
+        print(SPACE12 + MSG_METRICS_SAVED.format(filename))
+
+    def _export(self, subscribers, filename=None):
+
+        # 'subscribers' may be a generator over API pages, the exporter
+        # writes rows while they are being downloaded. Progress isn't
+        # printed over an export to the standard output.
 
-        input('\n' + SPACE8 + MSG_CSV_DOWNLOAD)
         print('\n' + SPACE8 + MSG_EXPORT)
 
-        exporter = ExportCsv()
+        on_progress = self._print_export_progress
+        if (filename == STDOUT_FILENAME):
+            on_progress = None
+
+        try:
+            exporter = create_exporter(
+                self.client.config.export_format, on_progress)
+            rows, rate = exporter.export(
+                subscribers, self._save_path, filename)
+        except ExportException as e:
+            raise ActionException(SPACE12 + ERROR_CAPTION + str(e))
+
+        print(SPACE12 + MSG_DONE + ' ' + MSG_EXPORTED.format(rows, rate))
+
+    def _open_store(self):
+
+        # Opens and syncs the local subscriber store if one is configured.
+        # Must be called after _set_save_path().
+
+        store_file = self.client.config.store_file
+
+        if (not store_file):
+            return
+
+        filename = os.path.join(self._save_path, store_file)
+        print('\n' + SPACE8 + MSG_STORE_SYNC.format(filename))
 
         try:
-            exporter.export(subscribers, save_path)
-        except ExportCsvException as e:
+            self._store = SubscriberStore(filename)
+            count = self._store.sync(
+                self.client, self._full_sync,
+                self.client.config.full_sync_days)
+        except SubscriberStoreException as e:
+            self._close_store()
             raise ActionException(SPACE12 + ERROR_CAPTION + str(e))
 
-        print(SPACE12 + MSG_DONE)
+        print(SPACE12 + MSG_DONE + ' ' + MSG_STORE_SYNCED.format(count))
+
+    def _print_export_progress(self, rows, rate):
+
+        print(SPACE12 + MSG_EXPORT_PROGRESS.format(rows, rate))
+
+    def _profile(self, func):
+
+        # Calls 'func' under the configured profiler, if any. The profile
+        # is saved in the save path, also when 'func' raises, and its
+        # summary printed.
+
+        config = self.client.config
+
+        if (not config.profiler):
+            func()
+            return
+
+        try:
+            profiler = Profiler(
+                config.profiler, config.profile_interval, config.profile_top)
+        except ProfilerException as e:
+            raise ActionException(SPACE8 + ERROR_CAPTION + str(e))
+
+        filename = os.path.join(
+            self._save_path, PROFILE_PREFIX + type(self).__name__ + '_'
+            + datetime.now().strftime(PROFILE_DATE_FORMAT))
+
+        try:
+            saved = profiler.run(filename, func)
+        except ProfilerException as e:
+            raise ActionException(SPACE12 + ERROR_CAPTION + str(e))
+
+        print('\n' + SPACE8 + MSG_PROFILE_SAVED.format(', '.join(saved)))
+        for line in profiler.format_summary().split('\n'):
+            print(SPACE12 + line)
+
+    def _run(self, func):
+
+        # Calls 'func' with the local store open, under the profiler if one
+        # is configured, then writes the metrics. Must be called after
+        # _set_save_path().
+
+        try:
+            self._profile(lambda: self._run_stored(func))
+        finally:
+            self._dump_metrics()
+
+    def _run_stored(self, func):
+
+        self._open_store()
+
+        try:
+            func()
+        finally:
+            self._close_store()
 
     def _set_save_path(self):
 
@@ -122,18 +282,117 @@ class ActionSubscriberBase(object):
             path_print = self._save_path.encode('ascii', 'xmlcharrefreplace')
             print(tab + MSG_PATH_CSV.format(path_print))
 
+    def _subscribers(self, find_params):
+
+        # Subscribers come from the local store when it is open, from the
+        # API otherwise.
+
+        if (self._store is not None):
+            return SubscribersStored(self.client, self._store, find_params)
+
+        return Subscribers(self.client, find_params)
+
 class DeleteInactive(ActionSubscriberBase):
 
     """
-    Deletes subscribers who haven't opened any emails since 30 days ago and
-    subscribed before 30 days ago.
+    Deletes subscribers who haven't opened any emails since 'opens_days_ago'
+    days ago and subscribed before 'added_days_ago' days ago, 30 by default.
+
+    Deletions are recorded in a journal in the backup directory. If a
+    previous run was interrupted, the remaining deletions from its journal
+    are offered before a new selection is made.
+
+    The subscription date filter is pushed down to the API's query, so
+    only subscribers old enough are fetched. With 'explain' set, the
+    planned query and what it saves are printed instead: counting the
+    planned and the unfiltered query takes 4 API requests, and nothing is
+    fetched, exported or deleted.
+
+    When not interactive, the selection is always exported, and deleted, or
+    an interrupted deletion resumed, only if 'confirm_delete' is set.
+    'deleted_count' and 'failed_count' hold the last run's outcome.
     """
 
+    @property
+    def added_days_ago(self):
+        return self._added_days_ago
+
+    @added_days_ago.setter
+    def added_days_ago(self, added_days_ago):
+        self._added_days_ago = added_days_ago
+
+    @property
+    def confirm_delete(self):
+        return self._confirm_delete
+
+    @confirm_delete.setter
+    def confirm_delete(self, confirm_delete):
+        self._confirm_delete = confirm_delete
+
+    @property
+    def deleted_count(self):
+        return self._deleted_count
+
+    @property
+    def explain(self):
+        return self._explain
+
+    @explain.setter
+    def explain(self, explain):
+        self._explain = explain
+
+    @property
+    def failed_count(self):
+        return self._failed_count
+
+    @property
+    def opens_days_ago(self):
+        return self._opens_days_ago
+
+    @opens_days_ago.setter
+    def opens_days_ago(self, opens_days_ago):
+        self._opens_days_ago = opens_days_ago
+
+    def __init__(self, client=None):
+
+        super(DeleteInactive, self).__init__(client)
+
+        self._added_days_ago = TIMEDELTA_30_DAYS_AGO
+        self._opens_days_ago = TIMEDELTA_30_DAYS_AGO
+        self._confirm_delete = False
+        self._explain = False
+        self._deleted_count = 0
+        self._failed_count = 0
+
     def execute(self):
 
         """Implements Action.execute."""
 
+        self._deleted_count = 0
+        self._failed_count = 0
+
         self._set_save_path()
+        self._run(self._execute)
+
+    def key(self):
+
+        """Implements Action.key."""
+
+        return 2
+
+    def name(self):
+
+        """Implements Action.name."""
+
+        return ACTION_TITLE_DELETE_INACTIVE
+
+    def _execute(self):
+
+        if (self._explain):
+            self._explain_plan()
+            return
+
+        self._resume_deletion()
 
         subscribers = self._get_subscribers()
         entries_count = len(subscribers)
@@ -144,44 +403,124 @@ class DeleteInactive(ActionSubscriberBase):
 
         print ('\n' + SPACE8 + MSG_SUBSCRIBERS_COUNT.format(entries_count))
 
-        if (not self._ask_confirmation()):
+        if (not self._ask_confirmation(True)):
             print('')
             return
 
-        self._export_csv(subscribers, self._save_path)
+        self._export(subscribers)
 
-        if (not self._ask_confirmation()):
+        if (not self._ask_confirmation(self._confirm_delete)):
             print('')
             return
 
-        self._delete_subscribers(subscribers)
+        filename = os.path.join(
+            self._save_path,
+            datetime.now().strftime(JOURNAL_DATE_FORMAT) + JOURNAL_EXTENSION)
 
-    def key(self):
+        self._delete_subscribers(filename, subscribers)
 
-        """Implements Action.key."""
+    def _delete_subscribers(self, filename, subscribers=None):
 
-        return 2
+        # Deletes 'subscribers' recording them in the journal 'filename', or
+        # resumes the journal's pending deletions if 'subscribers' is None.
 
-    def name(self):
+        print('\n' + SPACE8 + MSG_DELETE)
 
-        """Implements Action.name."""
+        on_deleted = None
+        if (self._store is not None):
+            on_deleted = self._store.remove
 
-        return ACTION_TITLE_DELETE_INACTIVE
+        journal = None
+        try:
+            journal = DeleteJournal(filename)
+            bulk_delete = BulkDelete(
+                self.client, journal, self.client.config.delete_workers,
+                on_deleted=on_deleted)
+            if (subscribers is None):
+                deleted_count, failed_count = bulk_delete.resume()
+            else:
+                deleted_count, failed_count = bulk_delete.run(subscribers)
+        except (BulkDeleteException, SubscriberStoreException) as e:
+            raise ActionException(SPACE12 + ERROR_CAPTION + str(e))
+        finally:
+            if (journal is not None):
+                journal.close()
 
-    def _delete_subscribers(self, subscribers):
+        # A resumed deletion and the new one add up.
+        self._deleted_count += deleted_count
+        self._failed_count += failed_count
 
-        print('\n' + SPACE8 + MSG_DELETE)
+        print(SPACE12 + MSG_DONE + ' ' \
+              + MSG_DELETED_ENTRIES.format(deleted_count) + '\n')
+
+        if (failed_count > 0):
+            print(SPACE12 + MSG_DELETE_FAILED.format(failed_count, filename)
+                  + '\n')
+
+    def _find_unfinished_journal(self):
 
-        deleted_count = 0;
-        for subscriber in subscribers:
+        pattern = os.path.join(self._save_path, '*' + JOURNAL_EXTENSION)
+
+        for filename in sorted(glob.glob(pattern)):
+            journal = None
             try:
-                subscriber.delete()
-            except SubscriberException:
+                journal = DeleteJournal(filename)
+                pending_count = len(journal.pending)
+                # Finishes journals left without END by earlier versions,
+                # whose failed deletions were still pending.
+                if (pending_count == 0):
+                    journal.end()
+            except BulkDeleteException as e:
                 raise ActionException(SPACE12 + ERROR_CAPTION + str(e))
-            deleted_count += 1
+            finally:
+                if (journal is not None):
+                    journal.close()
 
-        print(SPACE12 + MSG_DONE + ' ' \
-              + MSG_DELETED_ENTRIES.format(deleted_count) + '\n')
+            if (pending_count > 0):
+                return filename, pending_count
+
+        return None, 0
+
+    def _resume_deletion(self):
+
+        # Offers to finish an interrupted deletion, before a new selection
+        # is made. Returns True if it was resumed.
+
+        filename, pending_count = self._find_unfinished_journal()
+
+        if (filename is None):
+            return False
+
+        print('\n' + SPACE8
+              + MSG_DELETE_UNFINISHED.format(filename, pending_count))
+
+        if (not self._ask_confirmation(self._confirm_delete)):
+            return False
+
+        self._delete_subscribers(filename)
+
+        return True
+
+    def _explain_plan(self):
+
+        # Prints the planned query and what it saves, counting both queries
+        # instead of fetching subscribers.
+
+        plan = self._plan()
+
+        print('\n' + SPACE8 + MSG_QUERY_PLAN.format(
+            plan.find_params.params(),
+            ', '.join(type(subscribers_filter).__name__
+                      for subscribers_filter in plan.local.filters)))
+
+        try:
+            savings = plan.savings(self._subscribers)
+        except SubscribersException as e:
+            raise ActionException(SPACE12 + ERROR_CAPTION + str(e))
+
+        print(SPACE12 + MSG_PUSH_DOWN.format(
+            savings['records'], savings['requests'],
+            savings['records_saved'], savings['requests_saved']) + '\n')
 
     def _get_subscribers(self):
 
@@ -189,35 +528,52 @@ class DeleteInactive(ActionSubscriberBase):
 
         subscribers = None
 
+        plan = self._plan()
+
         try:
-            subscribers = SubscribersSubscribed(self.client).get()
+            subscribers = self._subscribers(plan.find_params).iter()
         except SubscribersException as e:
             raise ActionException(SPACE12 + ERROR_CAPTION + str(e))
 
+        # The local filters consume the subscriber stream, so page fetching
+        # errors surface here as well.
         try:
-            date_filter = FilterAddedBeforeDaysAgo()
-            subscribers_filtered_date = \
-                date_filter.filter(subscribers, TIMEDELTA_30_DAYS_AGO)
-
-            opens_filter = FilterNoOpensSinceDaysAgo()
-            subscribers_filtered_opens = opens_filter.filter(
-                subscribers_filtered_date, TIMEDELTA_30_DAYS_AGO)
-        except FilterException as e:
+            subscribers_filtered_opens = plan.filter(subscribers)
+        except (FilterException, SubscribersException) as e:
             raise ActionException(SPACE12 + ERROR_CAPTION + str(e))
 
+        cache = self.client.activity_cache
+        if (cache is not None):
+            print(SPACE12
+                  + MSG_ACTIVITY_CACHE.format(cache.hits, cache.misses))
+
         return subscribers_filtered_opens
 
+    def _plan(self):
+
+        workers = self.client.config.activity_workers
+
+        return QueryPlanner(workers).plan(
+            [FilterAddedBeforeDaysAgo(self._added_days_ago),
+             FilterNoOpensSinceDaysAgo(workers, self._opens_days_ago)],
+            FindSubscribed())
+
 class DownloadAll(ActionSubscriberBase):
 
-    """Downloads all subscribers' data as CSV."""
+    """
+    Downloads all subscribers' data in the configured export format.
+
+    Subscribers are streamed from the API straight into the exporter, so
+    only one page of entries is held in memory.
+    """
 
     def execute(self):
 
         """Implements Action.execute."""
 
         self._set_save_path()
-        subscribers = self._get_subscribers()
-        self._export_csv(subscribers, self._save_path)
+        self._run(self._download)
+
         print('')
 
     def key(self):
@@ -232,6 +588,11 @@ class DownloadAll(ActionSubscriberBase):
 
         return ACTION_TITLE_DOWNLOAD_ALL
 
+    def _download(self):
+
+        subscribers = self._get_subscribers()
+        self._export(subscribers, self.client.config.export_file)
+
     def _get_subscribers(self):
 
         print('\n' + SPACE8 + MSG_SUBSCRIBERS_GET)
@@ -239,7 +600,7 @@ class DownloadAll(ActionSubscriberBase):
         subscribers = None
 
         try:
-            subscribers = SubscribersAll(self.client).get()
+            subscribers = self._subscribers(FindAll()).iter()
         except SubscribersException as e:
             raise ActionException(SPACE12 + ERROR_CAPTION + str(e))
 
@@ -1,19 +1,20 @@
 #!/usr/bin/env python
 
-from aweber_tools.actions import \
-    ActionException, DeleteInactive, DownloadAll, Terminate
-
-from aweber_tools.client import \
-    Client, ClientAuthException, ClientAuthPageException, ClientException
-
 from aweber_tools.include.logo import APP_LOGO
 from aweber_tools.include.msg import *
 
-from future.builtins.misc import input
+from aweber_tools.utils.config import Config, ConfigException
+from aweber_tools.utils.lazy_import import LazyModule
+from aweber_tools.utils.py_compat import input
 
 import getpass
 import sys
 
+# Imported when the app is created, so that importing the package, e.g. for
+# the headless runner, doesn't load the actions and the API client.
+_actions = LazyModule('aweber_tools.actions')
+_client = LazyModule('aweber_tools.client')
+
 APP_AUTHORIZE_RETRIES = 2
 
 class AppException(Exception):
@@ -25,17 +26,21 @@ class App(object):
     AWeber tools app controller class.
 
     Constructor args:
-        filename: string; file with configuration params.
+        filename: string; file with configuration params;
+        profiler: string; profiler to run actions under, overrides the
+                  config's [profile] profiler, see
+                  aweber_tools.utils.profiler.PROFILERS.
     """
 
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, profiler=None):
 
         self._client = None
         self._filename = filename
+        self._profiler = profiler
 
-        action_delete = DeleteInactive()
-        action_download = DownloadAll()
-        action_terminate = Terminate()
+        action_delete = _actions.DeleteInactive()
+        action_download = _actions.DownloadAll()
+        action_terminate = _actions.Terminate()
 
         self._action_titles = \
             {action_download.key(): action_download.name(),
@@ -97,13 +102,13 @@ class App(object):
             # Try to get the verification code
             try:
                 parse_success = self._client.authorize_terminal(login, secret)
-            except ClientException as e: # Will have to auth manually
+            except _client.ClientException as e: # Will have to auth manually
                 manual_auth = True
                 break
-            except ClientAuthException as e: # Wrong creds?
+            except _client.ClientAuthException as e: # Wrong creds?
                 print('\n' + SPACE4 + str(e))
                 continue
-            except ClientAuthPageException: # Can't parse the response page
+            except _client.ClientAuthPageException: # Unparsable response page
                 print ('\n' + SPACE4 + MSG_AUTH_PAGE_PARSE)
                 manual_auth = True
                 break
@@ -120,7 +125,7 @@ class App(object):
             # Open the auth web page
             try:
                 browser_success = self._client.authorize_browser()
-            except ClientAuthException as e:
+            except _client.ClientAuthException as e:
                 raise AppException(SPACE4 + ERROR_CAPTION + str(e))
 
             # Ask the user to input the verification code he got from the
@@ -140,7 +145,7 @@ class App(object):
 
                     try:
                         manual_success = self._client.verify_code(code)
-                    except ClientException as e:
+                    except _client.ClientException as e:
                         print('\n' + SPACE12 + ERROR_CODE)
 
                     if (manual_success):
@@ -164,7 +169,7 @@ class App(object):
 
         try:
             self._client.connect()
-        except ClientException as e:
+        except _client.ClientException as e:
             raise AppException(SPACE4 + ERROR_CAPTION + str(e))
 
         print(SPACE4 + MSG_ACCOUNT_CONNECTED + '\n')
@@ -199,7 +204,7 @@ class App(object):
 
         try:
             action.execute()
-        except ActionException as e:
+        except _actions.ActionException as e:
             raise AppException(str(e))
 
     def _set_client(self):
@@ -208,8 +213,16 @@ class App(object):
             print(MSG_CONFIG_FILE.format(self._filename))
 
         try:
-            self._client = Client(filename=self._filename)
-        except ClientException as e:
+            config = Config(filename=self._filename)
+        except ConfigException as e:
+            raise AppException(SPACE4 + ERROR_CAPTION + str(e))
+
+        if (self._profiler):
+            config.profiler = self._profiler
+
+        try:
+            self._client = _client.Client(config)
+        except _client.ClientException as e:
             raise AppException(SPACE4 + ERROR_CAPTION + str(e))
 
     def _setup_actions(self):
@@ -222,5 +235,5 @@ class App(object):
 
         try:
             self._client.save_tokens(filename=self._filename)
-        except ClientException as e:
+        except _client.ClientException as e:
             print('\n' + str(e) + ' ' + MSG_CONFIG_KEYS_NOT_SAVED)
\ No newline at end of file
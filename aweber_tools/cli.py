@@ -0,0 +1,451 @@
+#!/usr/bin/env python
+
+from aweber_tools.actions import ActionException, DeleteInactive, DownloadAll
+
+from aweber_tools.client import Client, ClientException
+
+from aweber_tools.include.msg import *
+
+from aweber_tools.utils.config import Config, ConfigException
+from aweber_tools.utils.export import STDOUT_FILENAME
+from aweber_tools.utils.export_formats import EXPORT_FORMATS
+from aweber_tools.utils.lazy_import import LazyModule
+from aweber_tools.utils.profiler import PROFILERS
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+# Only the multi-account runs start processes.
+_multiprocessing = LazyModule('multiprocessing')
+
+ACTION_DELETE_INACTIVE = 'delete-inactive'
+ACTION_DOWNLOAD = 'download'
+ACTIONS = (ACTION_DOWNLOAD, ACTION_DELETE_INACTIVE)
+
+DEFAULT_CONFIG = 'config.cfg'
+DEFAULT_DAYS_AGO = 30
+DEFAULT_PROCESSES = 8
+LOG_EXTENSION = '.log'
+# Bounded wait on the process pool, unbounded ones ignore Ctrl+C on
+# Python 2.
+POOL_TIMEOUT = 365 * 86400
+
+REPORT_HEADER = '{0:<32} {1:>6} {2:>9} {3:>9} {4:>11} {5:>8} {6:>9}'.format(
+    'config', 'status', 'seconds', 'requests', 'subscribers', 'deleted',
+    'throttled')
+REPORT_ROW = '{config:<32} {status:>6} {elapsed_seconds:>9.1f} ' \
+             '{requests:>9} {subscribers:>11} {deleted:>8} {throttled:>9}'
+
+EXIT_OK = 0
+EXIT_ERROR = 1 # The action failed
+EXIT_USAGE = 2 # Bad arguments, argparse's status
+EXIT_CONFIG = 3 # Unreadable or incomplete config
+EXIT_CONNECT = 4 # Not authorized or can't connect to AWeber
+EXIT_PARTIAL = 5 # Some deletions failed, see the journal
+EXIT_INTERRUPTED = 130
+
+# Command-line arguments overriding the config value of the same name.
+CONFIG_ARGUMENTS = ('backup_path', 'export_format', 'export_file', 'rate',
+                    'burst', 'page_workers', 'activity_workers',
+                    'delete_workers', 'http_pool_size', 'http_timeout',
+                    'metrics_file', 'profiler')
+
+class CliException(Exception):
+
+    """Carries the process exit status in 'status'."""
+
+    def __init__(self, message, status=EXIT_ERROR):
+        super(CliException, self).__init__(message)
+        self.status = status
+
+class Cli(object):
+
+    """
+    Headless application controller, e.g. for cron: runs one action with
+    the config file's settings, overridden by command-line arguments, and
+    never prompts. The account must have been authorized before, see App.
+
+    'delete-inactive' exports the selected subscribers; only with '--yes',
+    it resumes an interrupted deletion, then deletes the selection.
+
+    Messages go to the standard output, or to the standard error when
+    subscribers are exported to the standard output, or to a file in
+    '--log-dir'; errors go to the standard error.
+
+    Given several config files, the action runs for each account in a pool
+    of '--processes' processes, each with its own client and rate limiter,
+    and a report of all accounts is printed. Their messages only go to
+    '--log-dir', and a '--backup-path' gets a subdirectory per account. An
+    account's failure, whatever the error, is recorded in its report and
+    doesn't stop the others.
+
+    Constructor args:
+        argv: list of command-line arguments without the program name, None
+              for sys.argv's. Exits with EXIT_USAGE if they're invalid;
+        args: argparse.Namespace, parsed arguments used instead of 'argv',
+              with a single config file.
+    """
+
+    def __init__(self, argv=None, args=None):
+
+        if (args is None):
+            parser = self._create_parser()
+            args = parser.parse_args(argv)
+            args.configs = args.configs or [DEFAULT_CONFIG]
+            if (len(args.configs) > 1) \
+                    and (args.export_file == STDOUT_FILENAME):
+                parser.error(ERROR_MULTI_STDOUT)
+
+        self._args = args
+        self._client = None
+        self._error = None
+        self._status = None
+        self._elapsed = 0.0
+
+    def report(self):
+
+        """
+        Returns the outcome of a single account's run: a dictionary of
+        'config', 'status', 'error', 'elapsed_seconds' and the client's
+        'requests', 'subscribers', 'deleted' and 'throttled' totals.
+        'subscribers' are the ones read from the local subscriber store if
+        one is configured, from the API otherwise.
+        """
+
+        counters = {}
+        subscribers_counter = 'subscribers_total'
+        if (self._client is not None):
+            counters = self._client.metrics.stats()['counters']
+            if (self._client.config.store_file):
+                subscribers_counter = 'stored_subscribers_total'
+
+        requests = counters.get('requests_total', {})
+
+        return {
+            'config': self._args.configs[0],
+            'status': self._status,
+            'error': self._error,
+            'elapsed_seconds': self._elapsed,
+            'requests': sum(requests.values()),
+            'subscribers': counters.get(subscribers_counter, 0),
+            'deleted': counters.get('deleted_total', 0),
+            'throttled': counters.get('throttled_total', 0)
+        }
+
+    def run(self):
+
+        """
+        Runs the action.
+
+        Returns:
+            exit status, one of EXIT_*; the highest account status for
+            several accounts.
+        """
+
+        if (len(self._args.configs) > 1):
+            return self._run_accounts()
+
+        started = time.time()
+        stdout = sys.stdout
+
+        try:
+            self._set_client()
+
+            if (self._args.log_dir):
+                sys.stdout = self._open_log()
+            elif (self._args.quiet):
+                sys.stdout = open(os.devnull, 'w')
+            elif (self._client.config.export_file == STDOUT_FILENAME):
+                sys.stdout = sys.stderr
+
+            self._connect()
+
+            self._status = self._execute()
+        except CliException as e:
+            self._error = str(e).strip()
+            # Pool tasks' errors are printed with the accounts report.
+            if (not getattr(self._args, 'task', False)):
+                self._print_error(self._error)
+            self._status = e.status
+        except KeyboardInterrupt:
+            self._status = EXIT_INTERRUPTED
+        except Exception as e:
+            # A pool task reports any error in its account's report
+            # instead of failing the other accounts' run.
+            if (not getattr(self._args, 'task', False)):
+                raise
+            self._error = '{0}: {1}'.format(type(e).__name__, e)
+            self._status = EXIT_ERROR
+        finally:
+            if (sys.stdout is not stdout):
+                if (sys.stdout is not sys.stderr):
+                    sys.stdout.close()
+                sys.stdout = stdout
+            self._elapsed = time.time() - started
+
+        return self._status
+
+    def _connect(self):
+
+        config = self._client.config
+
+        if (not config.access_token) or (not config.access_secret):
+            raise CliException(ERROR_NO_ACCESS_TOKEN, EXIT_CONNECT)
+
+        print(MSG_CONNECTING)
+
+        try:
+            self._client.connect()
+        except ClientException as e:
+            raise CliException(str(e), EXIT_CONNECT)
+
+        print(SPACE4 + MSG_ACCOUNT_CONNECTED)
+
+    def _create_parser(self):
+
+        parser = argparse.ArgumentParser(
+            prog='aweber-tools',
+            description='Runs an AWeber tools action without prompts.')
+
+        parser.add_argument('action', choices=ACTIONS)
+        parser.add_argument('-c', '--config', dest='configs',
+                            action='append',
+                            help='config file, repeat for several accounts, '
+                                 'default: ' + DEFAULT_CONFIG)
+        parser.add_argument('-f', '--format', dest='export_format',
+                            choices=EXPORT_FORMATS,
+                            help='export format, default: [files] '
+                                 'export_format')
+        parser.add_argument('-o', '--output', dest='export_file',
+                            help="exported file name, '-' for the standard "
+                                 'output, default: [files] export_file')
+        parser.add_argument('--backup-path',
+                            help='directory of the files written, default: '
+                                 '[files] backup_path')
+        parser.add_argument('--added-days', type=int,
+                            default=DEFAULT_DAYS_AGO,
+                            help='delete-inactive: select subscribers added '
+                                 'before this many days ago, default: '
+                                 '%(default)s')
+        parser.add_argument('--opens-days', type=int,
+                            default=DEFAULT_DAYS_AGO,
+                            help='delete-inactive: select subscribers '
+                                 "without opens since this many days ago, "
+                                 'default: %(default)s')
+        parser.add_argument('--explain', action='store_true',
+                            help='delete-inactive: only print the planned '
+                                 'query and the subscribers and requests it '
+                                 'saves, counting both queries in 4 API '
+                                 'requests')
+        parser.add_argument('-y', '--yes', action='store_true',
+                            help='delete-inactive: delete the selected '
+                                 'subscribers and resume interrupted '
+                                 'deletions')
+        parser.add_argument('--full-sync', action='store_true',
+                            help='download the local subscriber store in '
+                                 'full instead of only syncing changes')
+        parser.add_argument('--rate', type=float,
+                            help='API requests per second')
+        parser.add_argument('--burst', type=int,
+                            help='API requests sent back to back')
+        parser.add_argument('--page-workers', type=int,
+                            help='concurrent subscriber page requests')
+        parser.add_argument('--activity-workers', type=int,
+                            help='concurrent subscriber activity requests')
+        parser.add_argument('--delete-workers', type=int,
+                            help='concurrent subscriber deletions')
+        parser.add_argument('--http-pool-size', type=int,
+                            help='kept-alive HTTP connections per host')
+        parser.add_argument('--http-timeout', type=float,
+                            help='seconds to wait for an HTTP connection or '
+                                 'response')
+        parser.add_argument('--metrics-file',
+                            help='client metrics file, default: [files] '
+                                 'metrics_file')
+        parser.add_argument('--profile', dest='profiler', choices=PROFILERS,
+                            help='profile the action, default: [profile] '
+                                 'profiler')
+        parser.add_argument('-q', '--quiet', action='store_true',
+                            help='print errors only')
+        parser.add_argument('--log-dir',
+                            help='write messages to a file per config file '
+                                 'in this directory')
+        parser.add_argument('--processes', type=int,
+                            help='accounts run at a time, default: '
+                                 'config files, at most {0}'.format(
+                                     DEFAULT_PROCESSES))
+        parser.add_argument('--report',
+                            help='write the accounts report to this JSON '
+                                 'file')
+
+        return parser
+
+    def _create_action(self):
+
+        if (self._args.action == ACTION_DOWNLOAD):
+            action = DownloadAll(self._client)
+        else:
+            action = DeleteInactive(self._client)
+            action.added_days_ago = self._args.added_days
+            action.opens_days_ago = self._args.opens_days
+            action.confirm_delete = self._args.yes
+            action.explain = self._args.explain
+
+        action.full_sync = self._args.full_sync
+        action.interactive = False
+
+        return action
+
+    def _execute(self):
+
+        action = self._create_action()
+
+        try:
+            action.execute()
+        except ActionException as e:
+            raise CliException(str(e))
+
+        if (getattr(action, 'failed_count', 0) > 0):
+            return EXIT_PARTIAL
+
+        return EXIT_OK
+
+    def _open_log(self):
+
+        # Opens the message log of the account's config file, named after
+        # its path so that configs with the same base name don't collide.
+
+        name = os.path.splitdrive(os.path.abspath(self._args.configs[0]))[1]
+        name = name.strip(os.sep).replace(os.sep, '_')
+        filename = os.path.join(self._args.log_dir, name + LOG_EXTENSION)
+
+        try:
+            if (not os.path.exists(self._args.log_dir)):
+                os.makedirs(self._args.log_dir)
+            return open(filename, 'a')
+        except (IOError, OSError) as e:
+            raise CliException(str(e))
+
+    def _print_error(self, message):
+
+        message = message.strip()
+        if (not message.startswith(ERROR_CAPTION)):
+            message = ERROR_CAPTION + message
+
+        sys.stderr.write(message + '\n')
+
+    def _print_report(self, reports, elapsed):
+
+        print(REPORT_HEADER)
+        for report in reports:
+            print(REPORT_ROW.format(**report))
+
+        for report in reports:
+            if (report['error']):
+                self._print_error('{0}: {1}'.format(
+                    report['config'], report['error']))
+
+        succeeded = len([report for report in reports
+                         if report['status'] == EXIT_OK])
+        print(MSG_ACCOUNTS_DONE.format(succeeded, len(reports), elapsed))
+
+    def _run_accounts(self):
+
+        # Runs 'run_account' for every config file on a process pool, one
+        # account per task so that a slow account doesn't hold others.
+
+        configs = self._args.configs
+        tasks = []
+
+        for config in configs:
+            args = copy.copy(self._args)
+            args.configs = [config]
+            args.task = True
+            if (not self._args.log_dir):
+                args.quiet = True
+            if (self._args.backup_path):
+                args.backup_path = os.path.join(
+                    self._args.backup_path,
+                    os.path.splitext(os.path.basename(config))[0])
+            tasks.append(args)
+
+        processes = self._args.processes \
+            or min(len(configs), DEFAULT_PROCESSES)
+
+        started = time.time()
+        pool = _multiprocessing.Pool(max(processes, 1))
+
+        try:
+            reports = pool.map_async(run_account, tasks, 1).get(
+                POOL_TIMEOUT)
+            pool.close()
+        except KeyboardInterrupt:
+            pool.terminate()
+            return EXIT_INTERRUPTED
+        finally:
+            pool.join()
+
+        self._print_report(reports, time.time() - started)
+
+        if (self._args.report):
+            try:
+                with open(self._args.report, 'w') as fp:
+                    json.dump(reports, fp, indent=2, sort_keys=True)
+            except (IOError, OSError) as e:
+                self._print_error(str(e))
+                return EXIT_ERROR
+
+        return max(report['status'] for report in reports)
+
+    def _set_client(self):
+
+        # The config is loaded first so that arguments also apply to the
+        # values the client is built from, e.g. the rate limiter's.
+
+        try:
+            config = Config(filename=self._args.configs[0])
+        except ConfigException as e:
+            raise CliException(str(e), EXIT_CONFIG)
+
+        for name in CONFIG_ARGUMENTS:
+            value = getattr(self._args, name)
+            if (value is not None):
+                setattr(config, name, value)
+
+        if (not config.consumer_key):
+            raise CliException(ERROR_NO_CONSUMER_KEY, EXIT_CONFIG)
+
+        if (not config.consumer_secret):
+            raise CliException(ERROR_NO_CONSUMER_SECRET, EXIT_CONFIG)
+
+        try:
+            self._client = Client(config=config)
+        except ClientException as e:
+            raise CliException(str(e), EXIT_CONFIG)
+
+def run_account(args):
+
+    """
+    Process pool task: runs the action for one account.
+
+    Args:
+        args: argparse.Namespace, Cli arguments with a single config file.
+
+    Returns:
+        the account's report, see Cli.report.
+    """
+
+    cli = Cli(args=args)
+    cli.run()
+
+    return cli.report()
+
+def main(argv=None):
+
+    """Console script entry point, returns the exit status."""
+
+    return Cli(argv).run()
@@ -1,24 +1,52 @@
 #!/usr/bin/env python
 
-from aweber_api import AWeberAPI, APIException
-
-from aweber_tools.include.msg import ERROR_NO_AUTH_URL, EXCEPTION_API
-
-from aweber_tools.utils.auth_verifier import \
-    AuthErrorException, AuthException, AuthPageException, AuthVerifier
-
-from aweber_tools.utils.config import Config, ConfigException
-from aweber_tools.utils.datetime_utils import TimedeltaUtilities
-
-from datetime import datetime, timedelta
+from aweber_tools.include.msg import \
+    ERROR_DIR_CREATE, ERROR_NO_AUTH_URL, ERROR_NOT_CONNECTED, \
+    ERROR_THROTTLE_RETRIES, EXCEPTION_API
+
+from aweber_tools.utils.activity_cache import \
+    DEFAULT_SIZE, ActivityCache, ActivityCacheException
+
+from aweber_tools.utils.config import ConfigException
+from aweber_tools.utils.lazy_import import LazyModule
+from aweber_tools.utils.metrics import \
+    Metrics, MetricsAdapter, MetricsException
+from aweber_tools.utils.rate_controller import RateController
+from aweber_tools.utils.rate_limiter import \
+    DEFAULT_BURST, DEFAULT_RATE, RateLimiter, RateLimiterException
+from aweber_tools.utils.workers import imap_ordered
 
 import os
 import time
-import webbrowser
+
+# Imported on first use: the API library and its HTTP stack, the
+# authorization page parser and the browser launcher weigh on the start-up
+# of every run, e.g. a headless one that fails on its config.
+_aweber_api = LazyModule('aweber_api')
+_auth_verifier = LazyModule('aweber_tools.utils.auth_verifier')
+_cassette = LazyModule('aweber_tools.utils.cassette')
+_http_pool = LazyModule('aweber_tools.utils.http_pool')
+_webbrowser = LazyModule('webbrowser')
+
+API_EVENT_TYPE = 'type'
+API_PAGE_SIZE = 'ws.size'
+API_PAGE_START = 'ws.start'
+API_SUBSCRIBER_TYPE_LINK = 'https://api.aweber.com/1.0/#subscriber'
+# The API library's collection methods, e.g. 'findSubscribers', request the
+# collection's first page, then its total size.
+COLLECTION_REQUESTS = 2
+# Counters of items processed, reported per second by Client.stats().
+ITEM_COUNTERS = (
+    'activity_lookups_total',
+    'deleted_total',
+    'stored_subscribers_total',
+    'subscribers_total'
+)
 
 EXCEPTION_API_LIMIT_MSG = 'Rate limit exceeded'
 EXCEPTION_API_LIMIT_TYPE = 'ForbiddenError'
-SLEEP_THROTTLE = 1
+EXCEPTION_API_NOT_FOUND_TYPE = 'NotFoundError'
+PAGE_WORKERS = 1
 
 class ClientAuthException(Exception):
     pass
@@ -29,46 +57,148 @@ class ClientAuthPageException(Exception):
 class ClientException(Exception):
     pass
 
+class ClientNotFoundException(ClientException):
+
+    """The API doesn't know the requested entry, e.g. a deleted subscriber."""
+
 class ClientData(object):
 
     @property
     def auth_url(self):
         return self._api.authorize_url.replace('https://', '')
 
+    @property
+    def activity_cache(self):
+        return self._activity_cache
+
+    @property
+    def cassette(self):
+        return self._cassette
+
     @property
     def config(self):
         return self._config
 
+    @property
+    def http_pool(self):
+        return self._http_pool
+
+    @property
+    def metrics(self):
+        return self._metrics
+
+    @property
+    def page_workers(self):
+        return self._page_workers
+
+    @property
+    def rate_controller(self):
+        return self._rate_controller
+
+    @property
+    def rate_limiter(self):
+        return self._rate_limiter
+
 class Client(ClientData):
 
     """
     AWeber API wrapper.
 
+    Every API request, including collection page turns, takes a token from
+    the client's rate limiter first. Requests, the authorization page's
+    included, share the client's pool of kept-alive HTTP connections.
+
+    With more than one page worker, collection pages are requested by
+    offset from a thread pool ahead of the iteration and yielded in order.
+
     Constructor args:
-        aweber_tools.utils.config.Config constructor arguments.
+        config: aweber_tools.utils.config.Config, the settings; the
+                collaborators below are built from them if not set;
+        rate_limiter: aweber_tools.utils.rate_limiter.RateLimiter, built from
+                      the config's 'rate' and 'burst' values if not set;
+        activity_cache: aweber_tools.utils.activity_cache.ActivityCache,
+                        built from the config's 'activity_*' values if not
+                        set and 'activity_ttl' is;
+        rate_controller: aweber_tools.utils.rate_controller.RateController,
+                         adapting the rate limiter's rate to throttling,
+                         created with defaults if not set;
+        cassette: aweber_tools.utils.cassette.Cassette, recording or
+                  replaying API responses, built from the config's
+                  'cassette_*' values if not set and 'cassette_file' is.
+                  Replayed requests skip the rate limiter;
+        metrics: aweber_tools.utils.metrics.Metrics, created if not set;
+        http_pool: aweber_tools.utils.http_pool.HttpPool, built from the
+                   config's 'http_*' values if not set.
 
     Constructor raises:
-        ClientException.
+        ClientException, also for invalid config values.
     """
 
     def __init__(
-            self, access_token=None, access_secret=None, consumer_key=None,
-            consumer_secret=None, backup_path=None, filename=None):
+            self, config, rate_limiter=None, activity_cache=None,
+            rate_controller=None, cassette=None, metrics=None,
+            http_pool=None):
 
         self._account = None
         self._api = None
-        self._last_request_time = datetime.now() - timedelta(seconds=1)
-        self._timedelta_utils = TimedeltaUtilities()
 
         self._request_token = None
         self._token_secret = None
 
+        self._config = config
+
         try:
-            self._config = Config(access_token, access_secret, consumer_key,
-                                  consumer_secret, backup_path, filename)
+            self._config.validate()
         except ConfigException as e:
             raise ClientException(str(e))
 
+        self._page_workers = PAGE_WORKERS
+        if (self.config.page_workers is not None):
+            self._page_workers = self.config.page_workers
+
+        self._rate_limiter = rate_limiter
+
+        if (self._rate_limiter is None):
+            rate = DEFAULT_RATE
+            if (self.config.rate is not None):
+                rate = self.config.rate
+            burst = DEFAULT_BURST
+            if (self.config.burst is not None):
+                burst = self.config.burst
+            try:
+                self._rate_limiter = RateLimiter(rate, burst)
+            except RateLimiterException as e:
+                raise ClientException(str(e))
+
+        self._rate_controller = rate_controller
+
+        if (self._rate_controller is None):
+            self._rate_controller = RateController(self._rate_limiter)
+
+        self._activity_cache = activity_cache
+
+        if (self._activity_cache is None) \
+                and (self.config.activity_ttl is not None):
+            self._activity_cache = self._create_activity_cache()
+
+        self._metrics = metrics
+        if (self._metrics is None):
+            self._metrics = Metrics()
+
+        self._cassette = cassette
+
+        if (self._cassette is None) and (self.config.cassette_file):
+            self._cassette = self._create_cassette()
+
+        self._http_pool = http_pool
+
+        if (self._http_pool is None):
+            try:
+                self._http_pool = _http_pool.HttpPool(
+                    self.config.http_pool_size, self.config.http_timeout)
+            except _http_pool.HttpPoolException as e:
+                raise ClientException(str(e))
+
     def authorize_browser(self):
 
         """
@@ -83,12 +213,11 @@ class Client(ClientData):
 
         try:
             if (not self._api):
-                self._api = AWeberAPI(
-                    self.config.consumer_key, self.config.consumer_secret)
+                self._api = self._create_api()
                 self._request_wait()
                 (self._request_token, self._token_secret) = \
                     self._api.get_request_token('oob')
-        except APIException as e:
+        except _aweber_api.APIException as e:
             (excType, excMsg) = str(e).split(': ', 1)
             raise ClientException(
                 EXCEPTION_API + ': [' + excType + '] ' + excMsg)
@@ -104,7 +233,7 @@ class Client(ClientData):
         os.open(os.devnull, os.O_RDWR)
 
         try:
-            webbrowser.get().open(self._api.authorize_url)
+            _webbrowser.get().open(self._api.authorize_url)
         except:
             pass
         finally:
@@ -136,14 +265,13 @@ class Client(ClientData):
         """
 
         try:
-            self._api = AWeberAPI(
-                self.config.consumer_key, self.config.consumer_secret)
+            self._api = self._create_api()
 
             self._request_wait()
             request_token, token_secret = self._api.get_request_token('oob')
             self._request_token = request_token
             self._token_secret = token_secret
-        except APIException as e:
+        except _aweber_api.APIException as e:
             (excType, excMsg) = str(e).split(': ', 1)
             raise ClientException(
                 EXCEPTION_API + ': [' + excType + '] ' + excMsg)
@@ -151,15 +279,15 @@ class Client(ClientData):
         if (not self._api.authorize_url):
             raise ClientError(ERROR_NO_AUTH_URL)
 
-        verifier = AuthVerifier()
+        verifier = _auth_verifier.AuthVerifier(self._http_pool)
 
         try:
             code = verifier.get_code(self._api.authorize_url, login, secret)
-        except AuthException as e: # General errors
+        except _auth_verifier.AuthException as e: # General errors
             raise ClientException(str(e))
-        except AuthErrorException as e: # Error text in server's response
+        except _auth_verifier.AuthErrorException as e: # Server's error text
             raise ClientAuthException(str(e))
-        except AuthPageException: # Request parse errors
+        except _auth_verifier.AuthPageException: # Request parse errors
             raise ClientAuthPageException
 
         if (code is None):
@@ -173,7 +301,7 @@ class Client(ClientData):
 
         try:
             access_token, access_secret = self._api.get_access_token()
-        except APIException as e:
+        except _aweber_api.APIException as e:
             (excType, excMsg) = str(e).split(': ', 1)
             raise ClientException(
                 EXCEPTION_API + ': [' + excType + '] ' + excMsg)
@@ -198,17 +326,41 @@ class Client(ClientData):
 
         try:
             if (not self._api):
-                self._api = AWeberAPI(
-                    self.config.consumer_key, self.config.consumer_secret)
+                self._api = self._create_api()
 
             self._request_wait()
             self._account = self._api.get_account(
                 self.config.access_token, self.config.access_secret)
-        except APIException as e:
+        except _aweber_api.APIException as e:
             (excType, excMsg) = str(e).split(': ', 1)
             raise ClientException(
                 EXCEPTION_API + ': [' + excType + '] ' + excMsg)
 
+    def count_subscribers(self, find_params):
+
+        """
+        Counts the results of the 'find subscribers' method of the account
+        instance of the API without fetching them: two requests, the first
+        page and its total size.
+
+        Args:
+            find_params: a dictionary of the method's parameters.
+
+        Returns:
+            Tuple (total size, page size).
+
+        Raises:
+            ClientException.
+        """
+
+        self._request_wait(COLLECTION_REQUESTS)
+
+        data = self._retry_throttled(
+            lambda: self._account.findSubscribers(**find_params),
+            COLLECTION_REQUESTS)
+
+        return data.total_size, data.page_size
+
     def delete_subscriber(self, subscriber):
 
         """
@@ -220,27 +372,51 @@ class Client(ClientData):
                         the entry to be deleted.
 
         Returns:
-            True is successful.
+            True if deleted, False if the API doesn't know the subscriber
+            (any more).
 
         Raises:
             ClientException.
         """
 
+        def delete():
+            try:
+                return subscriber.delete()
+            except _aweber_api.APIException as e:
+                if (str(e).split(': ', 1)[0] == EXCEPTION_API_NOT_FOUND_TYPE):
+                    return False
+                raise
+
         self._request_wait()
 
-        success = False
-        while not success:
-            try:
-                subscriber.delete()
-                success = True
-            except APIException as e:
-                (excType, excMsg) = str(e).split(': ', 1)
-                if (excType == EXCEPTION_API_LIMIT_TYPE) \
-                        and (EXCEPTION_API_LIMIT_MSG in excMsg):
-                    time.sleep(SLEEP_THROTTLE)
-                else:
-                    raise ClientException(
-                        EXCEPTION_API + ': [' + excType + '] ' + excMsg)
+        deleted = self._retry_throttled(delete)
+        if (deleted):
+            self._metrics.increment('deleted_total')
+
+        return deleted
+
+    def dump_stats(self, filename):
+
+        """
+        Writes the client metrics to a file, see
+        aweber_tools.utils.metrics.Metrics.dump. JSON dumps include all of
+        'stats()'.
+
+        Args:
+            filename: destination file.
+
+        Raises:
+            ClientException.
+        """
+
+        stats = self.stats()
+        extra = dict((key, value) for key, value in stats.items()
+                     if key not in ('counters', 'histograms'))
+
+        try:
+            self._metrics.dump(filename, extra)
+        except MetricsException as e:
+            raise ClientException(str(e))
 
     def find_subscribers(self, find_params):
 
@@ -252,25 +428,44 @@ class Client(ClientData):
             find_params: a dictionary of the method's parameters.
 
         Returns:
-            aweber_api.collection.AWeberCollection, a collection of
-            aweber.api.entry.AWeberEntry
+            a list of aweber.api.entry.AWeberEntry.
 
         Raises:
             ClientException.
         """
 
+        return list(self.iter_subscribers(find_params))
+
+    def iter_subscribers(self, find_params):
+
+        """
+        Executes the 'find subscribers' method of the account instance of the
+        API and streams the result page by page.
+
+        The first page is requested right away, later pages are requested
+        as the iteration reaches them and released once consumed, so memory
+        use is bounded by one page.
+
+        Args:
+            find_params: a dictionary of the method's parameters.
+
+        Returns:
+            a generator of aweber.api.entry.AWeberEntry.
+
+        Raises:
+            ClientException, also while iterating.
+        """
+
         data = None
 
-        self._request_wait()
+        self._request_wait(COLLECTION_REQUESTS)
 
-        try:
-            data = self._account.findSubscribers(**find_params)
-        except APIException as e:
-            (excType, excMsg) = str(e).split(': ', 1)
-            raise ClientException(
-                EXCEPTION_API + ': [' + excType + '] ' + excMsg)
+        data = self._retry_throttled(
+            lambda: self._account.findSubscribers(**find_params),
+            COLLECTION_REQUESTS)
 
-        return self._make_list(data)
+        return self._count_items(
+            self._iter_collection(data), 'subscribers_total')
 
     def get_subscriber_activity(self, subscriber):
 
@@ -278,29 +473,107 @@ class Client(ClientData):
         Executes the 'getActivity' method of the specified 'Subscriber' entry
         instance of the API.
 
+        Activity found in the activity cache is returned without an API
+        request.
+
         Args:
             subscriber: aweber.api.entry.AWeberEntry, Subscriber entry.
 
         Returns:
-            aweber_api.collection.AWeberCollection, a collection
-            of subscriber events.
+            a list of aweber.api.entry.AWeberEntry, subscriber events.
 
         Raises:
+            ClientNotFoundException if the API doesn't know the subscriber,
             ClientException.
         """
 
         data = None
 
-        self._request_wait()
+        activity = self._get_cached_activity(subscriber)
+        if (activity is not None):
+            return activity
 
-        try:
-            data = subscriber.get_activity()
-        except APIException as e:
-            (excType, excMsg) = str(e).split(': ', 1)
-            raise ClientException(
-                EXCEPTION_API + ': [' + excType + '] ' +excMsg)
+        self._request_wait(COLLECTION_REQUESTS)
+
+        data = self._retry_throttled(
+            subscriber.get_activity, COLLECTION_REQUESTS)
+
+        activity = self._make_list(data)
+
+        self._put_cached_activity(subscriber, activity)
+
+        return activity
+
+    def iter_subscriber_activity(self, subscriber, event_types=None):
+
+        """
+        Executes the 'getActivity' method of the specified 'Subscriber' entry
+        instance of the API and streams the events.
+
+        The first page is requested right away, later pages are requested
+        only when the iteration reaches them, so that a caller looking for
+        one event stops paging through a long history once it's found.
+        Activity found in the activity cache is streamed without an API
+        request; fetched activity is cached once the iteration reaches its
+        end.
+
+        Args:
+            subscriber: aweber.api.entry.AWeberEntry, Subscriber entry;
+            event_types: collection of the event types to yield, e.g.
+                         ('open',), None for all events.
+
+        Returns:
+            a generator of aweber.api.entry.AWeberEntry, subscriber events.
+
+        Raises:
+            ClientNotFoundException if the API doesn't know the subscriber,
+            ClientException, also while iterating.
+        """
+
+        data = None
+
+        activity = self._get_cached_activity(subscriber)
+
+        if (activity is None):
+            self._request_wait(COLLECTION_REQUESTS)
+            data = self._retry_throttled(
+                subscriber.get_activity, COLLECTION_REQUESTS)
+            activity = self._iter_activity(subscriber, data)
+
+        if (event_types is None):
+            return iter(activity)
+
+        # An entry's 'type' attribute is its resource type, the event type
+        # is only in its data.
+        return (event for event in activity
+                if self._entry_data(event).get(API_EVENT_TYPE) in event_types)
+
+    def make_subscriber_entry(self, data):
+
+        """
+        Wraps previously fetched subscriber entry data, e.g. from a local
+        store, into an API entry bound to the connected account.
 
-        return self._make_list(data)
+        Args:
+            data: a dictionary of subscriber entry data, 'self_link'
+                  included.
+
+        Returns:
+            aweber.api.entry.AWeberEntry.
+
+        Raises:
+            ClientException.
+        """
+
+        if (self._account is None):
+            raise ClientException(ERROR_NOT_CONNECTED)
+
+        # The API library checks an entry's type, taken from its resource
+        # type link, before calling methods such as 'get_activity'.
+        if ('resource_type_link' not in data):
+            data = dict(data, resource_type_link=API_SUBSCRIBER_TYPE_LINK)
+
+        return self._make_entry(data)
 
     def save_tokens(
             self, access_token=None, access_secret=None, filename=None):
@@ -323,6 +596,48 @@ class Client(ClientData):
         except ConfigException as e:
             raise ClientException(str(e))
 
+    def stats(self):
+
+        """
+        Returns the client metrics: 'aweber_tools.utils.metrics.Metrics.stats'
+        plus
+
+            items_per_second: ITEM_COUNTERS divided by the elapsed time;
+            cpu_seconds: process user and system time;
+            rate_controller, activity_cache, cassette, http_pool: their
+            'stats()'.
+
+        API requests are counted and timed per operation in 'requests_total',
+        'errors_total' and 'request_seconds'. 'rate_limit_wait_seconds' is
+        the time spent waiting for the rate limiter, 'throttle_wait_seconds'
+        the time spent backing off after 'throttled_total' throttled
+        requests, both summed over worker threads.
+
+        Returns:
+            a dictionary.
+        """
+
+        stats = self._metrics.stats()
+        elapsed = max(stats['elapsed_seconds'], 1e-9)
+
+        stats['items_per_second'] = dict(
+            (name, stats['counters'].get(name, 0) / elapsed)
+            for name in ITEM_COUNTERS)
+
+        times = os.times()
+        stats['cpu_seconds'] = times[0] + times[1]
+        stats['rate_controller'] = self._rate_controller.stats()
+
+        if (self._activity_cache is not None):
+            stats['activity_cache'] = self._activity_cache.stats()
+
+        if (self._cassette is not None):
+            stats['cassette'] = self._cassette.stats()
+
+        stats['http_pool'] = self._http_pool.stats()
+
+        return stats
+
     def verify_code(self, code):
 
         """
@@ -345,7 +660,7 @@ class Client(ClientData):
 
         try:
             access_token, access_secret = self._api.get_access_token()
-        except APIException as e:
+        except _aweber_api.APIException as e:
             (excType, excMsg) = str(e).split(': ', 1)
             raise ClientException(
                 EXCEPTION_API + ': [' + excType + '] ' + excMsg)
@@ -355,54 +670,261 @@ class Client(ClientData):
 
         return True
 
-    def _make_list(self, data):
+    def _backup_filename(self, name):
 
-        # API throttle handling for collection fetching
+        # Files the client opens live in the backup directory, which actions
+        # create only after the client, so it may not exist yet.
 
-        result = []
+        directory = self.config.backup_path or ''
+
+        try:
+            if (directory) and (not os.path.exists(directory)):
+                os.makedirs(directory)
+        except OSError:
+            raise ClientException(ERROR_DIR_CREATE.format(directory))
+
+        return os.path.join(directory, name)
+
+    def _count_items(self, iterable, name):
+
+        for item in iterable:
+            self._metrics.increment(name)
+            yield item
+
+    def _create_activity_cache(self):
+
+        filename = None
+        if (self.config.activity_file):
+            filename = self._backup_filename(self.config.activity_file)
+
+        size = DEFAULT_SIZE
+        if (self.config.activity_size is not None):
+            size = self.config.activity_size
+
+        try:
+            return ActivityCache(self.config.activity_ttl, size, filename)
+        except ActivityCacheException as e:
+            raise ClientException(str(e))
+
+    def _create_api(self):
+
+        # The API library has no option for its root URL, only its OAuth
+        # adapter keeps one.
+
+        api = _aweber_api.AWeberAPI(
+            self.config.consumer_key, self.config.consumer_secret)
+
+        if (self.config.api_base):
+            api.adapter.api_base = self.config.api_base.rstrip('/')
+
+        api.adapter = _http_pool.PooledOAuthAdapter(
+            api.adapter, self._http_pool)
+
+        # Replayed requests don't reach the metrics adapter.
+        api.adapter = MetricsAdapter(api.adapter, self._metrics)
+
+        if (self._cassette is not None):
+            api.adapter = _cassette.CassetteAdapter(
+                api.adapter, self._cassette)
+
+        return api
+
+    def _create_cassette(self):
+
+        filename = self._backup_filename(self.config.cassette_file)
+
+        mode = _cassette.MODE_REPLAY
+        if (self.config.cassette_mode is not None):
+            mode = self.config.cassette_mode
+
+        try:
+            return _cassette.Cassette(filename, mode)
+        except _cassette.CassetteException as e:
+            raise ClientException(str(e))
+
+    def _entry_data(self, entry):
+
+        # The only read of the API library's private '_data'. Entries have
+        # no public accessor for their raw data, and their 'type' attribute
+        # is the resource type, which hides an event's type.
+
+        return entry._data
+
+    def _fetch_page(self, data, offset):
+
+        # Requests the page of collection 'data' starting at 'offset' and
+        # returns its entries. Runs on page worker threads, so the page is
+        # requested through the collection's adapter rather than loaded
+        # into the collection, whose entry caches the consumer thread
+        # releases.
+
+        self._request_wait()
+
+        response = self._retry_throttled(
+            lambda: data.adapter.request(
+                'GET', data.url,
+                {API_PAGE_START: offset, API_PAGE_SIZE: data.page_size}))
+
+        return [self._make_entry(entry) for entry in response['entries']]
+
+    def _get_cached_activity(self, subscriber):
+
+        # Counts the lookup, returns the cached events or None.
+
+        self._metrics.increment('activity_lookups_total')
+
+        if (self._activity_cache is None):
+            return None
+
+        try:
+            events = self._activity_cache.get(subscriber.id)
+        except ActivityCacheException as e:
+            raise ClientException(str(e))
+
+        if (events is None):
+            return None
+
+        self._metrics.increment('activity_cache_hits_total')
+
+        return [self._make_entry(event) for event in events]
+
+    def _iter_activity(self, subscriber, data):
+
+        # Pages are requested one at a time, as the consumer reaches them;
+        # the events are cached if it reaches the end.
+
+        events = []
+
+        for event in self._iter_collection_serial(data):
+            if (self._activity_cache is not None):
+                events.append(event)
+            yield event
+
+        self._put_cached_activity(subscriber, events)
+
+    def _iter_collection(self, data):
+
+        if (self.page_workers > 1) and (data.total_size > data.page_size):
+            return self._iter_collection_parallel(data)
+
+        return self._iter_collection_serial(data)
+
+    def _iter_collection_parallel(self, data):
+
+        # Page offsets are known after the first response. Requests for the
+        # following pages are kept in flight on a thread pool, a bounded
+        # number of pages ahead of the consumer, and pages are yielded in
+        # order as they complete. The first page comes with the collection.
+
+        end = min(data.page_size, data.total_size)
+        for j in range(0, end):
+            yield self._throttle_data(data, j)
+        self._release_page(data, 0, end)
+
+        offsets = range(data.page_size, data.total_size, data.page_size)
+        pages = imap_ordered(
+            lambda offset: self._fetch_page(data, offset), offsets,
+            self.page_workers)
+
+        for page in pages:
+            for entry in page:
+                yield entry
+
+    def _iter_collection_serial(self, data):
+
+        # API throttle handling for collection fetching
 
         # Entries are paginated, when a page ends a new request is made to
-        # fetch the next one.
+        # fetch the next one. The first page comes with the collection.
         for i in range(0, data.total_size, data.page_size):
-            for j in range(0, data.page_size):
-                if (i + j) > data.total_size - 1:
-                    break
-                result.append(self._throttle_data(data, i+j))
-            self._request_wait()
+            if (i > 0):
+                self._request_wait()
+            end = min(i + data.page_size, data.total_size)
+            for j in range(i, end):
+                yield self._throttle_data(data, j)
+            self._release_page(data, i, end)
 
-        return result
+    def _make_entry(self, data):
+        return _aweber_api.AWeberEntry(
+            data.get('self_link'), data, self._account.adapter)
 
-    def _request_wait(self):
+    def _make_list(self, data):
+        return list(self._iter_collection(data))
 
-        # Wait until a full second passes since the last API request.
+    def _put_cached_activity(self, subscriber, activity):
 
-        request_time = datetime.now()
-        delta = request_time - self._last_request_time
-        delta_seconds = self._timedelta_utils.timedelta_total_seconds(delta)
+        if (self._activity_cache is None):
+            return
 
-        if (delta_seconds < 1):
-            time.sleep(1 - delta_seconds)
+        try:
+            self._activity_cache.put(
+                subscriber.id, [self._entry_data(event) for event in activity])
+        except ActivityCacheException as e:
+            raise ClientException(str(e))
 
-        self._last_request_time = datetime.now()
+    def _release_page(self, data, start, end):
 
-    def _throttle_data(self, data, offset):
+        # Collections cache every entry they have loaded, drop the consumed
+        # page so that a streamed collection keeps only one page in memory.
 
-        result = None
+        for cache in (getattr(data, '_entries', None),
+                      getattr(data, '_entry_data', None)):
+            if (not isinstance(cache, dict)):
+                continue
+            for offset in range(start, end):
+                cache.pop(offset, None)
 
-        # If the API is throttling requests, sleep and try again.
+    def _request_wait(self, tokens=1):
 
-        success = False
-        while not success:
+        # Take a token per request from the rate limiter, sleeping if the
+        # bucket is empty. Replayed requests don't reach the API.
+
+        if (self._cassette is not None) and (self._cassette.replaying):
+            return 0
+
+        slept = self._rate_limiter.acquire(tokens)
+        self._metrics.increment('rate_limit_wait_seconds', slept)
+
+        return slept
+
+    def _retry_throttled(self, func, tokens=1):
+
+        # If the API is throttling requests, back off and try again. The
+        # rate controller slows the client down on throttling and speeds it
+        # up again on success. 'func' makes 'tokens' requests, as many
+        # tokens are taken for each retry.
+
+        attempt = 0
+        while True:
             try:
-                result = data[offset]
-                success = True
-            except APIException as e:
+                result = func()
+            except _aweber_api.APIException as e:
                 (excType, excMsg) = str(e).split(': ', 1)
-                if (excType == EXCEPTION_API_LIMIT_TYPE) \
-                        and (EXCEPTION_API_LIMIT_MSG in excMsg):
-                    time.sleep(SLEEP_THROTTLE)
-                else:
+                if (excType == EXCEPTION_API_NOT_FOUND_TYPE):
+                    raise ClientNotFoundException(
+                        EXCEPTION_API + ': [' + excType + '] ' + excMsg)
+                if (excType != EXCEPTION_API_LIMIT_TYPE) \
+                        or (EXCEPTION_API_LIMIT_MSG not in excMsg):
                     raise ClientException(
                         EXCEPTION_API + ': [' + excType + '] ' + excMsg)
 
-        return result
\ No newline at end of file
+                self._metrics.increment('throttled_total')
+
+                delay = self._rate_controller.on_throttle(attempt)
+                if (delay is None):
+                    raise ClientException(
+                        EXCEPTION_API + ': [' + excType + '] ' + excMsg
+                        + '; ' + ERROR_THROTTLE_RETRIES.format(attempt))
+
+                attempt += 1
+                time.sleep(delay)
+                self._metrics.increment('throttle_wait_seconds', delay)
+                self._request_wait(tokens)
+                continue
+
+            self._rate_controller.on_success()
+
+            return result
+
+    def _throttle_data(self, data, offset):
+        return self._retry_throttled(lambda: data[offset])
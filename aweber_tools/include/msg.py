@@ -6,19 +6,42 @@ ACTION_TITLE_DOWNLOAD_ALL = 'Download subscriber database.'
 ACTION_TITLE_TERMINATE = 'Exit.'
 
 ERROR_AUTH = "Can't authorize."
+ERROR_CACHE_SIZE = 'cache size must be at least 1.'
+ERROR_CACHE_TTL = 'cache TTL must be a positive number.'
 ERROR_CAPTION = '!!! Error: '
+ERROR_CASSETTE_MISS = 'no recorded response for {0} {1}.'
+ERROR_CASSETTE_MODE = 'unknown cassette mode {0}, use one of: {1}.'
 ERROR_CLIENT = 'no API client specified.'
 ERROR_CODE = 'Invalid code.'
 ERROR_CONFIG_NO_FILE = "can't open file."
 ERROR_CONFIG_READ = "Can't read config data."
 ERROR_CONFIG_TOO_LARGE = 'file too large.'
+ERROR_CONFIG_VALUE = 'invalid value of {0}.'
 ERROR_DATE_STRING = 'no date specified.'
+ERROR_DATE_VALUE = "can't parse date {0}."
 ERROR_DIR_CREATE = "can't create directory {0}."
+ERROR_EXPORT_FORMAT = 'unknown export format {0}, use one of: {1}.'
+ERROR_EXPORT_STDOUT = \
+    "this export format can't be written to the standard output."
 ERROR_FILTER_DATA = 'no data to filter specified.'
+ERROR_HTTP_POOL_SIZE = 'HTTP connection pool size must be at least 1.'
+ERROR_HTTP_STATUS = 'HTTP error {0} {1}.'
+ERROR_JOURNAL_LINE = 'malformed line {0} in journal {1}.'
+ERROR_MULTI_STDOUT = \
+    "several accounts can't be exported to the standard output."
+ERROR_NOT_CONNECTED = 'not connected to an account.'
+ERROR_NO_ACCESS_TOKEN = \
+    'no access token set, run the interactive app once to authorize.'
 ERROR_NO_AUTH_URL = 'no authorization URL.'
 ERROR_NO_CONSUMER_KEY = 'no consumer key set.'
 ERROR_NO_CONSUMER_SECRET = 'no consumer secret set.'
 ERROR_NO_OAUTH = 'no OAuth token.'
+ERROR_PROFILER_KIND = 'unknown profiler {0}, use one of: {1}.'
+ERROR_RATE_BURST = 'rate limiter burst must be at least 1.'
+ERROR_RATE_VALUE = 'rate limiter rate must be a positive number.'
+ERROR_STORE_PARAM = "can't filter stored subscribers by {0}."
+ERROR_TABLE_COLUMN = 'no column {0}.'
+ERROR_THROTTLE_RETRIES = 'gave up after {0} retries.'
 
 EXCEPTION_API = 'API Exception'
 
@@ -32,8 +55,10 @@ INPUT_USERNAME = 'Username: '
 INPUT_YES = 'Y'
 INPUT_YES_NO = 'Y/N to continue: '
 
+MSG_ACCOUNTS_DONE = '{0} of {1} accounts succeeded in {2:.1f} s.'
 MSG_ACCOUNT_CONNECTED = 'Success!'
 MSG_ACTIONS_AVAILABLE = 'Available actions: '
+MSG_ACTIVITY_CACHE = 'Activity cache: {0} hits, {1} misses.'
 MSG_AUTH = 'Access token/secret not set. Authorizing...'
 MSG_AUTH_MANUAL = 'Please, authorize via the webpage: https://'
 MSG_AUTH_PAGE_PARSE = "Can't parse server response."
@@ -42,13 +67,25 @@ MSG_BYE = 'Have a nice day!'
 MSG_CONFIG_FILE = 'Reading configuration from [{0}]...'
 MSG_CONFIG_KEYS_NOT_SAVED = 'New config keys have not been saved!'
 MSG_CONNECTING = 'Connecting to AWeber...'
-MSG_CSV_DOWNLOAD = 'Press any key to download backup CSV...'
 MSG_DELETE = 'Deleting entries...'
 MSG_DELETED_ENTRIES = '{0} entries deleted.'
+MSG_DELETE_FAILED = '{0} entries could not be deleted, see {1}.'
+MSG_DELETE_UNFINISHED = \
+    'Unfinished deletion found in {0}, {1} entries left. Resume it?'
 MSG_DONE = 'Done.'
 MSG_EXPORT = 'Exporting...'
+MSG_EXPORTED = '{0} rows exported, {1:.0f} rows/s.'
+MSG_EXPORT_PROGRESS = '{0} rows, {1:.0f} rows/s...'
+MSG_METRICS_SAVED = 'Metrics saved to {0}.'
 MSG_NO_PATH_CSV = 'Backup directory not set. Using current working directory.'
 MSG_PATH_CSV = 'Using directory {0}.'
+MSG_PROFILE_SAVED = 'Profile saved to {0}, cumulative time by module:'
+MSG_PUSH_DOWN = \
+    'Query filtered by the API: {0} subscribers in {1} requests ' \
+    'to fetch, {2} subscribers and {3} requests saved.'
+MSG_QUERY_PLAN = 'API query: {0}; filtered locally: {1}.'
+MSG_STORE_SYNC = 'Synchronizing local subscriber store {0}...'
+MSG_STORE_SYNCED = '{0} entries updated.'
 MSG_SUBSCRIBERS_COUNT = 'Number of entries to be deleted is {0}.'
 MSG_SUBSCRIBERS_EMPTY = 'No entries found.'
 MSG_SUBSCRIBERS_GET = 'Retrieving subscribers data...'
@@ -64,19 +101,39 @@ __all__ = [
     'ACTION_TITLE_TERMINATE',
 
     'ERROR_AUTH',
+    'ERROR_CACHE_SIZE',
+    'ERROR_CACHE_TTL',
     'ERROR_CAPTION',
+    'ERROR_CASSETTE_MISS',
+    'ERROR_CASSETTE_MODE',
     'ERROR_CLIENT',
     'ERROR_CODE',
     'ERROR_CONFIG_NO_FILE',
     'ERROR_CONFIG_READ',
     'ERROR_CONFIG_TOO_LARGE',
+    'ERROR_CONFIG_VALUE',
     'ERROR_DATE_STRING',
+    'ERROR_DATE_VALUE',
     'ERROR_DIR_CREATE',
+    'ERROR_EXPORT_FORMAT',
+    'ERROR_EXPORT_STDOUT',
     'ERROR_FILTER_DATA',
+    'ERROR_HTTP_POOL_SIZE',
+    'ERROR_HTTP_STATUS',
+    'ERROR_JOURNAL_LINE',
+    'ERROR_MULTI_STDOUT',
+    'ERROR_NOT_CONNECTED',
+    'ERROR_NO_ACCESS_TOKEN',
     'ERROR_NO_AUTH_URL',
     'ERROR_NO_CONSUMER_KEY',
     'ERROR_NO_CONSUMER_SECRET',
     'ERROR_NO_OAUTH',
+    'ERROR_PROFILER_KIND',
+    'ERROR_RATE_BURST',
+    'ERROR_RATE_VALUE',
+    'ERROR_STORE_PARAM',
+    'ERROR_TABLE_COLUMN',
+    'ERROR_THROTTLE_RETRIES',
 
     'EXCEPTION_API',
 
@@ -90,8 +147,10 @@ __all__ = [
     'INPUT_YES',
     'INPUT_YES_NO',
 
+    'MSG_ACCOUNTS_DONE',
     'MSG_ACCOUNT_CONNECTED',
     'MSG_ACTIONS_AVAILABLE',
+    'MSG_ACTIVITY_CACHE',
     'MSG_AUTH',
     'MSG_AUTH_MANUAL',
     'MSG_AUTH_PAGE_PARSE',
@@ -100,13 +159,22 @@ __all__ = [
     'MSG_CONFIG_FILE',
     'MSG_CONFIG_KEYS_NOT_SAVED',
     'MSG_CONNECTING',
-    'MSG_CSV_DOWNLOAD',
     'MSG_DELETE',
     'MSG_DELETED_ENTRIES',
+    'MSG_DELETE_FAILED',
+    'MSG_DELETE_UNFINISHED',
     'MSG_DONE',
     'MSG_EXPORT',
+    'MSG_EXPORTED',
+    'MSG_EXPORT_PROGRESS',
+    'MSG_METRICS_SAVED',
     'MSG_NO_PATH_CSV',
     'MSG_PATH_CSV',
+    'MSG_PROFILE_SAVED',
+    'MSG_PUSH_DOWN',
+    'MSG_QUERY_PLAN',
+    'MSG_STORE_SYNC',
+    'MSG_STORE_SYNCED',
     'MSG_SUBSCRIBERS_COUNT',
     'MSG_SUBSCRIBERS_EMPTY',
     'MSG_SUBSCRIBERS_GET',
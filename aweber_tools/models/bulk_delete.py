@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+
+from aweber_tools.client import ClientException
+from aweber_tools.include.msg import ERROR_CLIENT, ERROR_JOURNAL_LINE
+from aweber_tools.utils.workers import imap_unordered
+
+from collections import OrderedDict
+
+import io
+import os
+import threading
+import time
+
+DELETE_RETRIES = 3
+DELETE_WORKERS = 1
+JOURNAL_DONE = 'DONE'
+JOURNAL_END = 'END'
+JOURNAL_FAIL = 'FAIL'
+JOURNAL_PLAN = 'PLAN'
+JOURNAL_SEPARATOR = '\t'
+RETRY_DELAY = 1
+
+class BulkDeleteException(Exception):
+    pass
+
+class DeleteJournal(object):
+
+    """
+    Durable append-only record of a bulk deletion.
+
+    One line per record: 'PLAN <id> <self link>' for every subscriber
+    selected for deletion, then 'DONE <id>' or 'FAIL <id> <message>' as
+    deletions complete, and 'END' once every planned subscriber is done or
+    failed. Lines are flushed and synced to disk as they are written, so
+    the journal survives a crash of the process. A partially written last
+    line is ignored when the journal is read back.
+
+    Failed subscribers aren't pending: a resumed run deletes only the ones
+    with neither record, those a crash interrupted.
+
+    Constructor args:
+        filename: the journal file, created if missing.
+
+    Constructor raises:
+        BulkDeleteException.
+    """
+
+    def __init__(self, filename):
+
+        self._filename = filename
+        self._lock = threading.Lock()
+
+        self._done = set()
+        self._ended = False
+        self._failed = {}
+        self._planned = OrderedDict()
+
+        if (os.path.isfile(filename)):
+            self._load()
+
+        try:
+            self._fp = io.open(filename, 'a', encoding='UTF-8')
+        except (IOError, OSError) as e:
+            raise BulkDeleteException(str(e))
+
+    @property
+    def ended(self):
+        return self._ended
+
+    @property
+    def failed(self):
+        return self._failed
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def pending(self):
+
+        """Planned (id, self link) tuples neither done nor failed."""
+
+        return [(subscriber_id, link)
+                for subscriber_id, link in self._planned.items()
+                if (subscriber_id not in self._done)
+                and (subscriber_id not in self._failed)]
+
+    def close(self):
+
+        """Closes the journal file."""
+
+        with self._lock:
+            self._fp.close()
+
+    def done(self, subscriber_id):
+
+        """Records a completed deletion."""
+
+        self._done.add(subscriber_id)
+        self._failed.pop(subscriber_id, None)
+        self._write([JOURNAL_DONE, subscriber_id])
+
+    def end(self):
+
+        """Marks the journal as finished if nothing is pending."""
+
+        if (not self._ended) and (not self.pending):
+            self._ended = True
+            self._write([JOURNAL_END])
+
+    def fail(self, subscriber_id, message):
+
+        """Records a deletion that failed after all retries."""
+
+        # Kept on one line, as read back from the journal.
+        message = ' '.join(message.split())
+
+        self._failed[subscriber_id] = message
+        self._write([JOURNAL_FAIL, subscriber_id, message])
+
+    def plan(self, subscribers):
+
+        """
+        Records the subscribers selected for deletion.
+
+        Args:
+            subscribers: an iterable of (id, self link) tuples.
+
+        Returns:
+            int: the number of newly planned subscribers.
+        """
+
+        lines = []
+        for subscriber_id, link in subscribers:
+            subscriber_id = str(subscriber_id)
+            if (subscriber_id in self._planned):
+                continue
+            self._planned[subscriber_id] = link
+            lines.append([JOURNAL_PLAN, subscriber_id, link])
+
+        self._write(*lines)
+
+        return len(lines)
+
+    def _load(self):
+
+        try:
+            with io.open(self._filename, encoding='UTF-8') as fp:
+                lines = fp.read().split('\n')
+        except (IOError, OSError) as e:
+            raise BulkDeleteException(str(e))
+
+        # The last line is either empty or was cut short by a crash.
+        for number, line in enumerate(lines[:-1]):
+            record = line.split(JOURNAL_SEPARATOR)
+            if (record[0] == JOURNAL_PLAN) and (len(record) == 3):
+                self._planned[record[1]] = record[2]
+            elif (record[0] == JOURNAL_DONE) and (len(record) == 2):
+                self._done.add(record[1])
+                self._failed.pop(record[1], None)
+            elif (record[0] == JOURNAL_FAIL) and (len(record) == 3):
+                self._failed[record[1]] = record[2]
+            elif (record[0] == JOURNAL_END):
+                self._ended = True
+            else:
+                raise BulkDeleteException(
+                    ERROR_JOURNAL_LINE.format(number + 1, self._filename))
+
+    def _write(self, *records):
+
+        if (not records):
+            return
+
+        data = u''.join(
+            JOURNAL_SEPARATOR.join(u'{0}'.format(value) for value in record)
+            + u'\n' for record in records)
+
+        with self._lock:
+            try:
+                self._fp.write(data)
+                self._fp.flush()
+                os.fsync(self._fp.fileno())
+            except (IOError, OSError) as e:
+                raise BulkDeleteException(str(e))
+
+class BulkDelete(object):
+
+    """
+    Deletes subscribers on a thread pool, retrying failed deletions and
+    recording progress in a 'DeleteJournal'.
+
+    Deletions go through the client, so workers share its rate limiting and
+    throttle handling. A deletion that still fails after 'retries' attempts
+    is recorded and skipped. A subscriber the API no longer knows counts as
+    deleted: it may have been deleted just before a crash kept its
+    deletion from being recorded. An interrupted run is continued with
+    'resume()', which only deletes the subscribers not yet recorded as done
+    or failed.
+
+    Constructor args:
+        client: aweber_tools.client.Client, connected;
+        journal: DeleteJournal;
+        workers: int, concurrent deletions, default: DELETE_WORKERS;
+        retries: int, attempts per subscriber, default: DELETE_RETRIES;
+        on_deleted: callable taking a subscriber id, called after each
+                    successful deletion.
+
+    Constructor raises:
+        BulkDeleteException.
+    """
+
+    def __init__(self, client, journal, workers=DELETE_WORKERS,
+                 retries=DELETE_RETRIES, on_deleted=None):
+
+        if (client is None):
+            raise BulkDeleteException(ERROR_CLIENT)
+
+        self._client = client
+        self._journal = journal
+        self._on_deleted = on_deleted
+        self._retries = max(retries or DELETE_RETRIES, 1)
+        self._workers = max(workers or DELETE_WORKERS, 1)
+
+    @property
+    def journal(self):
+        return self._journal
+
+    def resume(self):
+
+        """
+        Deletes the journal's pending subscribers.
+
+        Returns:
+            (deleted, failed): the number of subscribers deleted and the
+            number of those whose deletion failed.
+
+        Raises:
+            BulkDeleteException.
+        """
+
+        deleted = 0
+        failed = 0
+
+        pending = self._journal.pending
+        if (self._workers > 1):
+            results = imap_unordered(self._delete, pending, self._workers)
+        else:
+            results = (self._delete(item) for item in pending)
+
+        for success in results:
+            if (success):
+                deleted += 1
+            else:
+                failed += 1
+
+        self._journal.end()
+
+        return deleted, failed
+
+    def run(self, subscribers):
+
+        """
+        Records 'subscribers' in the journal and deletes them.
+
+        Args:
+            subscribers: an iterable of
+                         aweber_tools.models.subscribers.Subscriber
+                         instances.
+
+        Returns:
+            (deleted, failed), see 'resume()'.
+
+        Raises:
+            BulkDeleteException.
+        """
+
+        self._journal.plan((subscriber.id, subscriber.self_link)
+                           for subscriber in subscribers)
+
+        return self.resume()
+
+    def _delete(self, item):
+
+        (subscriber_id, link) = item
+        message = None
+
+        for attempt in range(self._retries):
+            if (attempt > 0):
+                time.sleep(RETRY_DELAY * attempt)
+            try:
+                entry = self._client.make_subscriber_entry(
+                    {'id': int(subscriber_id), 'self_link': link})
+                self._client.delete_subscriber(entry)
+            except ClientException as e:
+                message = str(e)
+                continue
+
+            self._journal.done(subscriber_id)
+            if (self._on_deleted is not None):
+                self._on_deleted(int(subscriber_id))
+
+            return True
+
+        self._journal.fail(subscriber_id, message)
+
+        return False
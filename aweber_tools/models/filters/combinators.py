@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+
+from aweber_tools.include.msg import ERROR_FILTER_DATA
+
+from aweber_tools.models.filters.subscribers import \
+    ACTIVITY_WORKERS, COST_LOCAL, FilterException, FilterPredicate, \
+    FilterSubscribers
+
+from aweber_tools.utils.workers import imap_unordered
+
+class FilterCombinatorData(object):
+
+    @property
+    def filters(self):
+        return self._filters
+
+    @property
+    def workers(self):
+        return self._workers
+
+class FilterCombinatorBase(FilterCombinatorData):
+
+    """
+    Base filter combinator.
+
+    A combinator is a filter itself, so combinators nest. Its filters are
+    checked in order of cost, cheapest first, whatever order they are given
+    in, and a subscriber's checks stop as soon as its result is known.
+
+    'filter' and 'iter' evaluate the whole expression in a single streaming
+    pass over the subscribers, without intermediate lists. With more than
+    one worker, subscribers the checks of their fields can't decide on are
+    checked on a thread pool, in completion order, so that only they wait
+    for API requests; the result keeps the order of the subscribers.
+
+    Subclasses decide on a subscriber in 'matches', and in
+    '_decide_locally' with local checks only, or return None if that takes
+    an API request.
+
+    Constructor args:
+        filters: list of FilterPredicate instances, bound to their
+                 arguments;
+        workers: int, number of concurrent checks requesting the API,
+                 default: ACTIVITY_WORKERS.
+
+    Implements:
+            FilterPredicate, FilterSubscribers.
+    """
+
+    def __init__(self, filters, workers=ACTIVITY_WORKERS):
+
+        # sorted() is stable: filters of the same cost keep their order.
+        self._filters = sorted(filters, key=lambda item: item.cost())
+        self._workers = max(workers or ACTIVITY_WORKERS, 1)
+
+    def cost(self):
+
+        """
+        Implements FilterPredicate.cost: the cost of checking every filter.
+        """
+
+        return sum(item.cost() for item in self._filters)
+
+    def filter(self, subscribers, days_ago=None):
+
+        """
+        Args:
+            subscribers: an iterable of
+                         aweber_api.models.subscribers.Subscriber instances,
+                         may be a generator;
+            days_ago: unused, the filters are bound to their arguments.
+
+        Returns:
+            a filtered a list of aweber_api.models.subscribers.Subscriber
+            instances.
+
+        Implements:
+            FilterSubscribers.filter
+
+        Raises:
+            FilterException.
+        """
+
+        try:
+            return list(self.iter(subscribers))
+        except FilterException:
+            raise
+        except Exception as e:
+            raise FilterException(str(e))
+
+    def iter(self, subscribers):
+
+        """
+        Same as 'filter', but returns a generator of the subscribers passing
+        the filter, yielded as soon as they and the subscribers before them
+        are decided on.
+
+        Raises:
+            FilterException; whatever iterating 'subscribers' raises, while
+            iterating the result.
+        """
+
+        if (subscribers is None):
+            raise FilterException(ERROR_FILTER_DATA)
+
+        if (self._workers <= 1 or not _requests_api(self)):
+            return (subscriber for subscriber in subscribers
+                    if self.matches(subscriber))
+
+        return self._iter_concurrent(subscribers)
+
+    def matches(self, subscriber):
+        """Implements FilterPredicate.matches."""
+        pass
+
+    def _decide_locally(self, subscriber):
+        pass
+
+    def _iter_concurrent(self, subscribers):
+
+        # Subscribers decided on locally are buffered until the ones before
+        # them come back from the pool.
+
+        decided = {}
+
+        def undecided():
+            for i, subscriber in enumerate(subscribers):
+                matched = _decide_locally(self, subscriber)
+                if (matched is None):
+                    yield i, subscriber
+                else:
+                    decided[i] = (subscriber, matched)
+
+        def check(item):
+            (i, subscriber) = item
+            return i, subscriber, self.matches(subscriber)
+
+        next_index = 0
+
+        for i, subscriber, matched in imap_unordered(
+                check, undecided(), self._workers):
+            decided[i] = (subscriber, matched)
+            while (next_index in decided):
+                subscriber, matched = decided.pop(next_index)
+                next_index += 1
+                if (matched):
+                    yield subscriber
+
+        for i in sorted(decided):
+            subscriber, matched = decided[i]
+            if (matched):
+                yield subscriber
+
+class FilterAnd(FilterCombinatorBase):
+
+    """
+    Returns subscribers passing all the filters.
+
+    Constructor args:
+        see FilterCombinatorBase.
+    """
+
+    def matches(self, subscriber):
+
+        """Implements FilterPredicate.matches."""
+
+        return all(item.matches(subscriber) for item in self._filters)
+
+    def _decide_locally(self, subscriber):
+
+        result = True
+
+        for item in self._filters:
+            matched = _decide_locally(item, subscriber)
+            if (matched is None):
+                result = None
+            elif (not matched):
+                return False
+
+        return result
+
+class FilterOr(FilterCombinatorBase):
+
+    """
+    Returns subscribers passing any of the filters.
+
+    Constructor args:
+        see FilterCombinatorBase.
+    """
+
+    def matches(self, subscriber):
+
+        """Implements FilterPredicate.matches."""
+
+        return any(item.matches(subscriber) for item in self._filters)
+
+    def _decide_locally(self, subscriber):
+
+        result = False
+
+        for item in self._filters:
+            matched = _decide_locally(item, subscriber)
+            if (matched is None):
+                result = None
+            elif (matched):
+                return True
+
+        return result
+
+class FilterNot(FilterCombinatorBase):
+
+    """
+    Returns subscribers not passing a filter.
+
+    Constructor args:
+        subscribers_filter: FilterPredicate instance;
+        workers: see FilterCombinatorBase.
+    """
+
+    def __init__(self, subscribers_filter, workers=ACTIVITY_WORKERS):
+        super(FilterNot, self).__init__([subscribers_filter], workers)
+
+    def matches(self, subscriber):
+
+        """Implements FilterPredicate.matches."""
+
+        return not self._filters[0].matches(subscriber)
+
+    def _decide_locally(self, subscriber):
+
+        matched = _decide_locally(self._filters[0], subscriber)
+        if (matched is None):
+            return None
+
+        return not matched
+
+def _decide_locally(subscribers_filter, subscriber):
+
+    # True or False if 'subscribers_filter' decides on 'subscriber' without
+    # API requests, None otherwise.
+
+    if (isinstance(subscribers_filter, FilterCombinatorBase)):
+        return subscribers_filter._decide_locally(subscriber)
+
+    if (subscribers_filter.cost() > COST_LOCAL):
+        return None
+
+    return subscribers_filter.matches(subscriber)
+
+def _requests_api(subscribers_filter):
+
+    if (isinstance(subscribers_filter, FilterCombinatorBase)):
+        return any(_requests_api(item) for item in subscribers_filter.filters)
+
+    return subscribers_filter.cost() > COST_LOCAL
+
+FilterPredicate.register(FilterAnd)
+FilterPredicate.register(FilterNot)
+FilterPredicate.register(FilterOr)
+
+FilterSubscribers.register(FilterAnd)
+FilterSubscribers.register(FilterNot)
+FilterSubscribers.register(FilterOr)
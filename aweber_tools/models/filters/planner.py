@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+
+from aweber_tools.models.filters.combinators import FilterAnd
+
+from aweber_tools.models.filters.subscribers import \
+    ACTIVITY_WORKERS, FilterPushDown
+from aweber_tools.models.subscribers import FindWhere
+
+class QueryPlanData(object):
+
+    @property
+    def base_params(self):
+        return self._base_params
+
+    @property
+    def find_params(self):
+        return self._find_params
+
+    @property
+    def local(self):
+        return self._local
+
+    @property
+    def pushed(self):
+        return self._pushed
+
+class QueryPlan(QueryPlanData):
+
+    """
+    A 'find subscribers' query with the filters the API can evaluate
+    pushed down into its params, and the filters left to run locally.
+
+    Constructor args:
+        base_params: FindParams, the query before push-down, or None;
+        find_params: FindParams, the planned query;
+        pushed: list of the filters the API evaluates;
+        local: FilterAnd of the filters to run on the query's results.
+    """
+
+    def __init__(self, base_params, find_params, pushed, local):
+
+        self._base_params = base_params
+        self._find_params = find_params
+        self._pushed = pushed
+        self._local = local
+
+    def filter(self, subscribers):
+
+        """
+        Runs the local filters over the query's results, in a single pass.
+
+        Args:
+            subscribers: an iterable of
+                         aweber_tools.models.subscribers.Subscriber
+                         instances, fetched with 'find_params'.
+
+        Returns:
+            a filtered list of aweber_tools.models.subscribers.Subscriber
+            instances.
+
+        Raises:
+            FilterException; SubscribersException while fetching.
+        """
+
+        return self._local.filter(subscribers)
+
+    def savings(self, subscribers_for):
+
+        """
+        Counts what the push-down saves, without fetching subscribers.
+
+        Args:
+            subscribers_for: callable taking a FindParams instance, or None,
+                             and returning the Subscribers collection it
+                             would be fetched from, e.g. the store's.
+
+        Returns:
+            a dictionary of 'records' and 'requests' fetched with the
+            planned query, and 'records_saved' and 'requests_saved' compared
+            with the query before push-down.
+
+        Raises:
+            SubscribersException.
+        """
+
+        records, requests = subscribers_for(self._find_params).estimate()
+        records_base, requests_base = \
+            subscribers_for(self._base_params).estimate()
+
+        return {
+            'records': records,
+            'requests': requests,
+            'records_saved': records_base - records,
+            'requests_saved': requests_base - requests
+        }
+
+class QueryPlanner(object):
+
+    """
+    Plans a 'find subscribers' query for subscribers passing all of a list
+    of filters; FilterAnd filters in the list are planned as their filters.
+
+    Filters implementing FilterPushDown are evaluated by the API: their
+    params are added to the query. A filter whose params select a superset
+    of its subscribers, or conflict with params already in the query, also
+    runs locally, on the query's results. The other filters, e.g. activity
+    checks, run locally, combined with FilterAnd: cheapest first.
+
+    Constructor args:
+        workers: int, number of concurrent local checks requesting the
+                 API, default: ACTIVITY_WORKERS.
+    """
+
+    def __init__(self, workers=ACTIVITY_WORKERS):
+        self._workers = workers
+
+    def plan(self, filters, find_params=None):
+
+        """
+        Args:
+            filters: list of FilterPredicate instances, bound to their
+                     arguments;
+            find_params: FindParams instance, the query to add to, None for
+                         all subscribers.
+
+        Returns:
+            QueryPlan.
+        """
+
+        params = {}
+        if (find_params is not None):
+            params = find_params.params()
+
+        pushed = []
+        local = []
+
+        for subscribers_filter in self._flatten(filters):
+            if (not isinstance(subscribers_filter, FilterPushDown)):
+                local.append(subscribers_filter)
+                continue
+
+            filter_params, exact = subscribers_filter.find_params()
+
+            if (any(params.get(name, value) != value
+                    for name, value in filter_params.items())):
+                local.append(subscribers_filter)
+                continue
+
+            params.update(filter_params)
+            pushed.append(subscribers_filter)
+
+            if (not exact):
+                local.append(subscribers_filter)
+
+        return QueryPlan(find_params, FindWhere(params), pushed,
+                         FilterAnd(local, self._workers))
+
+    def _flatten(self, filters):
+
+        for subscribers_filter in filters:
+            if (isinstance(subscribers_filter, FilterAnd)):
+                for item in self._flatten(subscribers_filter.filters):
+                    yield item
+            else:
+                yield subscribers_filter
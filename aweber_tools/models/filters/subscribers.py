@@ -3,11 +3,28 @@
 from abc import ABCMeta, abstractmethod
 
 from aweber_tools.include.msg import ERROR_FILTER_DATA
+
+from aweber_tools.models.subscriber_table import \
+    SubscriberTable, SubscriberTableException
+
+from aweber_tools.models.subscribers import SubscriberNotFoundException
+
 from aweber_tools.utils.date_format import DateFormat, DateFormatException
+from aweber_tools.utils.workers import imap_unordered
 
 from datetime import datetime, timedelta
 import time
 
+ACTIVITY_WORKERS = 1
+API_PARAM_STATUS = 'status'
+API_PARAM_SUBSCRIBED_BEFORE = 'subscribed_before'
+
+# Relative cost of one subscriber check: a comparison of the subscriber's
+# fields, or an API request.
+COST_API = 1000
+COST_LOCAL = 1
+
+FORMAT_API_DATE = '%Y-%m-%d'
 TIMEDELTA_1_DAY_AGO = 1
 
 class FilterException(Exception):
@@ -24,30 +41,114 @@ class FilterSubscribers(object):
         """Returns a filtered list."""
         pass
 
+class FilterPredicate(object):
+
+    """
+    Filters deciding on one subscriber at a time, so that combinators can
+    order them by cost and evaluate them in a single streaming pass.
+    """
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def cost(self):
+        """Returns the cost of one 'matches' call, e.g. COST_LOCAL."""
+        pass
+
+    @abstractmethod
+    def matches(self, subscriber):
+        """Returns True if 'subscriber' passes the filter."""
+        pass
+
+class FilterPushDown(object):
+
+    """Filters the API's 'find subscribers' method can evaluate."""
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def find_params(self):
+
+        """
+        Returns (params, exact): 'find subscribers' params selecting the
+        filter's subscribers, or a superset of them if 'exact' is False.
+        """
+
+        pass
+
 class FilterAddedBeforeDaysAgo(object):
 
     """
     Returns subscribers added before X days ago.
 
+    The API's 'subscribed_before' bound has a granularity of one day, so
+    the pushed down params select a superset: the day after the limit, so
+    that the limit's day is included whether the bound is inclusive or not.
+
+    Constructor args:
+        days_ago: int, X when 'filter' isn't given one,
+                  default: TIMEDELTA_1_DAY_AGO.
+
     Implements:
-            FilterSubscribers.
+            FilterPredicate, FilterPushDown, FilterSubscribers.
     """
 
-    def filter(self, subscribers, days_ago=TIMEDELTA_1_DAY_AGO):
+    def __init__(self, days_ago=TIMEDELTA_1_DAY_AGO):
+        self._days_ago = days_ago
+        self._formatter = DateFormat()
+
+    def cost(self):
+
+        """Implements FilterPredicate.cost."""
+
+        return COST_LOCAL
+
+    def find_params(self):
+
+        """Implements FilterPushDown.find_params."""
+
+        bound = datetime.now() - timedelta(days=self._days_ago - 1)
+
+        return ({API_PARAM_SUBSCRIBED_BEFORE:
+                 bound.strftime(FORMAT_API_DATE)}, False)
+
+    def matches(self, subscriber):
+
+        """
+        Implements FilterPredicate.matches.
+
+        Raises:
+            FilterException.
+        """
+
+        x_days_ago = datetime.now() - timedelta(days=self._days_ago)
+
+        try:
+            return self._formatter.get_date(
+                subscriber.subscribed_at) <= x_days_ago
+        except DateFormatException as e:
+            raise FilterException(str(e))
+
+    def filter(self, subscribers, days_ago=None):
 
         """
-        Iterates over the 'subscribers' list and appends its items to the
+        Iterates over 'subscribers' and appends its items to the
         result if their 'subscribed_at' dates are less than
         [now() - 'days_ago' * DAYS].
 
+        A 'SubscriberTable' is filtered with a single vectorized comparison
+        of its 'subscribed_at' column instead.
+
         Args:
-            subscribers: a list of aweber_api.models.subscribers.Subscriber
-                         instances;
-            days_ago: int, default: TIMEDELTA_1_DAY_AGO.
+            subscribers: an iterable of
+                         aweber_api.models.subscribers.Subscriber instances,
+                         or an aweber_tools.models.subscriber_table.
+                         SubscriberTable;
+            days_ago: int, default: the constructor's.
 
         Returns:
             a filtered a list of aweber_api.models.subscribers.Subscriber
-            instances.
+            instances, or a filtered SubscriberTable.
 
         Implements:
             FilterSubscribers.filter
@@ -59,11 +160,21 @@ class FilterAddedBeforeDaysAgo(object):
         if (subscribers is None):
             raise FilterException(ERROR_FILTER_DATA)
 
+        if (days_ago is None):
+            days_ago = self._days_ago
+
         subscribers_filtered = []
         formatter = DateFormat()
 
         x_days_ago = datetime.now() - timedelta(days=days_ago)
 
+        if (isinstance(subscribers, SubscriberTable)):
+            try:
+                return subscribers.select(subscribers.mask_date_before(
+                    'subscribed_at', x_days_ago))
+            except SubscriberTableException as e:
+                raise FilterException(str(e))
+
         try:
             for subscriber in subscribers:
                 subscription_date = \
@@ -79,22 +190,53 @@ class FilterNoOpensSinceDaysAgo(object):
 
     """
     Returns subscribers with no opens since X days ago.
-    
+
+    Activity is requested through each subscriber's client, so concurrent
+    lookups share its rate limiting and throttle handling. It's streamed
+    page by page and a subscriber's lookup stops at the first event
+    deciding on it, so long histories don't cost a request per page.
+    Subscribers the API no longer knows don't pass the filter.
+
+    Constructor args:
+        workers: int, number of concurrent activity lookups,
+                 default: ACTIVITY_WORKERS;
+        days_ago: int, X when 'filter' isn't given one,
+                  default: TIMEDELTA_1_DAY_AGO;
+        event_types: collection of the event types checked, e.g.
+                     ('open',), None for all events.
+
     Implements:
-            FilterSubscribers.
+            FilterPredicate, FilterSubscribers.
     """
 
-    def filter(self, subscribers, days_ago=TIMEDELTA_1_DAY_AGO):
+    def __init__(self, workers=ACTIVITY_WORKERS,
+                 days_ago=TIMEDELTA_1_DAY_AGO, event_types=None):
+        self._workers = max(workers or ACTIVITY_WORKERS, 1)
+        self._days_ago = days_ago
+        self._event_types = event_types
+        self._formatter = DateFormat()
+
+    def cost(self):
+
+        """Implements FilterPredicate.cost."""
+
+        return COST_API
+
+    def filter(self, subscribers, days_ago=None):
 
         """
-        Iterates over the 'subscribers' list and appends its items to the
+        Iterates over 'subscribers' and appends its items to the
         result if their 'get_activity' method's result list doesn't contain
         events with dates after [now() - 'days_ago' * DAYS].
 
+        With more than one worker, activity is fetched on a thread pool,
+        in completion order so that a subscriber with a long history doesn't
+        hold back the others; the result keeps the order of 'subscribers'.
+
         Args:
-            subscribers: a list of aweber_api.models.subscribers.Subscriber
-                         instances;
-            days_ago: int, default: TIMEDELTA_1_DAY_AGO.
+            subscribers: an iterable of
+                         aweber_api.models.subscribers.Subscriber instances;
+            days_ago: int, default: the constructor's.
 
         Returns:
             a filtered a list of aweber_api.models.subscribers.Subscriber
@@ -110,23 +252,133 @@ class FilterNoOpensSinceDaysAgo(object):
         if (subscribers is None):
             raise FilterException(ERROR_FILTER_DATA)
 
+        if (days_ago is None):
+            days_ago = self._days_ago
+
         subscribers_filtered = []
         formatter = DateFormat()
 
         x_days_ago = datetime.now() - timedelta(days=days_ago)
 
+        def check(item):
+            (i, subscriber) = item
+            return (i, subscriber,
+                    self._has_event_before(subscriber, formatter, x_days_ago))
+
         try:
-            for subscriber in subscribers:
-                activity = subscriber.get_activity()
-                for event in activity:
-                    event_date = formatter.get_date(event.event_time)
-                    if event_date <= x_days_ago:
-                        subscribers_filtered.append(subscriber)
-                        break
+            if (self._workers > 1):
+                results = imap_unordered(
+                    check, enumerate(subscribers), self._workers)
+            else:
+                results = (check(item) for item in enumerate(subscribers))
+
+            for i, subscriber, matched in results:
+                if matched:
+                    subscribers_filtered.append((i, subscriber))
         except Exception as e:
             raise FilterException(str(e))
 
-        return subscribers_filtered
+        subscribers_filtered.sort(key=lambda item: item[0])
+
+        return [subscriber for i, subscriber in subscribers_filtered]
+
+    def matches(self, subscriber):
+
+        """
+        Implements FilterPredicate.matches, with one activity request.
+
+        Raises:
+            FilterException.
+        """
+
+        x_days_ago = datetime.now() - timedelta(days=self._days_ago)
+
+        try:
+            return self._has_event_before(
+                subscriber, self._formatter, x_days_ago)
+        except Exception as e:
+            raise FilterException(str(e))
+
+    def _has_event_before(self, subscriber, formatter, date):
+
+        # A subscriber deleted since it was listed, or stored, is skipped.
+
+        activity = subscriber.iter_activity(self._event_types)
+        try:
+            for event in activity:
+                event_date = formatter.get_date(event.event_time)
+                if event_date <= date:
+                    return True
+        except SubscriberNotFoundException:
+            return False
+
+        return False
+
+class FilterStatus(object):
+
+    """
+    Returns subscribers with the given status, e.g. 'subscribed'.
+
+    Constructor args:
+        status: string.
+
+    Implements:
+            FilterPredicate, FilterPushDown, FilterSubscribers.
+    """
+
+    def __init__(self, status):
+        self._status = status
+
+    def cost(self):
+
+        """Implements FilterPredicate.cost."""
+
+        return COST_LOCAL
+
+    def find_params(self):
+
+        """Implements FilterPushDown.find_params."""
+
+        return {API_PARAM_STATUS: self._status}, True
+
+    def matches(self, subscriber):
+
+        """Implements FilterPredicate.matches."""
+
+        return subscriber.status == self._status
+
+    def filter(self, subscribers, days_ago=None):
+
+        """
+        Args:
+            subscribers: an iterable of
+                         aweber_api.models.subscribers.Subscriber instances;
+            days_ago: unused.
+
+        Returns:
+            a filtered a list of aweber_api.models.subscribers.Subscriber
+            instances.
+
+        Implements:
+            FilterSubscribers.filter
+
+        Raises:
+            FilterException.
+        """
+
+        if (subscribers is None):
+            raise FilterException(ERROR_FILTER_DATA)
+
+        return [subscriber for subscriber in subscribers
+                if subscriber.status == self._status]
+
+FilterPredicate.register(FilterAddedBeforeDaysAgo)
+FilterPredicate.register(FilterNoOpensSinceDaysAgo)
+FilterPredicate.register(FilterStatus)
+
+FilterPushDown.register(FilterAddedBeforeDaysAgo)
+FilterPushDown.register(FilterStatus)
 
 FilterSubscribers.register(FilterAddedBeforeDaysAgo)
-FilterSubscribers.register(FilterNoOpensSinceDaysAgo)
\ No newline at end of file
+FilterSubscribers.register(FilterNoOpensSinceDaysAgo)
+FilterSubscribers.register(FilterStatus)
\ No newline at end of file
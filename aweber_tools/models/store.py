@@ -0,0 +1,591 @@
+#!/usr/bin/env python
+
+from aweber_tools.client import ClientException
+from aweber_tools.include.msg import ERROR_CLIENT, ERROR_STORE_PARAM
+
+from aweber_tools.models.subscribers import \
+    API_SUBSCRIBER_STATUS_PARAM, Subscriber, SubscriberException, \
+    SubscriberNotFoundException, Subscribers, SubscribersException
+
+from datetime import datetime, timedelta
+
+import json
+import sqlite3
+import threading
+
+API_PARAM_EMAIL = 'email'
+API_PARAM_SUBSCRIBED_AFTER = 'subscribed_after'
+API_PARAM_UNSUBSCRIBED_AFTER = 'unsubscribed_after'
+API_STATUS_UNCONFIRMED = 'unconfirmed'
+
+FORMAT_API_DATE = '%Y-%m-%d'
+
+# Date bounds of 'find subscribers', inclusive and compared by day:
+# parameter -> (field, operator).
+PARAMS_DATE = {
+    'subscribed_after': ('subscribed_at', '>='),
+    'subscribed_before': ('subscribed_at', '<='),
+    'unsubscribed_after': ('unsubscribed_at', '>='),
+    'unsubscribed_before': ('unsubscribed_at', '<=')
+}
+
+STATE_FULL_SYNC = 'full_sync'
+STATE_WATERMARK = 'watermark'
+SYNC_BATCH_SIZE = 1000
+
+# Days of overlap between syncs, the API's date filters have a granularity
+# of one day and no time zone.
+SYNC_OVERLAP_DAYS = 1
+
+FIELDS_JSON = ('custom_fields', 'tags')
+FIELDS_SUBSCRIBER = (
+    'ad_tracking',
+    'area_code',
+    'city',
+    'country',
+    'custom_fields',
+    'dma_code',
+    'email',
+    'ip_address',
+    'is_verified',
+    'last_followup_message_number_sent',
+    'last_followup_sent',
+    'last_followup_sent_at',
+    'latitude',
+    'longitude',
+    'misc_notes',
+    'name',
+    'postal_code',
+    'region',
+    'self_link',
+    'status',
+    'subscribed_at',
+    'subscription_method',
+    'subscription_url',
+    'tags',
+    'unsubscribe_method',
+    'unsubscribed_at',
+    'verified_at'
+)
+
+SQL_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS subscribers (
+    id INTEGER PRIMARY KEY,
+    {0}
+);
+CREATE INDEX IF NOT EXISTS subscribers_status ON subscribers (status);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''.format(',\n    '.join(FIELDS_SUBSCRIBER))
+
+SQL_UPSERT = \
+    'INSERT OR REPLACE INTO subscribers (id, {0}) VALUES ({1})'.format(
+        ', '.join(FIELDS_SUBSCRIBER),
+        ', '.join('?' * (len(FIELDS_SUBSCRIBER) + 1)))
+
+class SubscriberStoreException(Exception):
+    pass
+
+class SubscriberStore(object):
+
+    """
+    Local SQLite copy of an account's subscribers.
+
+    'sync()' downloads the whole account once and then only what changed
+    since the previous sync: subscribers added or unsubscribed after the
+    sync watermark and the ones whose 'unconfirmed' status has changed.
+    Subscribers deleted outside of this application are only dropped by a
+    full sync, or when the API answers a request about one of them with
+    'not found', see 'SubscriberStored'.
+
+    Constructor args:
+        filename: the database file, created if missing.
+
+    Constructor raises:
+        SubscriberStoreException.
+    """
+
+    def __init__(self, filename):
+
+        self._filename = filename
+        self._lock = threading.Lock()
+
+        try:
+            self._db = sqlite3.connect(filename, check_same_thread=False)
+            self._db.executescript(SQL_SCHEMA)
+        except sqlite3.Error as e:
+            raise SubscriberStoreException(str(e))
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def full_sync_date(self):
+        return self._get_state(STATE_FULL_SYNC)
+
+    @property
+    def watermark(self):
+        return self._get_state(STATE_WATERMARK)
+
+    def close(self):
+
+        """Closes the database."""
+
+        with self._lock:
+            self._db.close()
+
+    def count(self, find_params=None):
+
+        """
+        Counts stored subscribers.
+
+        Args:
+            find_params: a dictionary of 'find subscribers' parameters,
+                         equality on stored fields and PARAMS_DATE are
+                         supported.
+
+        Returns:
+            int.
+
+        Raises:
+            SubscriberStoreException.
+        """
+
+        where, values = self._where(find_params)
+
+        with self._lock:
+            try:
+                return self._db.execute(
+                    'SELECT COUNT(*) FROM subscribers' + where,
+                    values).fetchone()[0]
+            except sqlite3.Error as e:
+                raise SubscriberStoreException(str(e))
+
+    def iter(self, find_params=None):
+
+        """
+        Streams stored subscribers in id order.
+
+        Args:
+            find_params: a dictionary of 'find subscribers' parameters,
+                         equality on stored fields and PARAMS_DATE are
+                         supported.
+
+        Returns:
+            a generator of dictionaries of subscriber entry data.
+
+        Raises:
+            SubscriberStoreException.
+        """
+
+        where, values = self._where(find_params)
+        query = 'SELECT id, {0} FROM subscribers{1} AND id > ? ' \
+                'ORDER BY id LIMIT {2}'.format(
+                    ', '.join(FIELDS_SUBSCRIBER), where or ' WHERE 1',
+                    SYNC_BATCH_SIZE)
+
+        return self._iter_rows(query, values)
+
+    def remove(self, subscriber_id):
+
+        """
+        Removes a subscriber, e.g. after deleting it via API.
+
+        Args:
+            subscriber_id: the subscriber's id.
+
+        Raises:
+            SubscriberStoreException.
+        """
+
+        with self._lock:
+            try:
+                with self._db:
+                    self._db.execute(
+                        'DELETE FROM subscribers WHERE id = ?',
+                        (subscriber_id,))
+            except sqlite3.Error as e:
+                raise SubscriberStoreException(str(e))
+
+    def sync(self, client, full=False, full_sync_days=None):
+
+        """
+        Brings the store up to date with the account.
+
+        Args:
+            client: aweber_tools.client.Client, connected;
+            full: re-download the whole account if True, also done when the
+                  store has never been synced;
+            full_sync_days: int, re-download the whole account if the last
+                            full sync is this many days old, None to only
+                            sync changes.
+
+        Returns:
+            int: the number of subscribers fetched.
+
+        Raises:
+            SubscriberStoreException.
+        """
+
+        if (client is None):
+            raise SubscriberStoreException(ERROR_CLIENT)
+
+        sync_date = datetime.utcnow()
+        watermark = self.watermark
+
+        if (watermark is None) \
+                or (self._full_sync_due(sync_date, full_sync_days)):
+            full = True
+
+        try:
+            if (full):
+                count = self._sync_full(client)
+            else:
+                count = self._sync_changes(client, watermark)
+        except ClientException as e:
+            raise SubscriberStoreException(str(e))
+
+        if (full):
+            self._set_state(
+                STATE_FULL_SYNC, sync_date.strftime(FORMAT_API_DATE))
+        self._set_state(STATE_WATERMARK, sync_date.strftime(FORMAT_API_DATE))
+
+        return count
+
+    def _full_sync_due(self, sync_date, full_sync_days):
+
+        # A store without a recorded full sync is due for one.
+
+        if (full_sync_days is None):
+            return False
+
+        full_sync_date = self.full_sync_date
+        if (full_sync_date is None):
+            return True
+
+        return sync_date - datetime.strptime(
+            full_sync_date, FORMAT_API_DATE) >= timedelta(days=full_sync_days)
+
+    def _get_state(self, key):
+
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    'SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+            except sqlite3.Error as e:
+                raise SubscriberStoreException(str(e))
+
+        if (row is None):
+            return None
+
+        return row[0]
+
+    def _iter_rows(self, query, values):
+
+        # Keyset pagination, so that no cursor stays open between batches
+        # and rows can be removed while iterating.
+
+        last_id = -1
+        while True:
+            with self._lock:
+                try:
+                    rows = self._db.execute(
+                        query, values + [last_id]).fetchall()
+                except sqlite3.Error as e:
+                    raise SubscriberStoreException(str(e))
+
+            if (not rows):
+                return
+
+            for row in rows:
+                yield self._row_to_data(row)
+
+            last_id = rows[-1][0]
+
+    def _row_to_data(self, row):
+
+        data = {'id': row[0]}
+
+        for name, value in zip(FIELDS_SUBSCRIBER, row[1:]):
+            if (name in FIELDS_JSON) and (value is not None):
+                value = json.loads(value)
+            data[name] = value
+
+        return data
+
+    def _entry_to_row(self, entry):
+
+        row = [entry.id]
+
+        for name in FIELDS_SUBSCRIBER:
+            value = getattr(entry, name, None)
+            if (name in FIELDS_JSON) and (value is not None):
+                # Unwraps the API library's DataDict proxy of dictionaries.
+                value = json.dumps(getattr(value, 'data', value))
+            row.append(value)
+
+        return row
+
+    def _set_state(self, key, value):
+
+        with self._lock:
+            try:
+                with self._db:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO state (key, value) '
+                        'VALUES (?, ?)', (key, value))
+            except sqlite3.Error as e:
+                raise SubscriberStoreException(str(e))
+
+    def _sync_changes(self, client, watermark):
+
+        since = datetime.strptime(watermark, FORMAT_API_DATE) \
+            - timedelta(days=SYNC_OVERLAP_DAYS)
+        since = since.strftime(FORMAT_API_DATE)
+
+        count = self._upsert(client.iter_subscribers(
+            {API_PARAM_SUBSCRIBED_AFTER: since}))
+        count += self._upsert(client.iter_subscribers(
+            {API_PARAM_UNSUBSCRIBED_AFTER: since}))
+
+        # Confirmation doesn't change any date the API can filter by. Fetch
+        # the currently unconfirmed subscribers and look up the stored ones
+        # that are not among them anymore.
+        unconfirmed_params = \
+            {API_SUBSCRIBER_STATUS_PARAM: API_STATUS_UNCONFIRMED}
+        stored = dict((data['id'], data['email'])
+                      for data in self.iter(unconfirmed_params))
+
+        unconfirmed = list(client.iter_subscribers(unconfirmed_params))
+        count += self._upsert(unconfirmed)
+
+        for entry in unconfirmed:
+            stored.pop(entry.id, None)
+
+        for subscriber_id, email in stored.items():
+            entries = client.find_subscribers({API_PARAM_EMAIL: email})
+            changed = [entry for entry in entries
+                       if entry.id == subscriber_id]
+            if (changed):
+                count += self._upsert(changed)
+            else:
+                self.remove(subscriber_id)
+
+        return count
+
+    def _sync_full(self, client):
+
+        with self._lock:
+            try:
+                with self._db:
+                    self._db.execute('DELETE FROM subscribers')
+            except sqlite3.Error as e:
+                raise SubscriberStoreException(str(e))
+
+        return self._upsert(client.iter_subscribers({}))
+
+    def _upsert(self, entries):
+
+        count = 0
+        batch = []
+
+        for entry in entries:
+            batch.append(self._entry_to_row(entry))
+            if (len(batch) >= SYNC_BATCH_SIZE):
+                count += self._write_rows(batch)
+                batch = []
+
+        if (batch):
+            count += self._write_rows(batch)
+
+        return count
+
+    def _where(self, find_params):
+
+        if (not find_params):
+            return '', []
+
+        clauses = []
+        values = []
+
+        for name in sorted(find_params):
+            if (name in PARAMS_DATE):
+                # Stored dates are the API's ISO 8601 strings, their first
+                # 10 characters the day.
+                field, operator = PARAMS_DATE[name]
+                clauses.append('substr({0}, 1, 10) {1} ?'.format(
+                    field, operator))
+            elif (name in FIELDS_SUBSCRIBER) or (name == 'id'):
+                clauses.append(name + ' = ?')
+            else:
+                raise SubscriberStoreException(
+                    ERROR_STORE_PARAM.format(name))
+            values.append(find_params[name])
+
+        return ' WHERE ' + ' AND '.join(clauses), values
+
+    def _write_rows(self, rows):
+
+        with self._lock:
+            try:
+                with self._db:
+                    self._db.executemany(SQL_UPSERT, rows)
+            except sqlite3.Error as e:
+                raise SubscriberStoreException(str(e))
+
+        return len(rows)
+
+class SubscriberStored(Subscriber):
+
+    """
+    A 'Subscriber' read from a 'SubscriberStore'. If the API doesn't know
+    the subscriber any more, e.g. it was deleted on the AWeber website
+    since the last full sync, it's removed from the store.
+
+    Constructor args:
+        client: aweber_tools.client.Client, connected;
+        store: SubscriberStore;
+        data: aweber.api.entry.AWeberEntry, see
+              aweber_tools.client.Client.make_subscriber_entry.
+
+    Constructor raises:
+        SubscriberException.
+    """
+
+    def __init__(self, client, store, data=None):
+        super(SubscriberStored, self).__init__(client, data)
+        self._store = store
+
+    @property
+    def store(self):
+        return self._store
+
+    def get_activity(self):
+
+        """
+        Overrides Subscriber.get_activity.
+
+        Raises:
+            SubscriberNotFoundException, SubscriberException.
+        """
+
+        try:
+            return super(SubscriberStored, self).get_activity()
+        except SubscriberNotFoundException:
+            self._remove()
+            raise
+
+    def iter_activity(self, event_types=None):
+
+        """
+        Overrides Subscriber.iter_activity.
+
+        Raises:
+            SubscriberNotFoundException, SubscriberException, also while
+            iterating.
+        """
+
+        try:
+            for event in super(SubscriberStored, self).iter_activity(
+                    event_types):
+                yield event
+        except SubscriberNotFoundException:
+            self._remove()
+            raise
+
+    def _remove(self):
+
+        try:
+            self.store.remove(self.id)
+        except SubscriberStoreException as e:
+            raise SubscriberException(str(e))
+
+class SubscribersStored(Subscribers):
+
+    """
+    A collection of 'SubscriberStored' instances read from a
+    'SubscriberStore' instead of the API.
+
+    Constructor args:
+        client: aweber_tools.client.Client, connected, used by the
+                subscribers' 'delete' and 'get_activity' methods;
+        store: SubscriberStore;
+        find_params: instance of a class that implements the 'FindParams'
+                     interface, used as a filter for 'get()'.
+    """
+
+    def __init__(self, client, store, find_params=None):
+        super(SubscribersStored, self).__init__(client, find_params)
+        self._store = store
+
+    @property
+    def store(self):
+        return self._store
+
+    def estimate(self):
+
+        """
+        Counts the subscribers 'iter()' yields.
+
+        Returns:
+            Tuple (subscribers, 0): no API requests.
+
+        Raises:
+            SubscribersException.
+        """
+
+        find_params = {}
+        if (self.find_params):
+            find_params = self.find_params.params()
+
+        try:
+            return self.store.count(find_params), 0
+        except SubscriberStoreException as e:
+            raise SubscribersException(str(e))
+
+    def iter(self):
+
+        """
+        Streams subscriber data from the store.
+
+        Returns:
+            a generator of 'SubscriberStored' instances.
+
+        Raises:
+            SubscribersException, also while iterating.
+        """
+
+        if (self.client is None):
+            raise SubscribersException(ERROR_CLIENT)
+
+        find_params = {}
+        if (self.find_params):
+            find_params = self.find_params.params()
+
+        try:
+            rows = self.store.iter(find_params)
+        except SubscriberStoreException as e:
+            raise SubscribersException(str(e))
+
+        return self._iter_stored(rows)
+
+    def _iter_stored(self, rows):
+
+        # Counted apart from the subscribers the API returns, which
+        # include the ones a sync fetched.
+
+        metrics = self.client.metrics
+
+        try:
+            for data in rows:
+                subscriber = SubscriberStored(
+                    self.client, self.store,
+                    self.client.make_subscriber_entry(data))
+                metrics.increment('stored_subscribers_total')
+                yield subscriber
+        except (ClientException, SubscriberException,
+                SubscriberStoreException) as e:
+            raise SubscribersException(str(e))
@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+
+from aweber_tools.include.msg import ERROR_TABLE_COLUMN
+from aweber_tools.utils.date_format import DateFormat, DateFormatException
+from aweber_tools.utils.datetime_utils import TimedeltaUtilities
+
+from array import array
+from datetime import datetime
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CODE_NONE = -1
+COLUMNS_DATE = ('subscribed_at', 'unsubscribed_at', 'last_followup_sent_at')
+COLUMNS_STRING = ('status', 'country', 'region', 'city')
+DATE_EPOCH = datetime(1970, 1, 1)
+DATE_NONE = float('nan')
+
+class SubscriberTableException(Exception):
+    pass
+
+class SubscriberTable(object):
+
+    """
+    Columnar view of a list of subscribers for vectorized filtering.
+
+    Date columns (COLUMNS_DATE) hold seconds since the epoch as floats, NaN
+    for missing dates, in the same local time as
+    aweber_tools.utils.date_format.DateFormat.get_date. String columns
+    (COLUMNS_STRING) are dictionary encoded: integer codes into a list of
+    distinct values, CODE_NONE for None.
+
+    Columns are NumPy arrays if NumPy is installed, array.array otherwise.
+    Masks are boolean NumPy arrays or lists of booleans respectively.
+    Tables are immutable, 'select()' returns a new one.
+
+    Constructor args:
+        subscribers: an iterable of
+                     aweber_tools.models.subscribers.Subscriber instances,
+                     or an aweber_tools.models.subscribers.Subscribers
+                     instance, streamed with its 'iter()' method.
+
+    Constructor raises:
+        SubscriberTableException.
+    """
+
+    def __init__(self, subscribers=None):
+
+        self._rows = []
+        self._dates = dict((name, array('d')) for name in COLUMNS_DATE)
+        self._codes = dict((name, array('i')) for name in COLUMNS_STRING)
+        self._values = dict((name, []) for name in COLUMNS_STRING)
+
+        if (subscribers is None):
+            self._freeze()
+            return
+
+        if (hasattr(subscribers, 'iter')):
+            subscribers = subscribers.iter()
+
+        lookup = dict((name, {}) for name in COLUMNS_STRING)
+        formatter = DateFormat()
+        utils = TimedeltaUtilities()
+
+        try:
+            for subscriber in subscribers:
+                self._rows.append(subscriber)
+                for name in COLUMNS_DATE:
+                    self._dates[name].append(self._to_seconds(
+                        formatter, utils, getattr(subscriber, name)))
+                for name in COLUMNS_STRING:
+                    self._codes[name].append(self._encode(
+                        lookup[name], self._values[name],
+                        getattr(subscriber, name)))
+        except DateFormatException as e:
+            raise SubscriberTableException(str(e))
+
+        self._freeze()
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def subscribers(self):
+        return list(self._rows)
+
+    def codes(self, name):
+
+        """Returns the codes of the string column 'name'."""
+
+        self._check_column(name, self._codes)
+
+        return self._codes[name]
+
+    def dates(self, name):
+
+        """Returns the date column 'name'."""
+
+        self._check_column(name, self._dates)
+
+        return self._dates[name]
+
+    def mask_date_after(self, name, date):
+
+        """
+        Args:
+            name: a date column name;
+            date: naive local datetime.
+
+        Returns:
+            a mask of rows whose 'name' is set and after 'date'.
+        """
+
+        column = self.dates(name)
+        seconds = self.seconds(date)
+
+        if (numpy is not None):
+            return column > seconds
+
+        return [value > seconds for value in column]
+
+    def mask_date_before(self, name, date):
+
+        """
+        Args:
+            name: a date column name;
+            date: naive local datetime.
+
+        Returns:
+            a mask of rows whose 'name' is set and not after 'date'.
+        """
+
+        column = self.dates(name)
+        seconds = self.seconds(date)
+
+        if (numpy is not None):
+            return column <= seconds
+
+        return [value <= seconds for value in column]
+
+    def mask_in(self, name, values):
+
+        """
+        Args:
+            name: a string column name;
+            values: an iterable of values.
+
+        Returns:
+            a mask of rows whose 'name' is one of 'values'.
+        """
+
+        column = self.codes(name)
+        codes = set(self._lookup_code(name, value) for value in values)
+        codes.discard(None)
+
+        if (numpy is not None):
+            return numpy.isin(column, sorted(codes))
+
+        return [code in codes for code in column]
+
+    def mask_equals(self, name, value):
+
+        """
+        Args:
+            name: a string column name;
+            value: the value, None included.
+
+        Returns:
+            a mask of rows whose 'name' equals 'value'.
+        """
+
+        column = self.codes(name)
+        code = self._lookup_code(name, value)
+
+        if (code is None):
+            if (numpy is not None):
+                return numpy.zeros(len(column), dtype=bool)
+            return [False] * len(column)
+
+        if (numpy is not None):
+            return column == code
+
+        return [item == code for item in column]
+
+    def seconds(self, date):
+
+        """Converts a naive datetime to a date column value."""
+
+        return TimedeltaUtilities().timedelta_total_seconds(date - DATE_EPOCH)
+
+    def select(self, mask):
+
+        """
+        Args:
+            mask: a mask returned by one of the 'mask_*' methods, or any
+                  sequence of booleans as long as the table.
+
+        Returns:
+            SubscriberTable, the rows where 'mask' is true.
+        """
+
+        table = SubscriberTable()
+        table._values = self._values
+
+        if (numpy is not None):
+            indices = numpy.flatnonzero(numpy.asarray(mask, dtype=bool))
+            table._rows = [self._rows[i] for i in indices]
+            table._dates = dict((name, column[indices])
+                                for name, column in self._dates.items())
+            table._codes = dict((name, column[indices])
+                                for name, column in self._codes.items())
+            return table
+
+        indices = [i for i, selected in enumerate(mask) if selected]
+        table._rows = [self._rows[i] for i in indices]
+        table._dates = dict(
+            (name, array('d', [column[i] for i in indices]))
+            for name, column in self._dates.items())
+        table._codes = dict(
+            (name, array('i', [column[i] for i in indices]))
+            for name, column in self._codes.items())
+
+        return table
+
+    def values(self, name):
+
+        """Returns the distinct values of the string column 'name'."""
+
+        self._check_column(name, self._values)
+
+        return self._values[name]
+
+    def _check_column(self, name, columns):
+
+        if (name not in columns):
+            raise SubscriberTableException(ERROR_TABLE_COLUMN.format(name))
+
+    def _encode(self, lookup, values, value):
+
+        if (value is None):
+            return CODE_NONE
+
+        code = lookup.get(value)
+        if (code is None):
+            code = len(values)
+            lookup[value] = code
+            values.append(value)
+
+        return code
+
+    def _freeze(self):
+
+        if (numpy is None):
+            return
+
+        for name, column in self._dates.items():
+            self._dates[name] = numpy.array(column, dtype=numpy.float64)
+
+        for name, column in self._codes.items():
+            self._codes[name] = numpy.array(column, dtype=numpy.int32)
+
+    def _lookup_code(self, name, value):
+
+        if (value is None):
+            return CODE_NONE
+
+        try:
+            return self.values(name).index(value)
+        except ValueError:
+            return None
+
+    def _to_seconds(self, formatter, utils, date_string):
+
+        if (date_string is None):
+            return DATE_NONE
+
+        return utils.timedelta_total_seconds(
+            formatter.get_date(date_string) - DATE_EPOCH)
@@ -2,10 +2,10 @@
 
 from abc import ABCMeta, abstractmethod
 
-from aweber_tools.client import ClientException
+from aweber_tools.client import ClientException, ClientNotFoundException
 from aweber_tools.include.msg import ERROR_CLIENT
 
-from future.builtins import super
+import math
 
 API_SUBSCRIBER_STATUS_PARAM = 'status'
 API_SUBSCRIBER_STATUS_VALUE_SUBSCRIBED = 'subscribed'
@@ -13,6 +13,9 @@ API_SUBSCRIBER_STATUS_VALUE_SUBSCRIBED = 'subscribed'
 class SubscriberException(Exception):
     pass
 
+class SubscriberNotFoundException(SubscriberException):
+    pass
+
 class SubscribersException(Exception):
     pass
 
@@ -52,11 +55,33 @@ class FindSubscribed(object):
         return {API_SUBSCRIBER_STATUS_PARAM:
                 API_SUBSCRIBER_STATUS_VALUE_SUBSCRIBED}
 
+class FindWhere(object):
+
+    """
+    Any 'find subscribers' params, e.g. planned by
+    aweber_tools.models.filters.planner.QueryPlanner.
+
+    Constructor args:
+        params: a dictionary of the method's parameters.
+
+    Implements:
+        FindParams.
+    """
+
+    def __init__(self, params):
+        self._params = dict(params)
+
+    def params(self):
+        return dict(self._params)
+
 FindParams.register(FindAll)
 FindParams.register(FindSubscribed)
+FindParams.register(FindWhere)
 
 class SubscriberData(object):
 
+    __slots__ = ()
+
     @property
     def ad_tracking(self):
         return self._ad_tracking
@@ -133,6 +158,10 @@ class SubscriberData(object):
     def region(self):
         return self._region
 
+    @property
+    def self_link(self):
+        return self._self_link
+
     @property
     def status(self):
         return self._status
@@ -170,6 +199,10 @@ class Subscriber(SubscriberData):
     """
     AWeber API Subscriber entry representation.
 
+    Fields are copied from the entry once, into slots, and the entry itself
+    is not kept: 'delete' and 'get_activity' rebuild it from the id and the
+    self link.
+
     Constructor args:
         client: aweber_tools.client.Client;
         data: aweber_api.AWeberEntry, subscriber data.
@@ -178,6 +211,38 @@ class Subscriber(SubscriberData):
         ClientException.
     """
 
+    __slots__ = (
+        '_client',
+        '_ad_tracking',
+        '_area_code',
+        '_city',
+        '_country',
+        '_custom_fields',
+        '_dma_code',
+        '_email',
+        '_id',
+        '_ip_address',
+        '_is_verified',
+        '_last_followup_message_number_sent',
+        '_last_followup_sent',
+        '_last_followup_sent_at',
+        '_latitude',
+        '_longitude',
+        '_misc_notes',
+        '_name',
+        '_postal_code',
+        '_region',
+        '_self_link',
+        '_status',
+        '_subscribed_at',
+        '_subscription_method',
+        '_subscription_url',
+        '_tags',
+        '_unsubscribe_method',
+        '_unsubscribed_at',
+        '_verified_at'
+    )
+
     @property
     def client(self):
         return self._client
@@ -188,7 +253,6 @@ class Subscriber(SubscriberData):
             raise SubscriberException(ERROR_CLIENT)
 
         self._client = client
-        self._data = data
 
         self._ad_tracking = None
         self._area_code = None
@@ -209,6 +273,7 @@ class Subscriber(SubscriberData):
         self._name = None
         self._postal_code = None
         self._region = None
+        self._self_link = None
         self._status = None
         self._subscribed_at = None
         self._subscription_method = None
@@ -218,43 +283,47 @@ class Subscriber(SubscriberData):
         self._unsubscribed_at = None
         self._verified_at = None
 
-        if (self._data is None):
+        if (data is None):
             return
 
-        self._ad_tracking = self._data.ad_tracking
-        self._area_code = self._data.area_code
-        self._city = self._data.city
-        self._country = self._data.country
-        self._custom_fields = self._data.custom_fields
-        self._dma_code = self._data.dma_code
-        self._email = self._data.email
-        self._id = self._data.id
-        self._ip_address = self._data.ip_address
-        self._is_verified = self._data.is_verified
+        self._ad_tracking = data.ad_tracking
+        self._area_code = data.area_code
+        self._city = data.city
+        self._country = data.country
+        # The API library wraps dictionary fields in a DataDict proxy,
+        # which holds the dictionary in 'data'.
+        self._custom_fields = getattr(
+            data.custom_fields, 'data', data.custom_fields)
+        self._dma_code = data.dma_code
+        self._email = data.email
+        self._id = data.id
+        self._ip_address = data.ip_address
+        self._is_verified = data.is_verified
         self._last_followup_message_number_sent = \
-            self._data.last_followup_message_number_sent
-
-        if (hasattr(self._data, 'last_followup_sent')):
-            self._last_followup_sent = self._data.last_followup_sent
-
-        self._last_followup_sent_at = self._data.last_followup_sent_at
-        self._latitude = self._data.latitude
-        self._longitude = self._data.longitude
-        self._misc_notes = self._data.misc_notes
-        self._name = self._data.name
-        self._postal_code = self._data.postal_code
-        self._region = self._data.region
-        self._status = self._data.status
-        self._subscribed_at = self._data.subscribed_at
-        self._subscription_method = self._data.subscription_method
-        self._subscription_url = self._data.subscription_url
-
-        if (hasattr(self._data, 'tags')):
-            self._tags = self._data.tags
-
-        self._unsubscribe_method = self._data.unsubscribe_method
-        self._unsubscribed_at = self._data.unsubscribed_at
-        self._verified_at = self._data.verified_at
+            data.last_followup_message_number_sent
+
+        if (hasattr(data, 'last_followup_sent')):
+            self._last_followup_sent = data.last_followup_sent
+
+        self._last_followup_sent_at = data.last_followup_sent_at
+        self._latitude = data.latitude
+        self._longitude = data.longitude
+        self._misc_notes = data.misc_notes
+        self._name = data.name
+        self._postal_code = data.postal_code
+        self._region = data.region
+        self._self_link = data.self_link
+        self._status = data.status
+        self._subscribed_at = data.subscribed_at
+        self._subscription_method = data.subscription_method
+        self._subscription_url = data.subscription_url
+
+        if (hasattr(data, 'tags')):
+            self._tags = data.tags
+
+        self._unsubscribe_method = data.unsubscribe_method
+        self._unsubscribed_at = data.unsubscribed_at
+        self._verified_at = data.verified_at
 
     def delete(self):
 
@@ -267,7 +336,7 @@ class Subscriber(SubscriberData):
         """
 
         try:
-            self.client.delete_subscriber(self._data)
+            self.client.delete_subscriber(self._entry())
         except ClientException as e:
             raise SubscriberException(str(e))
 
@@ -278,18 +347,56 @@ class Subscriber(SubscriberData):
         aweber_tools.client.Client.
 
         Raises:
-            SubscriberException.
+            SubscriberNotFoundException if the API doesn't know the
+            subscriber (any more), SubscriberException.
         """
 
         data = None
 
         try:
-            data = self.client.get_subscriber_activity(self._data)
+            data = self.client.get_subscriber_activity(self._entry())
+        except ClientNotFoundException as e:
+            raise SubscriberNotFoundException(str(e))
         except ClientException as e:
             raise SubscriberException(str(e))
 
         return data
 
+    def iter_activity(self, event_types=None):
+
+        """
+        Executes the 'iter_subscriber_activity' method of
+        aweber_tools.client.Client.
+
+        Args:
+            event_types: collection of the event types to yield, e.g.
+                         ('open',), None for all events.
+
+        Returns:
+            a generator of aweber.api.entry.AWeberEntry, subscriber events.
+
+        Raises:
+            SubscriberNotFoundException if the API doesn't know the
+            subscriber (any more), SubscriberException, also while
+            iterating.
+        """
+
+        try:
+            for event in self.client.iter_subscriber_activity(
+                    self._entry(), event_types):
+                yield event
+        except ClientNotFoundException as e:
+            raise SubscriberNotFoundException(str(e))
+        except ClientException as e:
+            raise SubscriberException(str(e))
+
+    def _entry(self):
+
+        # Raises ClientException.
+
+        return self.client.make_subscriber_entry(
+            {'id': self._id, 'self_link': self._self_link})
+
 class SubscribersData(object):
 
     @property
@@ -329,6 +436,36 @@ class Subscribers(SubscribersData):
         self._subscribers = []
         self._find_params = find_params
 
+    def estimate(self):
+
+        """
+        Counts the subscribers 'iter()' yields without fetching them.
+
+        Returns:
+            Tuple (subscribers, API requests 'iter()' makes).
+
+        Raises:
+            SubscribersException.
+        """
+
+        if (self.client is None):
+            raise SubscribersException(ERROR_CLIENT)
+
+        find_params = {}
+        if (self.find_params):
+            find_params = self.find_params.params()
+
+        try:
+            total_size, page_size = \
+                self.client.count_subscribers(find_params)
+        except ClientException as e:
+            raise SubscribersException(str(e))
+
+        # The first page and the total size, then one request per page.
+        pages = max(int(math.ceil(total_size / float(page_size))), 1)
+
+        return total_size, pages + 1
+
     def get(self):
 
         """
@@ -341,38 +478,56 @@ class Subscribers(SubscribersData):
             SubscribersException.
         """
 
+        for subscriber in self.iter():
+            self.subscribers.append(subscriber)
+
+        return self.subscribers
+
+    def iter(self):
+
+        """
+        Streams subscriber data via API page by page, without keeping the
+        fetched subscribers in 'subscribers'.
+
+        Returns:
+            a generator of 'Subscriber' instances.
+
+        Raises:
+            SubscribersException, also while iterating.
+        """
+
         if (self.client is None):
             raise SubscribersException(ERROR_CLIENT)
 
-        find_params = []
+        find_params = {}
         if (self.find_params):
             find_params = self.find_params.params()
 
-        subscribers = []
-
         try:
-            subscribers = self.client.find_subscribers(find_params)
+            entries = self.client.iter_subscribers(find_params)
         except ClientException as e:
             raise SubscribersException(str(e))
 
+        return self._iter_subscribers(entries)
+
+    def _iter_subscribers(self, entries):
+
         try:
-            for subscriber in subscribers:
-                self.subscribers.append(Subscriber(self._client, subscriber))
-        except SubscriberException as e:
+            for entry in entries:
+                yield Subscriber(self._client, entry)
+        except (ClientException, SubscriberException) as e:
             raise SubscribersException(str(e))
 
-        return self.subscribers
-
 class SubscribersAll(Subscribers):
 
     """All subscribers."""
 
     def __init__(self, client):
-        super().__init__(client, FindAll())
+        super(SubscribersAll, self).__init__(client, FindAll())
 
 class SubscribersSubscribed(Subscribers):
 
     """Subscribers with the 'subscribed' status."""
 
     def __init__(self, client):
-        super().__init__(client, FindSubscribed())
\ No newline at end of file
+        super(SubscribersSubscribed, self).__init__(client, FindSubscribed())
\ No newline at end of file
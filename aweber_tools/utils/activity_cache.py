@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+
+from aweber_tools.include.msg import ERROR_CACHE_SIZE, ERROR_CACHE_TTL
+
+from collections import OrderedDict
+
+import json
+import sqlite3
+import threading
+import time
+
+DEFAULT_SIZE = 10000
+
+SQL_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS activity (
+    id INTEGER PRIMARY KEY,
+    fetched_at REAL,
+    events TEXT
+);
+'''
+
+class ActivityCacheException(Exception):
+    pass
+
+class ActivityCacheData(object):
+
+    @property
+    def disk_hits(self):
+        return self._disk_hits
+
+    @property
+    def evictions(self):
+        return self._evictions
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def ttl(self):
+        return self._ttl
+
+class ActivityCache(ActivityCacheData):
+
+    """
+    Subscriber activity cache keyed by subscriber id.
+
+    Entries expire 'ttl' seconds after they were fetched. The in-memory tier
+    keeps the 'max_size' most recently used subscribers; the optional
+    on-disk tier keeps everything until it expires and is shared between
+    runs. Safe to share between threads.
+
+    Cached values are lists of activity event data dictionaries.
+
+    Constructor args:
+        ttl: float, seconds;
+        max_size: int, in-memory entries, default: DEFAULT_SIZE;
+        filename: SQLite file of the on-disk tier, None for memory only;
+        clock: callable returning wall clock time in seconds, default:
+               time.time.
+
+    Constructor raises:
+        ActivityCacheException.
+    """
+
+    def __init__(self, ttl, max_size=DEFAULT_SIZE, filename=None,
+                 clock=None):
+
+        if (ttl is None) or (ttl <= 0):
+            raise ActivityCacheException(ERROR_CACHE_TTL)
+
+        if (max_size is None) or (max_size < 1):
+            raise ActivityCacheException(ERROR_CACHE_SIZE)
+
+        self._clock = clock or time.time
+        self._db = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_size = int(max_size)
+        self._ttl = float(ttl)
+
+        self._disk_hits = 0
+        self._evictions = 0
+        self._hits = 0
+        self._misses = 0
+
+        if (filename is None):
+            return
+
+        try:
+            self._db = sqlite3.connect(filename, check_same_thread=False)
+            self._db.executescript(SQL_SCHEMA)
+            with self._db:
+                self._db.execute(
+                    'DELETE FROM activity WHERE fetched_at < ?',
+                    (self._clock() - self._ttl,))
+        except sqlite3.Error as e:
+            raise ActivityCacheException(str(e))
+
+    def close(self):
+
+        """Closes the on-disk tier."""
+
+        with self._lock:
+            if (self._db is not None):
+                self._db.close()
+                self._db = None
+
+    def get(self, subscriber_id):
+
+        """
+        Looks up a subscriber's cached activity.
+
+        Args:
+            subscriber_id: the subscriber's id.
+
+        Returns:
+            a list of activity event data dictionaries, None if not cached
+            or expired.
+
+        Raises:
+            ActivityCacheException.
+        """
+
+        now = self._clock()
+
+        with self._lock:
+            entry = self._entries.get(subscriber_id)
+
+            if (entry is not None):
+                if (now - entry[0] < self._ttl):
+                    self._touch(subscriber_id)
+                    self._hits += 1
+                    return entry[1]
+                del self._entries[subscriber_id]
+
+            entry = self._read(subscriber_id)
+
+            if (entry is not None) and (now - entry[0] < self._ttl):
+                self._remember(subscriber_id, entry)
+                self._hits += 1
+                self._disk_hits += 1
+                return entry[1]
+
+            self._misses += 1
+
+        return None
+
+    def put(self, subscriber_id, events):
+
+        """
+        Caches a subscriber's activity.
+
+        Args:
+            subscriber_id: the subscriber's id;
+            events: a list of activity event data dictionaries.
+
+        Raises:
+            ActivityCacheException.
+        """
+
+        entry = (self._clock(), events)
+
+        with self._lock:
+            self._remember(subscriber_id, entry)
+            self._write(subscriber_id, entry)
+
+    def stats(self):
+
+        """
+        Returns:
+            a dictionary of hit, miss and eviction counters.
+        """
+
+        with self._lock:
+            return {
+                'disk_hits': self._disk_hits,
+                'evictions': self._evictions,
+                'hits': self._hits,
+                'misses': self._misses,
+                'size': len(self._entries)
+            }
+
+    def _read(self, subscriber_id):
+
+        if (self._db is None):
+            return None
+
+        try:
+            row = self._db.execute(
+                'SELECT fetched_at, events FROM activity WHERE id = ?',
+                (subscriber_id,)).fetchone()
+        except sqlite3.Error as e:
+            raise ActivityCacheException(str(e))
+
+        if (row is None):
+            return None
+
+        return (row[0], json.loads(row[1]))
+
+    def _remember(self, subscriber_id, entry):
+
+        self._entries[subscriber_id] = entry
+        self._touch(subscriber_id)
+
+        while (len(self._entries) > self._max_size):
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _touch(self, subscriber_id):
+
+        # Move to the most recently used end.
+
+        self._entries[subscriber_id] = self._entries.pop(subscriber_id)
+
+    def _write(self, subscriber_id, entry):
+
+        if (self._db is None):
+            return
+
+        try:
+            with self._db:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO activity (id, fetched_at, events) '
+                    'VALUES (?, ?, ?)',
+                    (subscriber_id, entry[0], json.dumps(entry[1])))
+        except sqlite3.Error as e:
+            raise ActivityCacheException(str(e))
@@ -1,11 +1,10 @@
 #!/usr/bin/env python
 
-from future import standard_library
+from aweber_tools.include.msg import ERROR_HTTP_STATUS, ERROR_NO_OAUTH
 
-from aweber_tools.include.msg import ERROR_NO_OAUTH
+from aweber_tools.utils.http_pool import HttpPool
 
 import urllib
-import urllib2
 from urlparse import urljoin, urlparse
 
 from HTMLParser import HTMLParser
@@ -88,7 +87,16 @@ class AuthErrorParser(HTMLParser):
 
 class AuthVerifier(object):
 
-    """AWeber API authorization page parser."""
+    """
+    AWeber API authorization page parser.
+
+    Constructor args:
+        http_pool: aweber_tools.utils.http_pool.HttpPool sending the
+                   request, e.g. the client's, a new one if not set.
+    """
+
+    def __init__(self, http_pool=None):
+        self._http_pool = http_pool or HttpPool(1)
 
     def get_code(self, url, login, secret):
 
@@ -164,10 +172,14 @@ class AuthVerifier(object):
             }
 
         post_data = urllib.urlencode(post_values)
-        request = urllib2.Request(url, post_data, REQUEST_HEADERS)
-        response = urllib2.urlopen(request).read()
+        response, content = self._http_pool.request(
+            url, 'POST', post_data, dict(REQUEST_HEADERS))
+
+        if (response.status >= 400):
+            raise AuthException(
+                ERROR_HTTP_STATUS.format(response.status, response.reason))
 
-        return response
+        return content
 
     def _get_code_value(self, response):
 
@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+
+from aweber_api import APIException
+
+from aweber_tools.include.msg import ERROR_CASSETTE_MISS, ERROR_CASSETTE_MODE
+
+import hashlib
+import json
+import sqlite3
+import struct
+import threading
+import zlib
+
+try:
+    from urllib.parse import parse_qsl, urlsplit
+except ImportError:
+    from urlparse import parse_qsl, urlsplit
+
+# Raised as 'CassetteError: ...' API exceptions, so that replay misses are
+# handled like any other API error.
+EXCEPTION_CASSETTE_TYPE = 'CassetteError'
+
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+MODES = (MODE_RECORD, MODE_REPLAY)
+
+COMPRESS_LEVEL = 6
+
+# Responses are keyed by the first 8 bytes of the request's SHA-1, which
+# makes the key SQLite's integer rowid: a replay lookup is one B-tree probe.
+SQL_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS responses (
+    key INTEGER PRIMARY KEY,
+    response BLOB
+);
+'''
+
+class CassetteException(Exception):
+    pass
+
+class CassetteData(object):
+
+    @property
+    def filename(self):
+        return self._filename
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def recorded(self):
+        return self._recorded
+
+    @property
+    def replaying(self):
+        return self._mode == MODE_REPLAY
+
+class Cassette(CassetteData):
+
+    """
+    On-disk record of API responses keyed by request.
+
+    In record mode, 'CassetteAdapter' passes requests on to the API and
+    stores every successful response; a request made again replaces its
+    response. In replay mode, responses are read back and nothing is sent.
+    Responses are stored as zlib-compressed JSON. Safe to share between
+    threads.
+
+    Constructor args:
+        filename: SQLite file, created if missing;
+        mode: MODE_RECORD or MODE_REPLAY.
+
+    Constructor raises:
+        CassetteException.
+    """
+
+    def __init__(self, filename, mode=MODE_REPLAY):
+
+        if (mode not in MODES):
+            raise CassetteException(
+                ERROR_CASSETTE_MODE.format(mode, ', '.join(MODES)))
+
+        self._filename = filename
+        self._mode = mode
+        self._hits = 0
+        self._misses = 0
+        self._recorded = 0
+        self._lock = threading.Lock()
+
+        try:
+            self._db = sqlite3.connect(filename, check_same_thread=False)
+            self._db.executescript(SQL_SCHEMA)
+        except sqlite3.Error as e:
+            raise CassetteException(str(e))
+
+    def close(self):
+
+        """Closes the database."""
+
+        with self._lock:
+            self._db.close()
+
+    def get(self, key):
+
+        """
+        Looks a response up.
+
+        Args:
+            key: int, see 'request_key'.
+
+        Returns:
+            Tuple (found, response).
+
+        Raises:
+            CassetteException.
+        """
+
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    'SELECT response FROM responses WHERE key = ?',
+                    (key,)).fetchone()
+            except sqlite3.Error as e:
+                raise CassetteException(str(e))
+
+            if (row is None):
+                self._misses += 1
+                return False, None
+
+            self._hits += 1
+
+        return True, self._decode(row[0])
+
+    def put(self, key, response):
+
+        """
+        Stores a response.
+
+        Args:
+            key: int, see 'request_key';
+            response: a JSON serializable API response.
+
+        Raises:
+            CassetteException.
+        """
+
+        blob = sqlite3.Binary(zlib.compress(
+            json.dumps(response).encode('utf-8'), COMPRESS_LEVEL))
+
+        with self._lock:
+            try:
+                with self._db:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO responses (key, response) '
+                        'VALUES (?, ?)', (key, blob))
+            except sqlite3.Error as e:
+                raise CassetteException(str(e))
+
+            self._recorded += 1
+
+    def request_key(self, method, url, data, response):
+
+        """
+        Returns the key of a request: a signed 64-bit integer hash of the
+        method, the URL with sorted query parameters, the body data and the
+        kind of response asked for.
+        """
+
+        path, _, query = url.partition('?')
+        canonical = json.dumps([
+            method, path, sorted(parse_qsl(query, True)),
+            sorted((str(name), str(value)) for name, value in data.items()),
+            response])
+
+        digest = hashlib.sha1(canonical.encode('utf-8')).digest()
+
+        return struct.unpack('>q', digest[:8])[0]
+
+    def stats(self):
+
+        """
+        Returns:
+            a dictionary of the mode and the hit, miss and record counters.
+        """
+
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'mode': self._mode,
+                'recorded': self._recorded
+            }
+
+    def _decode(self, blob):
+
+        response = json.loads(zlib.decompress(bytes(blob)).decode('utf-8'))
+
+        # Text responses, e.g. OAuth tokens, are native strings; json
+        # returns unicode on Python 2.
+        if (not isinstance(response, str)) \
+                and isinstance(response, type(u'')):
+            response = response.encode('utf-8')
+
+        return response
+
+class CassetteAdapter(object):
+
+    """
+    Stands in for the API library's OAuth adapter: records its responses
+    to, or replays them from, a cassette.
+
+    URLs are keyed without their scheme and host, so a cassette can be
+    replayed against another 'api_base' with the same path. Failed requests
+    are not recorded; replaying a request that wasn't recorded raises an
+    APIException of type EXCEPTION_CASSETTE_TYPE.
+
+    Constructor args:
+        adapter: aweber_api.oauth.OAuthAdapter;
+        cassette: Cassette.
+    """
+
+    def __init__(self, adapter, cassette):
+
+        self.__dict__['_adapter'] = adapter
+        self.__dict__['_cassette'] = cassette
+
+    def __getattr__(self, name):
+        return getattr(self._adapter, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._adapter, name, value)
+
+    def request(self, method, url, data={}, response='body'):
+
+        """Same as aweber_api.oauth.OAuthAdapter.request."""
+
+        # Relative URLs are expanded the way the adapter does it.
+        parts = urlsplit(
+            url if url.startswith('http') else self._adapter.api_base + url)
+        path = parts.path + ('?' + parts.query if parts.query else '')
+
+        try:
+            key = self._cassette.request_key(method, path, data, response)
+
+            if (self._cassette.replaying):
+                found, result = self._cassette.get(key)
+                if (not found):
+                    raise APIException(EXCEPTION_CASSETTE_TYPE + ': '
+                        + ERROR_CASSETTE_MISS.format(method, path))
+                return result
+
+            result = self._adapter.request(method, url, data, response)
+            self._cassette.put(key, result)
+        except CassetteException as e:
+            raise APIException(EXCEPTION_CASSETTE_TYPE + ': ' + str(e))
+
+        return result
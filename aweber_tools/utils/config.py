@@ -1,14 +1,13 @@
 #!/usr/bin/env python
 
-
-from future import standard_library
-
 from aweber_tools.utils.py_compat import PY_VER_MAJOR
 
 from aweber_tools.include.msg import \
-    ERROR_CONFIG_NO_FILE, ERROR_CONFIG_READ, ERROR_CONFIG_TOO_LARGE
+    ERROR_CONFIG_NO_FILE, ERROR_CONFIG_READ, ERROR_CONFIG_TOO_LARGE, \
+    ERROR_CONFIG_VALUE
 
 import codecs
+import numbers
 from configparser import ConfigParser, RawConfigParser
 
 if PY_VER_MAJOR < 3:
@@ -18,12 +17,63 @@ import os
 
 MAX_FILE_SIZE = 1048576
 SECTION_ACCOUNT = 'account'
+SECTION_API = 'api'
+SECTION_CACHE = 'cache'
 SECTION_FILES = 'files'
+SECTION_PROFILE = 'profile'
 VALUE_ACCESS_TOKEN = 'access_token'
 VALUE_ACCESS_SECRET = 'access_secret'
+VALUE_ACTIVITY_FILE = 'activity_file'
+VALUE_ACTIVITY_SIZE = 'activity_size'
+VALUE_ACTIVITY_TTL = 'activity_ttl'
+VALUE_ACTIVITY_WORKERS = 'activity_workers'
+VALUE_API_BASE = 'api_base'
 VALUE_BACKUP_PATH = 'backup_path'
+VALUE_BURST = 'burst'
+VALUE_CASSETTE_FILE = 'cassette_file'
+VALUE_CASSETTE_MODE = 'cassette_mode'
 VALUE_CONSUMER_KEY = 'consumer_key'
 VALUE_CONSUMER_SECRET = 'consumer_secret'
+VALUE_DELETE_WORKERS = 'delete_workers'
+VALUE_EXPORT_FILE = 'export_file'
+VALUE_EXPORT_FORMAT = 'export_format'
+VALUE_FULL_SYNC_DAYS = 'full_sync_days'
+VALUE_HTTP_POOL_SIZE = 'http_pool_size'
+VALUE_HTTP_TIMEOUT = 'http_timeout'
+VALUE_METRICS_FILE = 'metrics_file'
+VALUE_PAGE_WORKERS = 'page_workers'
+VALUE_PROFILER = 'profiler'
+VALUE_PROFILE_INTERVAL = 'profile_interval'
+VALUE_PROFILE_TOP = 'profile_top'
+VALUE_RATE = 'rate'
+VALUE_STORE_FILE = 'store_file'
+
+# Settings not taken by the Config constructor, all None by default.
+NUMBER_VALUES = (
+    VALUE_ACTIVITY_SIZE,
+    VALUE_ACTIVITY_TTL,
+    VALUE_ACTIVITY_WORKERS,
+    VALUE_BURST,
+    VALUE_DELETE_WORKERS,
+    VALUE_FULL_SYNC_DAYS,
+    VALUE_HTTP_POOL_SIZE,
+    VALUE_HTTP_TIMEOUT,
+    VALUE_PAGE_WORKERS,
+    VALUE_PROFILE_INTERVAL,
+    VALUE_PROFILE_TOP,
+    VALUE_RATE
+)
+STRING_VALUES = (
+    VALUE_ACTIVITY_FILE,
+    VALUE_API_BASE,
+    VALUE_CASSETTE_FILE,
+    VALUE_CASSETTE_MODE,
+    VALUE_EXPORT_FILE,
+    VALUE_EXPORT_FORMAT,
+    VALUE_METRICS_FILE,
+    VALUE_PROFILER,
+    VALUE_STORE_FILE
+)
 
 class ConfigException(Exception):
     pass
@@ -46,6 +96,46 @@ class ConfigData(object):
     def access_secret(self, access_secret):
         self._access_secret = access_secret
 
+    @property
+    def activity_file(self):
+        return self._activity_file
+
+    @activity_file.setter
+    def activity_file(self, activity_file):
+        self._activity_file = activity_file
+
+    @property
+    def activity_size(self):
+        return self._activity_size
+
+    @activity_size.setter
+    def activity_size(self, activity_size):
+        self._activity_size = activity_size
+
+    @property
+    def activity_ttl(self):
+        return self._activity_ttl
+
+    @activity_ttl.setter
+    def activity_ttl(self, activity_ttl):
+        self._activity_ttl = activity_ttl
+
+    @property
+    def activity_workers(self):
+        return self._activity_workers
+
+    @activity_workers.setter
+    def activity_workers(self, activity_workers):
+        self._activity_workers = activity_workers
+
+    @property
+    def api_base(self):
+        return self._api_base
+
+    @api_base.setter
+    def api_base(self, api_base):
+        self._api_base = api_base
+
     @property
     def backup_path(self):
         return self._backup_path
@@ -54,6 +144,30 @@ class ConfigData(object):
     def backup_path(self, backup_path):
         self._backup_path = backup_path
 
+    @property
+    def burst(self):
+        return self._burst
+
+    @burst.setter
+    def burst(self, burst):
+        self._burst = burst
+
+    @property
+    def cassette_file(self):
+        return self._cassette_file
+
+    @cassette_file.setter
+    def cassette_file(self, cassette_file):
+        self._cassette_file = cassette_file
+
+    @property
+    def cassette_mode(self):
+        return self._cassette_mode
+
+    @cassette_mode.setter
+    def cassette_mode(self, cassette_mode):
+        self._cassette_mode = cassette_mode
+
     @property
     def consumer_key(self):
         return self._consumer_key
@@ -70,11 +184,161 @@ class ConfigData(object):
     def consumer_secret(self, consumer_secret):
         self._consumer_secret = consumer_secret
 
+    @property
+    def delete_workers(self):
+        return self._delete_workers
+
+    @delete_workers.setter
+    def delete_workers(self, delete_workers):
+        self._delete_workers = delete_workers
+
+    @property
+    def export_file(self):
+        return self._export_file
+
+    @export_file.setter
+    def export_file(self, export_file):
+        self._export_file = export_file
+
+    @property
+    def export_format(self):
+        return self._export_format
+
+    @export_format.setter
+    def export_format(self, export_format):
+        self._export_format = export_format
+
+    @property
+    def full_sync_days(self):
+        return self._full_sync_days
+
+    @full_sync_days.setter
+    def full_sync_days(self, full_sync_days):
+        self._full_sync_days = full_sync_days
+
+    @property
+    def http_pool_size(self):
+        return self._http_pool_size
+
+    @http_pool_size.setter
+    def http_pool_size(self, http_pool_size):
+        self._http_pool_size = http_pool_size
+
+    @property
+    def http_timeout(self):
+        return self._http_timeout
+
+    @http_timeout.setter
+    def http_timeout(self, http_timeout):
+        self._http_timeout = http_timeout
+
+    @property
+    def metrics_file(self):
+        return self._metrics_file
+
+    @metrics_file.setter
+    def metrics_file(self, metrics_file):
+        self._metrics_file = metrics_file
+
+    @property
+    def page_workers(self):
+        return self._page_workers
+
+    @page_workers.setter
+    def page_workers(self, page_workers):
+        self._page_workers = page_workers
+
+    @property
+    def profile_interval(self):
+        return self._profile_interval
+
+    @profile_interval.setter
+    def profile_interval(self, profile_interval):
+        self._profile_interval = profile_interval
+
+    @property
+    def profile_top(self):
+        return self._profile_top
+
+    @profile_top.setter
+    def profile_top(self, profile_top):
+        self._profile_top = profile_top
+
+    @property
+    def profiler(self):
+        return self._profiler
+
+    @profiler.setter
+    def profiler(self, profiler):
+        self._profiler = profiler
+
+    @property
+    def rate(self):
+        return self._rate
+
+    @rate.setter
+    def rate(self, rate):
+        self._rate = rate
+
+    @property
+    def store_file(self):
+        return self._store_file
+
+    @store_file.setter
+    def store_file(self, store_file):
+        self._store_file = store_file
+
 class Config(ConfigData):
 
     """
     Application settings.
 
+    Settings not taken by the constructor are set through their properties,
+    None standing for their default:
+        rate: float, sustained API requests per second;
+        burst: int, API requests allowed back to back;
+        page_workers: int, collection pages fetched concurrently;
+        activity_workers: int, concurrent subscriber activity lookups;
+        store_file: SQLite file keeping a local copy of the subscribers,
+                    relative to 'backup_path', None to always use the API;
+        full_sync_days: int, days after which the store is downloaded in
+                        full again, None to only sync changes;
+        activity_ttl: float, seconds subscriber activity stays cached, None
+                      to disable the cache;
+        activity_size: int, subscribers kept in the in-memory activity
+                       cache;
+        activity_file: SQLite file of the on-disk activity cache, relative
+                       to 'backup_path', None to keep it in memory only;
+        delete_workers: int, concurrent subscriber deletions;
+        export_format: format of exported subscribers, one of
+                       aweber_tools.utils.export_formats.EXPORT_FORMATS,
+                       None for CSV;
+        export_file: exported file name relative to 'backup_path', '-' for
+                     the standard output, None for a name made of the
+                     current time;
+        api_base: API root URL, e.g. of a local fake API for benchmarks,
+                  None for AWeber's;
+        cassette_file: SQLite file recording API responses, relative to
+                       'backup_path', None to use the API directly;
+        cassette_mode: 'record' to record API responses to
+                       'cassette_file', 'replay' to answer requests from it
+                       without network access, None for 'replay';
+        metrics_file: file the client metrics are written to after each
+                      action, relative to 'backup_path', in the Prometheus
+                      text format if it ends with '.prom', as JSON
+                      otherwise; None not to write them;
+        profiler: 'cprofile' or 'sampling' to profile each action, see
+                  aweber_tools.utils.profiler, None not to profile;
+        profile_interval: float, seconds between samples of the sampling
+                          profiler;
+        profile_top: int, modules listed in the profile summary;
+        http_pool_size: int, kept-alive HTTP connections per host shared by
+                        the API requests;
+        http_timeout: float, seconds to wait for an HTTP connection or
+                      response.
+
+    Numeric settings must be positive, see 'validate'.
+
     Constructor args:
         access_token, access_secret: an AWeber account's keys for access to
             itself via the API;
@@ -87,18 +351,16 @@ class Config(ConfigData):
             self, access_token=None, access_secret=None, consumer_key=None,
             consumer_secret=None, backup_path=None, filename=None):
 
-        if filename is None:
-            self._access_token = access_token
-            self._access_secret = access_secret
-            self._consumer_key = consumer_key
-            self._consumer_secret = consumer_secret
-            self._backup_path = backup_path
-        else:
-            self._access_token = None
-            self._access_secret = None
-            self._consumer_key = None
-            self._consumer_secret = None
-            self._backup_path = None
+        self._access_token = access_token
+        self._access_secret = access_secret
+        self._consumer_key = consumer_key
+        self._consumer_secret = consumer_secret
+        self._backup_path = backup_path
+
+        for name in NUMBER_VALUES + STRING_VALUES:
+            setattr(self, '_' + name, None)
+
+        if filename is not None:
             self.load_from_file(filename)
 
     def load_from_file(self, filename=None):
@@ -177,6 +439,40 @@ class Config(ConfigData):
             self.backup_path = ''
         self.backup_path = self.backup_path.strip()
 
+        self.rate = self._get_number(SECTION_API, VALUE_RATE, float)
+        self.burst = self._get_number(SECTION_API, VALUE_BURST, int)
+        self.page_workers = self._get_number(
+            SECTION_API, VALUE_PAGE_WORKERS, int)
+        self.activity_workers = self._get_number(
+            SECTION_API, VALUE_ACTIVITY_WORKERS, int)
+        self.delete_workers = self._get_number(
+            SECTION_API, VALUE_DELETE_WORKERS, int)
+        self.store_file = self._get_string(SECTION_FILES, VALUE_STORE_FILE)
+        self.full_sync_days = self._get_number(
+            SECTION_FILES, VALUE_FULL_SYNC_DAYS, int)
+        self.activity_ttl = self._get_number(
+            SECTION_CACHE, VALUE_ACTIVITY_TTL, float)
+        self.activity_size = self._get_number(
+            SECTION_CACHE, VALUE_ACTIVITY_SIZE, int)
+        self.activity_file = self._get_string(
+            SECTION_CACHE, VALUE_ACTIVITY_FILE)
+        self.export_format = self._get_string(
+            SECTION_FILES, VALUE_EXPORT_FORMAT)
+        self.export_file = self._get_string(SECTION_FILES, VALUE_EXPORT_FILE)
+        self.api_base = self._get_string(SECTION_API, VALUE_API_BASE)
+        self.cassette_file = self._get_string(SECTION_API, VALUE_CASSETTE_FILE)
+        self.cassette_mode = self._get_string(SECTION_API, VALUE_CASSETTE_MODE)
+        self.metrics_file = self._get_string(SECTION_FILES, VALUE_METRICS_FILE)
+        self.profiler = self._get_string(SECTION_PROFILE, VALUE_PROFILER)
+        self.profile_interval = self._get_number(
+            SECTION_PROFILE, VALUE_PROFILE_INTERVAL, float)
+        self.profile_top = self._get_number(
+            SECTION_PROFILE, VALUE_PROFILE_TOP, int)
+        self.http_pool_size = self._get_number(
+            SECTION_API, VALUE_HTTP_POOL_SIZE, int)
+        self.http_timeout = self._get_number(
+            SECTION_API, VALUE_HTTP_TIMEOUT, float)
+
     def save_tokens(
             self, access_token=None, access_secret=None, filename=None):
 
@@ -216,6 +512,56 @@ class Config(ConfigData):
         except Exception as e:
             raise ConfigException(str(e))
 
+    def validate(self):
+
+        """
+        Checks the numeric settings: each must be None or positive, so
+        that e.g. a rate of 0 isn't taken for the default.
+
+        Raises:
+            ConfigException.
+        """
+
+        for name in NUMBER_VALUES:
+            value = getattr(self, name)
+            if (value is None):
+                continue
+            if (isinstance(value, bool)) \
+                    or (not isinstance(value, numbers.Real)) \
+                    or (not value > 0):
+                raise ConfigException(ERROR_CONFIG_VALUE.format(name))
+
+    def _get_number(self, section, name, cast):
+
+        # Missing and empty values are None, malformed ones are an error.
+
+        try:
+            value = self._parser.get(section, name)
+        except:
+            return None
+
+        if (value is None) or (not value.strip()):
+            return None
+
+        try:
+            return cast(value.strip())
+        except ValueError:
+            raise ConfigException(ERROR_CONFIG_VALUE.format(name))
+
+    def _get_string(self, section, name):
+
+        # Missing and empty values are None.
+
+        try:
+            value = self._parser.get(section, name)
+        except:
+            return None
+
+        if (value is None) or (not value.strip()):
+            return None
+
+        return value.strip()
+
 class UnicodeConfigParser(RawConfigParser):
  
     def __init__(self, *args, **kwargs):
@@ -1,17 +1,37 @@
 #!/usr/bin/env python
 
-from aweber_tools.include.msg import ERROR_DATE_STRING
+from aweber_tools.include.msg import ERROR_DATE_STRING, ERROR_DATE_VALUE
 
 from datetime import datetime, timedelta
 
+import calendar
+import threading
+
+try:
+    from functools import lru_cache
+except ImportError:
+    lru_cache = None
+
+CACHE_SIZE = 65536
 FORMAT_DATETIME = '%Y-%m-%d %H:%M:%S'
 
+# 'YYYY-MM-DD HH:MM:SS+HH:MM', the layout of AWeber API dates.
+LAYOUT_LENGTH = 25
+LAYOUT_SEPARATORS = ((4, '-'), (7, '-'), (10, ' '), (13, ':'), (16, ':'),
+                     (22, ':'))
+
 class DateFormatException(Exception):
     pass
 
 class DateFormat(object):
 
-    """Date formatting utils."""
+    """
+    Date formatting utils.
+
+    Dates in the API's fixed layout are parsed by position, others with
+    'strptime'. Parsed values are kept in an LRU cache shared by all
+    instances.
+    """
 
     def get_date(self, date_string):
 
@@ -28,24 +48,151 @@ class DateFormat(object):
             DateFormatException.
         """
 
+        return _get_date(self._check(date_string))
+
+    def get_dates(self, date_strings):
+
+        """
+        Converts strings to datetime objects, see 'get_date'.
+
+        Args:
+            date_strings: an iterable of string representations of dates.
+
+        Returns:
+            a list of datetime.
+
+        Raises:
+            DateFormatException.
+        """
+
+        check = self._check
+        return [_get_date(check(date_string)) for date_string in date_strings]
+
+    def get_timestamp(self, date_string):
+
+        """
+        Converts a string to seconds since the epoch, taking its time zone
+        offset into account.
+
+        Args:
+            date_string: a string representation of a date value.
+
+        Returns:
+            int: the converted result.
+
+        Raises:
+            DateFormatException.
+        """
+
+        return _get_timestamp(self._check(date_string))
+
+    def get_timestamps(self, date_strings):
+
+        """
+        Converts strings to seconds since the epoch, see 'get_timestamp'.
+
+        Args:
+            date_strings: an iterable of string representations of dates.
+
+        Returns:
+            a list of int.
+
+        Raises:
+            DateFormatException.
+        """
+
+        check = self._check
+        return [_get_timestamp(check(date_string))
+                for date_string in date_strings]
+
+    def _check(self, date_string):
+
         if (date_string is None):
             raise DateFormatException(ERROR_DATE_STRING)
 
-        # Remove ":" character from TimeZone
-        formatted_timezone = date_string[:-3] + date_string[-2:]
+        return date_string
+
+def _memoize(func):
+
+    # functools.lru_cache where available. Otherwise a dictionary that is
+    # emptied when full, which is cheaper than a pure Python LRU.
+
+    if (lru_cache is not None):
+        return lru_cache(maxsize=CACHE_SIZE)(func)
+
+    cache = {}
+    lock = threading.Lock()
 
+    def memoized(value):
+        try:
+            return cache[value]
+        except KeyError:
+            pass
+        result = func(value)
+        with lock:
+            if (len(cache) >= CACHE_SIZE):
+                cache.clear()
+            cache[value] = result
+        return result
+
+    return memoized
+
+def _parse(date_string):
+
+    # Returns (naive datetime, offset seconds). Building the datetime
+    # checks the fields' ranges.
+
+    if (len(date_string) == LAYOUT_LENGTH) \
+            and (date_string[19] in '+-') \
+            and all(date_string[i] == char for i, char in LAYOUT_SEPARATORS):
+        try:
+            date = datetime(int(date_string[0:4]), int(date_string[5:7]),
+                            int(date_string[8:10]), int(date_string[11:13]),
+                            int(date_string[14:16]), int(date_string[17:19]))
+            offset = (int(date_string[20:22]) * 60
+                      + int(date_string[23:25])) * 60
+        except ValueError:
+            raise DateFormatException(ERROR_DATE_VALUE.format(date_string))
+        if (date_string[19] == '-'):
+            offset = -offset
+        return date, offset
+
+    return _parse_strptime(date_string)
+
+def _parse_strptime(date_string):
+
+    # Remove ":" character from TimeZone
+    formatted_timezone = date_string[:-3] + date_string[-2:]
+
+    try:
         # Calculate timeZone Offset In Seconds
         timezone_offset_str = formatted_timezone[-5:]
-        timezone_offset = \
-            int(timezone_offset_str[-4:-2])*60 + int(timezone_offset_str[-2:])
+        timezone_offset = int(timezone_offset_str[-4:-2]) * 60 \
+            + int(timezone_offset_str[-2:])
         timezone_offset *= 60
 
         if timezone_offset_str[0] == '-':
             timezone_offset = -timezone_offset
 
-        # Format Date to DateTime object with offset
         formatted_date = datetime.strptime(formatted_timezone[:-5],
                                            FORMAT_DATETIME)
-        formatted_date += timedelta(seconds=timezone_offset)
+    except ValueError:
+        raise DateFormatException(ERROR_DATE_VALUE.format(date_string))
+
+    return formatted_date, timezone_offset
+
+@_memoize
+def _get_date(date_string):
+
+    # Local time fields shifted by the offset, as get_date always did.
+
+    date, offset = _parse(date_string)
+
+    return date + timedelta(seconds=offset)
+
+@_memoize
+def _get_timestamp(date_string):
+
+    date, offset = _parse(date_string)
 
-        return formatted_date
\ No newline at end of file
+    return calendar.timegm(date.timetuple()) - offset
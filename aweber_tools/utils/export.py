@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+
+from abc import ABCMeta, abstractmethod
+
+from aweber_tools.utils.py_compat import PY_VER_MAJOR, monotonic
+
+from datetime import datetime
+
+import os
+import sys
+
+BUFFER_SIZE = 1024 * 1024
+CHUNK_ROWS = 1000
+DATE_FORMAT = '%Y-%m-%d_%H.%M.%S'
+PROGRESS_ROWS = 10000
+
+# Export file name standing for the standard output.
+STDOUT_FILENAME = '-'
+
+# Subscriber fields written by the exporters that are not bound to the
+# legacy CSV layout, 'custom_fields' and 'tags' are JSON values.
+FIELDS_EXPORT = (
+    'id',
+    'ad_tracking',
+    'area_code',
+    'city',
+    'country',
+    'custom_fields',
+    'dma_code',
+    'email',
+    'ip_address',
+    'is_verified',
+    'last_followup_message_number_sent',
+    'last_followup_sent',
+    'last_followup_sent_at',
+    'latitude',
+    'longitude',
+    'misc_notes',
+    'name',
+    'postal_code',
+    'region',
+    'self_link',
+    'status',
+    'subscribed_at',
+    'subscription_method',
+    'subscription_url',
+    'tags',
+    'unsubscribe_method',
+    'unsubscribed_at',
+    'verified_at'
+)
+
+class ExportException(Exception):
+    pass
+
+class Exporter(object):
+
+    """Subscriber exporter interface."""
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def export(self, subscribers, save_path, filename=None):
+        """
+        Writes subscribers to a file, returns (rows, rows per second).
+        """
+        pass
+
+class ExportBase(object):
+
+    """
+    Base streaming exporter.
+
+    Rows are written while 'subscribers' is being consumed, so an iterator
+    over API pages is exported page by page instead of being collected
+    first. Subclasses render subscribers in '_render_subscriber' and write
+    chunks of up to CHUNK_ROWS rendered rows in '_write_rows', between
+    '_open' and '_close'. '_finish' is called after the last chunk unless
+    the export failed.
+
+    Constructor args:
+        on_progress: optional callable taking (rows, rows_per_sec), called
+                     every 'progress_rows' exported rows;
+        progress_rows: rows between 'on_progress' calls;
+        clock: monotonic time function, for tests.
+    """
+
+    # Exception raised by 'export'.
+    exception = ExportException
+
+    # Extension of generated file names.
+    extension = ''
+
+    def __init__(self, on_progress=None, progress_rows=PROGRESS_ROWS,
+                 clock=None):
+
+        self._on_progress = on_progress
+        self._progress_rows = max(1, progress_rows)
+        self._clock = clock or monotonic
+
+    def export(self, subscribers, save_path, filename=None):
+
+        """
+            Saves API's 'Subscriber' entries to a file.
+
+            Args:
+                subscribers: iterable of models.subscribers.Subscriber
+                    instances, may be a generator;
+                save_path: store the generated file here;
+                filename: file name relative to 'save_path', STDOUT_FILENAME
+                    for the standard output if the format supports it, None
+                    for a name made of the current time.
+
+            Returns:
+                Tuple (exported rows count, rows per second).
+
+            Raises:
+                ExportException.
+        """
+
+        if (not filename):
+            filename = datetime.now().strftime(DATE_FORMAT) + self.extension
+
+        if (filename != STDOUT_FILENAME):
+            filename = os.path.join(save_path, filename)
+
+        started = self._clock()
+        rows = 0
+        next_progress = self._progress_rows
+
+        try:
+            self._open(filename)
+            try:
+                chunk = []
+                for subscriber in subscribers:
+                    chunk.append(self._render_subscriber(subscriber))
+                    if (len(chunk) < CHUNK_ROWS):
+                        continue
+
+                    self._write_rows(chunk)
+                    rows += len(chunk)
+                    chunk = []
+
+                    if (rows >= next_progress):
+                        next_progress = rows + self._progress_rows
+                        self._report(rows, started)
+
+                self._write_rows(chunk)
+                rows += len(chunk)
+                self._finish()
+            finally:
+                self._close()
+        except ExportException:
+            raise
+        except Exception as e:
+            raise self.exception(str(e))
+
+        return rows, self._rate(rows, started)
+
+    def _close(self):
+        pass
+
+    def _close_stream(self, stream):
+
+        # Closes a stream from '_open_binary' or '_open_text', the standard
+        # output is only flushed.
+
+        stdout = self._standard_output()
+        if (stream in (stdout, getattr(stdout, 'buffer', None))):
+            stream.flush()
+        else:
+            stream.close()
+
+    def _finish(self):
+        pass
+
+    def _open(self, filename):
+        pass
+
+    def _open_binary(self, filename):
+
+        # Opens 'filename' or the standard output for buffered byte writes.
+
+        if (filename != STDOUT_FILENAME):
+            return open(filename, 'wb', BUFFER_SIZE)
+
+        stdout = self._standard_output()
+        return getattr(stdout, 'buffer', stdout)
+
+    def _open_text(self, filename, newline=None):
+
+        # Opens 'filename' or the standard output for buffered writes of
+        # the native 'str' type: bytes on Python 2, text on Python 3.
+
+        if (PY_VER_MAJOR < 3):
+            return self._open_binary(filename)
+
+        if (filename != STDOUT_FILENAME):
+            return open(filename, 'w', buffering=BUFFER_SIZE,
+                        encoding='utf-8', newline=newline)
+
+        return self._standard_output()
+
+    def _rate(self, rows, started):
+
+        elapsed = self._clock() - started
+
+        if (elapsed <= 0):
+            return 0.0
+
+        return rows / float(elapsed)
+
+    def _render_subscriber(self, subscriber):
+        return subscriber
+
+    def _report(self, rows, started):
+
+        if (self._on_progress is not None):
+            self._on_progress(rows, self._rate(rows, started))
+
+    def _standard_output(self):
+
+        # The process' standard output, also while 'sys.stdout' is
+        # redirected, e.g. by the headless runner printing its messages to
+        # the standard error.
+
+        return sys.__stdout__ or sys.stdout
+
+    def _subscriber_values(self, subscriber):
+
+        # Values of FIELDS_EXPORT, in order.
+
+        return [getattr(subscriber, field, None) for field in FIELDS_EXPORT]
+
+    def _write_rows(self, rows):
+        pass
@@ -1,16 +1,11 @@
 #!/usr/bin/env python
 
-from future import standard_library
-
+from aweber_tools.utils.export import ExportBase, ExportException, Exporter
 from aweber_tools.utils.py_compat import PY_VER_MAJOR
 
 import csv
-from datetime import datetime
-
-if PY_VER_MAJOR < 3:
-    from io import open
-
-import os
+import gzip
+import io
 
 COLS_SUBSCRIBER = [
     'Email',
@@ -35,42 +30,39 @@ COLS_SUBSCRIBER = [
 ]
 
 CSV_DELIMITER = ','
-DATE_FORMAT = '%Y-%m-%d_%H.%M.%S'
 FILE_EXTENSION = '.csv'
+FILE_EXTENSION_GZIP = '.csv.gz'
 
-class ExportCsvException(Exception):
+# zlib's default level, 9 is several times slower for a few percent less.
+GZIP_LEVEL = 6
+
+class ExportCsvException(ExportException):
     pass
 
-class ExportCsv(object):
+class ExportCsv(ExportBase):
 
-    """Exports subscriber data as CSV."""
+    """
+    Exports subscriber data as CSV.
 
-    def export(self, subscribers, save_path):
+    See aweber_tools.utils.export.ExportBase for constructor args.
+    """
 
-        """
-            Saves a list of API's 'Subscriber' entries to a CSV file.
+    exception = ExportCsvException
+    extension = FILE_EXTENSION
 
-            Args:
-                subscribers: list of models.subscribers.Subscriber instances;
-                save_path: store the generated file here.
+    def _close(self):
+        self._close_stream(self._file)
 
-            Raises:
-                ExportCsvException.
-        """
+    def _open(self, filename):
 
-        filename = os.path.join(
-            save_path, datetime.now().strftime(DATE_FORMAT) + FILE_EXTENSION)
+        self._file = self._open_text(filename, newline='')
+        self._open_writer(self._file)
 
-        try:
-            with open(filename, 'wb') as csvfile:
-                out = csv.writer(csvfile, delimiter=CSV_DELIMITER,
-                                 quoting=csv.QUOTE_ALL)
-                out.writerow(COLS_SUBSCRIBER)
-                for subscriber in subscribers:
-                    entry = self._render_subscriber(subscriber)
-                    out.writerow(entry)
-        except Exception as e:
-            raise ExportCsvException(str(e))
+    def _open_writer(self, stream):
+
+        self._writer = csv.writer(stream, delimiter=CSV_DELIMITER,
+                                  quoting=csv.QUOTE_ALL)
+        self._writer.writerow(COLS_SUBSCRIBER)
 
     def _render_subscriber(self, subscriber):
 
@@ -94,4 +86,42 @@ class ExportCsv(object):
             subscriber.longitude,
             subscriber.dma_code,
             subscriber.area_code
-        ]
\ No newline at end of file
+        ]
+
+    def _write_rows(self, rows):
+        self._writer.writerows(rows)
+
+class ExportCsvGzip(ExportCsv):
+
+    """
+    Exports subscriber data as gzip-compressed CSV, same layout as
+    'ExportCsv'.
+    """
+
+    extension = FILE_EXTENSION_GZIP
+
+    def _close(self):
+
+        try:
+            self._text.close()
+        finally:
+            self._close_stream(self._file)
+
+    def _open(self, filename):
+
+        self._file = self._open_binary(filename)
+        self._gzip = gzip.GzipFile(
+            fileobj=self._file, mode='wb', compresslevel=GZIP_LEVEL)
+
+        # GzipFile takes bytes, which the csv module writes on Python 2
+        # only. Closing the wrappers doesn't close '_file'.
+        if (PY_VER_MAJOR < 3):
+            self._text = self._gzip
+        else:
+            self._text = io.TextIOWrapper(
+                self._gzip, encoding='utf-8', newline='')
+
+        self._open_writer(self._text)
+
+Exporter.register(ExportCsv)
+Exporter.register(ExportCsvGzip)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+
+from aweber_tools.include.msg import ERROR_EXPORT_FORMAT
+
+from aweber_tools.utils.export import ExportException
+from aweber_tools.utils.export_csv import ExportCsv, ExportCsvGzip
+from aweber_tools.utils.export_jsonl import ExportJsonLines
+from aweber_tools.utils.export_sqlite import ExportSqlite
+
+FORMAT_CSV = 'csv'
+FORMAT_CSV_GZIP = 'csv.gz'
+FORMAT_JSON_LINES = 'jsonl'
+FORMAT_SQLITE = 'sqlite'
+
+DEFAULT_FORMAT = FORMAT_CSV
+
+EXPORT_FORMATS = {
+    FORMAT_CSV: ExportCsv,
+    FORMAT_CSV_GZIP: ExportCsvGzip,
+    FORMAT_JSON_LINES: ExportJsonLines,
+    FORMAT_SQLITE: ExportSqlite
+}
+
+def create_exporter(export_format=None, on_progress=None):
+
+    """
+    Creates the exporter of a format.
+
+    Args:
+        export_format: one of EXPORT_FORMATS' keys, None for DEFAULT_FORMAT;
+        on_progress: see aweber_tools.utils.export.ExportBase.
+
+    Returns:
+        an aweber_tools.utils.export.Exporter.
+
+    Raises:
+        ExportException.
+    """
+
+    export_format = (export_format or DEFAULT_FORMAT).lower()
+
+    if (export_format not in EXPORT_FORMATS):
+        raise ExportException(ERROR_EXPORT_FORMAT.format(
+            export_format, ', '.join(sorted(EXPORT_FORMATS))))
+
+    return EXPORT_FORMATS[export_format](on_progress)
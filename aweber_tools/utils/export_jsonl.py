@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+from aweber_tools.utils.export import \
+    ExportBase, ExportException, Exporter, FIELDS_EXPORT
+
+import json
+
+FILE_EXTENSION = '.jsonl'
+
+class ExportJsonLinesException(ExportException):
+    pass
+
+class ExportJsonLines(ExportBase):
+
+    """
+    Exports subscriber data as JSON Lines, one object of FIELDS_EXPORT per
+    subscriber. Can write to the standard output for piping.
+
+    See aweber_tools.utils.export.ExportBase for constructor args.
+    """
+
+    exception = ExportJsonLinesException
+    extension = FILE_EXTENSION
+
+    def _close(self):
+        self._close_stream(self._file)
+
+    def _open(self, filename):
+        self._file = self._open_text(filename)
+
+    def _render_subscriber(self, subscriber):
+
+        return json.dumps(
+            dict(zip(FIELDS_EXPORT, self._subscriber_values(subscriber))),
+            sort_keys=True)
+
+    def _write_rows(self, rows):
+
+        if (rows):
+            self._file.write('\n'.join(rows) + '\n')
+
+Exporter.register(ExportJsonLines)
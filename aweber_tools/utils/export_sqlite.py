@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+from aweber_tools.include.msg import ERROR_EXPORT_STDOUT
+
+from aweber_tools.utils.export import \
+    ExportBase, ExportException, Exporter, FIELDS_EXPORT, STDOUT_FILENAME
+
+import json
+import sqlite3
+
+FIELDS_JSON = ('custom_fields', 'tags')
+FIELDS_INDEXED = ('email', 'status', 'subscribed_at', 'unsubscribed_at')
+FILE_EXTENSION = '.sqlite'
+
+SQL_SCHEMA = '''
+DROP TABLE IF EXISTS subscribers;
+CREATE TABLE subscribers (
+    id INTEGER PRIMARY KEY,
+    {0}
+);
+'''.format(',\n    '.join(FIELDS_EXPORT[1:]))
+
+SQL_INDEXES = ''.join(
+    'CREATE INDEX subscribers_{0} ON subscribers ({0});\n'.format(field)
+    for field in FIELDS_INDEXED)
+
+SQL_INSERT = 'INSERT OR REPLACE INTO subscribers ({0}) VALUES ({1})'.format(
+    ', '.join(FIELDS_EXPORT), ', '.join('?' * len(FIELDS_EXPORT)))
+
+class ExportSqliteException(ExportException):
+    pass
+
+class ExportSqlite(ExportBase):
+
+    """
+    Exports subscriber data to an SQLite file with a 'subscribers' table of
+    FIELDS_EXPORT, indexed on FIELDS_INDEXED. An existing table is replaced.
+
+    Rows are inserted in a single transaction and the indexes are built
+    after the load, which is faster than maintaining them row by row.
+
+    See aweber_tools.utils.export.ExportBase for constructor args.
+    """
+
+    exception = ExportSqliteException
+    extension = FILE_EXTENSION
+
+    def _close(self):
+        self._db.close()
+
+    def _finish(self):
+
+        self._db.executescript(SQL_INDEXES)
+        self._db.commit()
+
+    def _open(self, filename):
+
+        if (filename == STDOUT_FILENAME):
+            raise ExportSqliteException(ERROR_EXPORT_STDOUT)
+
+        self._db = sqlite3.connect(filename)
+        self._db.executescript(SQL_SCHEMA)
+
+    def _render_subscriber(self, subscriber):
+
+        values = self._subscriber_values(subscriber)
+
+        for field in FIELDS_JSON:
+            i = FIELDS_EXPORT.index(field)
+            if (values[i] is not None):
+                values[i] = json.dumps(values[i])
+
+        return values
+
+    def _write_rows(self, rows):
+
+        self._db.executemany(SQL_INSERT, rows)
+
+Exporter.register(ExportSqlite)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+
+from aweber_api.oauth import OAuthAdapter
+
+from aweber_tools.include.msg import ERROR_HTTP_POOL_SIZE
+
+import httplib2
+import oauth2
+import threading
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+DEFAULT_SIZE = 10
+DEFAULT_TIMEOUT = 60.0
+
+class HttpPoolException(Exception):
+    pass
+
+class HttpPoolData(object):
+
+    @property
+    def connections(self):
+        return self._connections
+
+    @property
+    def discarded(self):
+        return self._discarded
+
+    @property
+    def requests(self):
+        return self._requests
+
+    @property
+    def reused(self):
+
+        """Requests sent on a kept-alive connection."""
+
+        return max(self._requests - self._connections, 0)
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+class HttpPool(HttpPoolData):
+
+    """
+    Pool of keep-alive HTTP clients shared between threads.
+
+    A request borrows an idle httplib2 client, which keeps one connection
+    open per host, and returns it afterwards, so that consecutive requests
+    skip the TCP and TLS handshakes. When all clients are busy, a new one is
+    created rather than waiting; at most 'size' idle clients are kept, the
+    surplus ones are closed when returned.
+
+    'connections' counts the connections opened, 'reused' the requests sent
+    on an already open one.
+
+    Constructor args:
+        size: int, idle clients kept, i.e. kept-alive connections per host,
+              default: DEFAULT_SIZE;
+        timeout: float, seconds to wait for a connection or a response,
+                 default: DEFAULT_TIMEOUT.
+
+    Constructor raises:
+        HttpPoolException.
+    """
+
+    def __init__(self, size=DEFAULT_SIZE, timeout=DEFAULT_TIMEOUT):
+
+        if (size is None):
+            size = DEFAULT_SIZE
+
+        if (size < 1):
+            raise HttpPoolException(ERROR_HTTP_POOL_SIZE)
+
+        self._size = size
+        self._timeout = timeout or DEFAULT_TIMEOUT
+        self._idle = []
+        self._lock = threading.Lock()
+        self._connections = 0
+        self._discarded = 0
+        self._requests = 0
+
+        # httplib2 creates a client's connections from these classes, which
+        # count the connections opened by this pool.
+        self._connection_types = {
+            'http': _counting_connection(
+                httplib2.HTTPConnectionWithTimeout, self._count_connection),
+            'https': _counting_connection(
+                httplib2.HTTPSConnectionWithTimeout, self._count_connection)
+        }
+
+    def close(self):
+
+        """Closes the idle clients' connections."""
+
+        with self._lock:
+            idle = self._idle
+            self._idle = []
+
+        for http in idle:
+            self._close_http(http)
+
+    def request(self, uri, method='GET', body=None, headers=None,
+                consumer=None, token=None):
+
+        """
+        Sends a request on a pooled connection.
+
+        Args:
+            uri: absolute URL;
+            method: HTTP method;
+            body: request body string, or None;
+            headers: dictionary of request headers, or None;
+            consumer: oauth2.Consumer signing the request, None to send it
+                      unsigned;
+            token: oauth2.Token signing the request with 'consumer', or
+                   None.
+
+        Returns:
+            tuple (httplib2.Response, content string).
+
+        Raises:
+            whatever httplib2 raises, e.g. socket.error or
+            httplib2.HttpLib2Error.
+        """
+
+        connection_type = self._connection_types.get(
+            urlsplit(uri).scheme.lower())
+        http = self._acquire()
+
+        try:
+            if (consumer is None):
+                return httplib2.Http.request(
+                    http, uri, method, body, headers,
+                    connection_type=connection_type)
+
+            http.consumer = consumer
+            http.token = token
+
+            return http.request(uri, method, body, headers,
+                                connection_type=connection_type)
+        finally:
+            self._release(http)
+
+    def stats(self):
+
+        """
+        Returns a dictionary of 'size', 'idle', 'requests', 'connections',
+        'reused' and 'discarded' clients.
+        """
+
+        with self._lock:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'requests': self._requests,
+                'connections': self._connections,
+                'reused': self.reused,
+                'discarded': self._discarded
+            }
+
+    def _acquire(self):
+
+        with self._lock:
+            self._requests += 1
+            if (self._idle):
+                return self._idle.pop()
+
+        # The OAuth client is an httplib2 client that can also sign
+        # requests.
+        return oauth2.Client(None, timeout=self._timeout)
+
+    def _close_http(self, http):
+
+        for connection in list(http.connections.values()):
+            connection.close()
+
+        http.connections.clear()
+
+    def _count_connection(self):
+
+        with self._lock:
+            self._connections += 1
+
+    def _release(self, http):
+
+        http.consumer = None
+        http.token = None
+
+        # The most recently used client is borrowed first, its connection is
+        # the least likely to have been closed by the server.
+        with self._lock:
+            if (len(self._idle) < self._size):
+                self._idle.append(http)
+                return
+            self._discarded += 1
+
+        self._close_http(http)
+
+class PooledOAuthAdapter(OAuthAdapter):
+
+    """
+    The API library's OAuth adapter, sending its requests through an
+    HttpPool instead of opening a connection per request.
+
+    Constructor args:
+        adapter: aweber_api.oauth.OAuthAdapter, whose keys, API root URL
+                 and user are taken over;
+        pool: HttpPool.
+    """
+
+    def __init__(self, adapter, pool):
+
+        OAuthAdapter.__init__(
+            self, adapter.key, adapter.secret, adapter.api_base)
+
+        self.user = adapter.user
+        self.pool = pool
+
+    def _get_client(self):
+
+        token = self.user.get_highest_priority_token()
+        if (token):
+            token = oauth2.Token(token, self.user.token_secret)
+
+        return _PooledClient(self.pool, self.consumer, token or None)
+
+class _PooledClient(object):
+
+    # Stands in for the oauth2.Client the adapter creates per request.
+
+    def __init__(self, pool, consumer, token):
+
+        self._pool = pool
+        self._consumer = consumer
+        self._token = token
+
+    def request(self, uri, method='GET', body=None, headers=None):
+
+        return self._pool.request(
+            uri, method, body, headers, self._consumer, self._token)
+
+def _counting_connection(base, on_connect):
+
+    # A subclass of the httplib2 connection class 'base' calling
+    # 'on_connect' whenever it opens a connection.
+
+    class Connection(base):
+
+        def connect(self):
+            on_connect()
+            base.connect(self)
+
+    return Connection
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+
+import importlib
+
+class LazyModule(object):
+
+    """
+    Stands in for a module that is imported on first attribute access, so
+    that importing a module using a rarely needed dependency doesn't load
+    it.
+
+    An 'except lazy.Error' clause only looks the exception class up when an
+    exception is being handled, so catching a lazy module's exceptions
+    doesn't import it either.
+
+    Constructor args:
+        name: absolute module name, e.g. 'webbrowser'.
+    """
+
+    def __init__(self, name):
+
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __repr__(self):
+        return '<lazy module {0!r}>'.format(self._name)
+
+    @property
+    def loaded(self):
+
+        """Tells if the module has been imported."""
+
+        return self._module is not None
+
+    def _load(self):
+
+        # The import lock makes concurrent first uses import it once.
+        if (self._module is None):
+            self.__dict__['_module'] = importlib.import_module(self._name)
+
+        return self._module
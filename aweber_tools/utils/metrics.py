@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+
+from aweber_tools.utils.py_compat import PY_VER_MAJOR, monotonic
+
+import bisect
+import json
+import os
+import threading
+import time
+
+# Not a failed 'urllib.parse' import on Python 2, which loads 'urllib' and
+# with it 'socket' and 'ssl'.
+if PY_VER_MAJOR < 3:
+    from urlparse import parse_qs, urlsplit
+else:
+    from urllib.parse import parse_qs, urlsplit
+
+# Upper bounds of latency histogram buckets, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0)
+
+PROMETHEUS_EXTENSION = '.prom'
+PROMETHEUS_PREFIX = 'aweber_tools_'
+
+# API request kinds, see 'request_operation'.
+OPERATION_ACCOUNT = 'connect'
+OPERATION_ACTIVITY = 'activity'
+OPERATION_DELETE = 'delete'
+OPERATION_FIND = 'find'
+OPERATION_FIND_PAGE = 'find_page'
+OPERATION_OAUTH = 'oauth'
+OPERATION_OTHER = 'other'
+OPERATION_TOTAL_SIZE = 'total_size'
+
+class MetricsException(Exception):
+    pass
+
+class Histogram(object):
+
+    """
+    Fixed bucket histogram.
+
+    Constructor args:
+        buckets: sorted upper bounds, an implicit last bucket takes larger
+                 values.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+
+        self._buckets = tuple(buckets)
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._min = None
+        self._max = None
+
+    @property
+    def buckets(self):
+        return self._buckets
+
+    def cumulative(self):
+
+        """Returns (upper bound, observations <= bound) pairs, +Inf last."""
+
+        total = 0
+        result = []
+        for bound, count in zip(self._buckets + (float('inf'),),
+                                self._counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+    def observe(self, value):
+
+        self._counts[bisect.bisect_left(self._buckets, value)] += 1
+        self._count += 1
+        self._sum += value
+        if (self._min is None) or (value < self._min):
+            self._min = value
+        if (self._max is None) or (value > self._max):
+            self._max = value
+
+    def quantile(self, q):
+
+        """
+        Estimates a quantile by interpolating within its bucket, None if
+        nothing was observed.
+        """
+
+        if (self._count == 0):
+            return None
+
+        rank = q * self._count
+        lower = 0.0
+        seen = 0
+        for i, count in enumerate(self._counts):
+            upper = self._buckets[i] if i < len(self._buckets) else self._max
+            if (count > 0) and (seen + count >= rank):
+                value = lower + (upper - lower) * (rank - seen) / count
+                return min(max(value, self._min), self._max)
+            seen += count
+            lower = upper
+
+        return self._max
+
+    def snapshot(self):
+
+        """Returns a dictionary of count, sum, min, max, mean and p50/90/99."""
+
+        mean = None
+        if (self._count):
+            mean = self._sum / self._count
+
+        return {
+            'count': self._count,
+            'sum': self._sum,
+            'min': self._min,
+            'max': self._max,
+            'mean': mean,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99)
+        }
+
+class Metrics(object):
+
+    """
+    Thread safe counters and histograms, optionally labeled with an
+    operation name.
+
+    Constructor args:
+        clock: monotonic time function, for tests.
+    """
+
+    def __init__(self, clock=None):
+
+        self._clock = clock or monotonic
+        self._started = self._clock()
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @property
+    def elapsed(self):
+        return self._clock() - self._started
+
+    def counter(self, name, operation=None):
+
+        with self._lock:
+            return self._counters.get((name, operation), 0)
+
+    def dump(self, filename, extra=None):
+
+        """
+        Writes the metrics to 'filename', replacing it atomically: in the
+        Prometheus text format if it ends with PROMETHEUS_EXTENSION, e.g.
+        for node_exporter's textfile collector, as JSON otherwise.
+
+        Args:
+            filename: destination file;
+            extra: optional dictionary of other JSON serializable values
+                   to include in a JSON dump.
+
+        Raises:
+            MetricsException.
+        """
+
+        if (filename.endswith(PROMETHEUS_EXTENSION)):
+            text = self.to_prometheus()
+        else:
+            stats = self.stats()
+            stats.update(extra or {})
+            text = json.dumps(stats, indent=2, sort_keys=True) + '\n'
+
+        temp_filename = filename + '.tmp'
+
+        try:
+            with open(temp_filename, 'w') as fp:
+                fp.write(text)
+            if (os.name == 'nt') and os.path.exists(filename):
+                os.remove(filename)
+            os.rename(temp_filename, filename)
+        except (IOError, OSError) as e:
+            raise MetricsException(str(e))
+
+    def increment(self, name, value=1, operation=None):
+
+        key = (name, operation)
+
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, operation=None):
+
+        key = (name, operation)
+
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if (histogram is None):
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def stats(self):
+
+        """
+        Returns:
+            a dictionary of 'elapsed_seconds', 'counters' and 'histograms',
+            labeled values are nested under their operation name.
+        """
+
+        stats = {'elapsed_seconds': self.elapsed, 'counters': {},
+                 'histograms': {}}
+
+        with self._lock:
+            for (name, operation), value in self._counters.items():
+                self._set(stats['counters'], name, operation, value)
+            for (name, operation), histogram in self._histograms.items():
+                self._set(stats['histograms'], name, operation,
+                          histogram.snapshot())
+
+        return stats
+
+    def to_prometheus(self):
+
+        """Returns the metrics in the Prometheus text exposition format."""
+
+        lines = []
+
+        with self._lock:
+            counters = sorted(self._counters.items(),
+                              key=lambda item: (item[0][0], item[0][1] or ''))
+            histograms = sorted(self._histograms.items(),
+                                key=lambda item: (item[0][0],
+                                                  item[0][1] or ''))
+
+            typed = set()
+            for (name, operation), value in counters:
+                metric = PROMETHEUS_PREFIX + name
+                if (metric not in typed):
+                    typed.add(metric)
+                    lines.append('# TYPE {0} counter'.format(metric))
+                lines.append('{0}{1} {2}'.format(
+                    metric, self._labels(operation), value))
+
+            for (name, operation), histogram in histograms:
+                metric = PROMETHEUS_PREFIX + name
+                if (metric not in typed):
+                    typed.add(metric)
+                    lines.append('# TYPE {0} histogram'.format(metric))
+                for bound, count in histogram.cumulative():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append('{0}_bucket{1} {2}'.format(
+                        metric, self._labels(operation, le), count))
+                snapshot = histogram.snapshot()
+                lines.append('{0}_sum{1} {2}'.format(
+                    metric, self._labels(operation), snapshot['sum']))
+                lines.append('{0}_count{1} {2}'.format(
+                    metric, self._labels(operation), snapshot['count']))
+
+        lines.append('# TYPE {0}elapsed_seconds gauge'.format(
+            PROMETHEUS_PREFIX))
+        lines.append('{0}elapsed_seconds {1}'.format(
+            PROMETHEUS_PREFIX, self.elapsed))
+        lines.append('# TYPE {0}last_run_timestamp_seconds gauge'.format(
+            PROMETHEUS_PREFIX))
+        lines.append('{0}last_run_timestamp_seconds {1}'.format(
+            PROMETHEUS_PREFIX, time.time()))
+
+        return '\n'.join(lines) + '\n'
+
+    def _labels(self, operation, le=None):
+
+        labels = []
+        if (operation is not None):
+            labels.append('operation="{0}"'.format(operation))
+        if (le is not None):
+            labels.append('le="{0}"'.format(le))
+
+        if (not labels):
+            return ''
+
+        return '{' + ','.join(labels) + '}'
+
+    def _set(self, target, name, operation, value):
+
+        if (operation is None):
+            target[name] = value
+        else:
+            target.setdefault(name, {})[operation] = value
+
+class MetricsAdapter(object):
+
+    """
+    Stands in for the API library's OAuth adapter: counts its requests and
+    errors and observes their latency, per 'request_operation'.
+
+    Metrics:
+        requests_total, errors_total: counters;
+        request_seconds: histogram.
+
+    Constructor args:
+        adapter: aweber_api.oauth.OAuthAdapter;
+        metrics: Metrics.
+    """
+
+    def __init__(self, adapter, metrics):
+
+        self.__dict__['_adapter'] = adapter
+        self.__dict__['_metrics'] = metrics
+
+    def __getattr__(self, name):
+        return getattr(self._adapter, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._adapter, name, value)
+
+    def request(self, method, url, data={}, response='body'):
+
+        """Same as aweber_api.oauth.OAuthAdapter.request."""
+
+        operation = request_operation(method, url, data)
+        started = monotonic()
+
+        try:
+            return self._adapter.request(method, url, data, response)
+        except Exception:
+            self._metrics.increment('errors_total', operation=operation)
+            raise
+        finally:
+            self._metrics.observe(
+                'request_seconds', monotonic() - started, operation)
+            self._metrics.increment('requests_total', operation=operation)
+
+def request_operation(method, url, data=None):
+
+    """
+    Names the kind of an API request from its method and URL: OPERATION_*.
+    """
+
+    parts = urlsplit(url)
+    params = parse_qs(parts.query)
+    params.update((key, [value]) for key, value in (data or {}).items())
+    op = params.get('ws.op', [None])[0]
+
+    if (parts.path.rstrip('/').endswith(('request_token', 'access_token'))):
+        return OPERATION_OAUTH
+
+    if (method == 'DELETE'):
+        return OPERATION_DELETE
+
+    if ('ws.show' in params):
+        return OPERATION_TOTAL_SIZE
+
+    if (op == 'getActivity'):
+        return OPERATION_ACTIVITY
+
+    if (op == 'findSubscribers'):
+        if ('ws.start' in params):
+            return OPERATION_FIND_PAGE
+        return OPERATION_FIND
+
+    if (parts.path.rstrip('/').endswith('/accounts')):
+        return OPERATION_ACCOUNT
+
+    return OPERATION_OTHER
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+
+from aweber_tools.include.msg import ERROR_PROFILER_KIND
+
+from aweber_tools.utils.py_compat import monotonic
+
+from collections import defaultdict
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+
+PROFILER_CPROFILE = 'cprofile'
+PROFILER_SAMPLING = 'sampling'
+PROFILERS = (PROFILER_CPROFILE, PROFILER_SAMPLING)
+
+DEFAULT_INTERVAL = 0.005
+DEFAULT_TOP = 15
+
+EXTENSION_CPROFILE = '.prof'
+EXTENSION_SAMPLING = '.folded'
+EXTENSION_SUMMARY = '.txt'
+
+MODULE_BUILTIN = '<built-in>'
+PACKAGE = __name__.split('.')[0]
+SUMMARY_HEADER = '{0:<40} {1:>12} {2:>12}'.format(
+    'module', 'cumulative s', 'self s')
+SUMMARY_ROW = '{0:<40} {1:>12.3f} {2:>12.3f}'
+
+class ProfilerException(Exception):
+    pass
+
+class Profiler(object):
+
+    """
+    Runs a function under cProfile or a sampling profiler and saves the
+    profile.
+
+    'cprofile' saves pstats data to '<filename>.prof', e.g. for
+    'python -m pstats' or snakeviz. It has a low constant overhead per call
+    but only sees the calling thread. 'sampling' records the stacks of all
+    threads every 'interval' seconds to '<filename>.folded', in the
+    collapsed format of flamegraph.pl and speedscope; its overhead is
+    independent of the call rate.
+
+    Both write '<filename>.txt', a summary of the 'top' modules by
+    cumulative time: time spent with one of the module's functions on the
+    stack. The sampling summary sums that time over the calling thread and
+    the samples of other threads running this package's code, so that idle
+    worker threads don't drown it.
+
+    Constructor args:
+        kind: PROFILER_CPROFILE or PROFILER_SAMPLING;
+        interval: float, seconds between samples of the sampling profiler;
+        top: int, modules listed in the summary.
+
+    Constructor raises:
+        ProfilerException.
+    """
+
+    def __init__(self, kind=PROFILER_CPROFILE, interval=DEFAULT_INTERVAL,
+                 top=DEFAULT_TOP):
+
+        if (kind not in PROFILERS):
+            raise ProfilerException(
+                ERROR_PROFILER_KIND.format(kind, ', '.join(PROFILERS)))
+
+        self._kind = kind
+        self._interval = interval or DEFAULT_INTERVAL
+        self._top = top or DEFAULT_TOP
+        self._summary = []
+
+    @property
+    def kind(self):
+        return self._kind
+
+    @property
+    def summary(self):
+
+        """A list of (module, cumulative seconds, self seconds) tuples."""
+
+        return self._summary
+
+    def format_summary(self):
+
+        """Returns the summary as a text table."""
+
+        return '\n'.join([SUMMARY_HEADER] + [
+            SUMMARY_ROW.format(*row) for row in self._summary])
+
+    def run(self, filename, func, *args):
+
+        """
+        Calls 'func(*args)' under the profiler. The profile is saved even
+        if 'func' raises, e.g. SystemExit or KeyboardInterrupt.
+
+        Args:
+            filename: output file name without extension;
+            func: the function to profile;
+            args: its arguments.
+
+        Returns:
+            a list of the saved file names.
+
+        Raises:
+            ProfilerException, after 'func' has returned; whatever 'func'
+            raises.
+        """
+
+        saved = []
+
+        if (self._kind == PROFILER_CPROFILE):
+            profile = cProfile.Profile()
+            try:
+                profile.runcall(func, *args)
+            finally:
+                saved = self._save_cprofile(profile, filename)
+        else:
+            sampler = _Sampler(
+                self._interval, threading.current_thread().ident)
+            sampler.start()
+            try:
+                func(*args)
+            finally:
+                sampler.stop()
+                saved = self._save_sampling(sampler, filename)
+
+        return saved
+
+    def _save_cprofile(self, profile, filename):
+
+        profile.create_stats()
+        stats = profile.stats
+
+        # A module's cumulative time is the cumulative time of its
+        # functions' calls from other modules.
+        modules = _ModuleNames()
+        cumulative = defaultdict(float)
+        own = defaultdict(float)
+
+        for func, (cc, nc, tt, ct, callers) in stats.items():
+            module = modules.name(func[0])
+            own[module] += tt
+            for caller, caller_stats in callers.items():
+                if (modules.name(caller[0]) != module):
+                    cumulative[module] += caller_stats[3]
+            if (not callers):
+                cumulative[module] += ct
+
+        self._set_summary(cumulative, own)
+
+        try:
+            pstats.Stats(profile).dump_stats(filename + EXTENSION_CPROFILE)
+        except (IOError, OSError) as e:
+            raise ProfilerException(str(e))
+
+        return [filename + EXTENSION_CPROFILE, self._save_summary(filename)]
+
+    def _save_sampling(self, sampler, filename):
+
+        seconds = sampler.seconds_per_sample
+        modules = _ModuleNames()
+        cumulative = defaultdict(float)
+        own = defaultdict(float)
+        lines = []
+
+        for (caller, stack), count in sorted(sampler.stacks.items()):
+            names = [modules.name(code_file) for code_file, _ in stack]
+            if (caller) or any(name.startswith(PACKAGE) for name in names):
+                for module in set(names):
+                    cumulative[module] += count * seconds
+                own[names[-1]] += count * seconds
+            lines.append('{0} {1}'.format(';'.join(
+                '{0}:{1}'.format(name, function)
+                for name, (_, function) in zip(names, stack)), count))
+
+        self._set_summary(cumulative, own)
+
+        try:
+            with open(filename + EXTENSION_SAMPLING, 'w') as fp:
+                fp.write('\n'.join(lines) + '\n')
+        except (IOError, OSError) as e:
+            raise ProfilerException(str(e))
+
+        return [filename + EXTENSION_SAMPLING, self._save_summary(filename)]
+
+    def _save_summary(self, filename):
+
+        try:
+            with open(filename + EXTENSION_SUMMARY, 'w') as fp:
+                fp.write(self.format_summary() + '\n')
+        except (IOError, OSError) as e:
+            raise ProfilerException(str(e))
+
+        return filename + EXTENSION_SUMMARY
+
+    def _set_summary(self, cumulative, own):
+
+        self._summary = sorted(
+            ((module, cumulative[module], own.get(module, 0.0))
+             for module in cumulative),
+            key=lambda row: -row[1])[:self._top]
+
+class _ModuleNames(object):
+
+    # Maps code file names to dotted module names via sys.modules; files of
+    # unknown modules are named after their base name.
+
+    def __init__(self):
+
+        self._names = {}
+
+        for name, module in list(sys.modules.items()):
+            filename = getattr(module, '__file__', None)
+            if (filename):
+                self._names[self._key(filename)] = name
+
+    def name(self, filename):
+
+        # cProfile's file name of built-in functions.
+        if (filename == '~'):
+            return MODULE_BUILTIN
+
+        key = self._key(filename)
+        name = self._names.get(key)
+
+        if (name is None):
+            name = os.path.splitext(os.path.basename(filename))[0]
+            self._names[key] = name
+
+        return name
+
+    def _key(self, filename):
+
+        root, extension = os.path.splitext(os.path.abspath(filename))
+        if (extension in ('.pyc', '.pyo')):
+            extension = '.py'
+
+        return root + extension
+
+class _Sampler(object):
+
+    # Background thread counting the stacks of all other threads, keyed by
+    # (whether it's the 'caller' thread, stack); stacks are outermost frame
+    # first tuples of (file name, function name).
+
+    def __init__(self, interval, caller):
+
+        self._interval = interval
+        self._caller = caller
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._rounds = 0
+        self._started = None
+        self._elapsed = 0.0
+        self.stacks = defaultdict(int)
+
+    @property
+    def seconds_per_sample(self):
+
+        if (self._rounds == 0):
+            return 0.0
+
+        return self._elapsed / self._rounds
+
+    def start(self):
+
+        self._started = monotonic()
+        self._thread.start()
+
+    def stop(self):
+
+        self._stop.set()
+        self._thread.join()
+        self._elapsed = monotonic() - self._started
+
+    def _run(self):
+
+        own_id = threading.current_thread().ident
+
+        while (not self._stop.is_set()):
+            for thread_id, frame in sys._current_frames().items():
+                if (thread_id == own_id):
+                    continue
+                stack = []
+                while (frame is not None):
+                    stack.append((frame.f_code.co_filename,
+                                  frame.f_code.co_name))
+                    frame = frame.f_back
+                stack.reverse()
+                self.stacks[thread_id == self._caller, tuple(stack)] += 1
+            self._rounds += 1
+            time.sleep(self._interval)
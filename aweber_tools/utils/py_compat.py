@@ -1,6 +1,17 @@
 #!/usr/bin/env python
 
 import sys
+import time
 
 PY_VER_MAJOR = sys.version_info[0]
-PY_VER_MINOR = sys.version_info[1]
\ No newline at end of file
+PY_VER_MINOR = sys.version_info[1]
+
+# Monotonic clock for interval measurements, wall clock on Python 2.
+monotonic = getattr(time, 'monotonic', time.time)
+
+# Line input without evaluation, as 'future.builtins.input' without loading
+# the 'future' package: 'raw_input' on Python 2.
+try:
+    input = raw_input
+except NameError:
+    input = input
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+
+from aweber_tools.utils.py_compat import monotonic
+
+from collections import deque
+
+import random
+import threading
+
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+DECREASE_COOLDOWN = 1.0
+DECREASE_FACTOR = 0.5
+INCREASE_FACTOR = 0.05
+MAX_RETRIES = 8
+MIN_RATE_FACTOR = 0.05
+THROTTLE_EVENTS_KEPT = 1000
+
+class RateControllerData(object):
+
+    @property
+    def max_rate(self):
+        return self._max_rate
+
+    @property
+    def max_retries(self):
+        return self._max_retries
+
+    @property
+    def min_rate(self):
+        return self._min_rate
+
+    @property
+    def rate(self):
+        return self._rate_limiter.rate
+
+    @property
+    def throttle_count(self):
+        return self._throttle_count
+
+    @property
+    def throttle_events(self):
+
+        """A list of (time, attempt, rate before, rate after) tuples."""
+
+        with self._lock:
+            return list(self._throttle_events)
+
+class RateController(RateControllerData):
+
+    """
+    Adapts a rate limiter's rate to API throttling (AIMD).
+
+    Every throttled request divides the rate by 'decrease_factor', at most
+    once per DECREASE_COOLDOWN seconds so that a burst of throttled
+    concurrent requests counts once. Successful requests raise it again by
+    'increase' * 'max_rate' requests per second for every second since the
+    last change, up to 'max_rate': recovering from a halving takes
+    0.5 / 'increase' seconds whatever the rate. Throttled requests are
+    retried after an exponential backoff with jitter, at most
+    'max_retries' times.
+
+    Constructor args:
+        rate_limiter: aweber_tools.utils.rate_limiter.RateLimiter;
+        max_rate: float, default: the limiter's current rate;
+        min_rate: float, default: MIN_RATE_FACTOR * max_rate;
+        decrease_factor: float, default: DECREASE_FACTOR;
+        increase: float, fraction of 'max_rate' added per second, default:
+                  INCREASE_FACTOR;
+        max_retries: int, default: MAX_RETRIES;
+        backoff_base: float, first backoff in seconds, default:
+                      BACKOFF_BASE;
+        backoff_max: float, longest backoff in seconds, default:
+                     BACKOFF_MAX;
+        clock: callable returning monotonic time in seconds;
+        jitter: callable returning a random float in [0, 1).
+    """
+
+    def __init__(self, rate_limiter, max_rate=None, min_rate=None,
+                 decrease_factor=DECREASE_FACTOR,
+                 increase=INCREASE_FACTOR, max_retries=MAX_RETRIES,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                 clock=None, jitter=None):
+
+        self._rate_limiter = rate_limiter
+
+        self._max_rate = float(max_rate or rate_limiter.rate)
+        self._min_rate = float(min_rate or self._max_rate * MIN_RATE_FACTOR)
+
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._clock = clock or monotonic
+        self._decrease_factor = decrease_factor
+        self._increase = increase * self._max_rate
+        self._jitter = jitter or random.random
+        self._lock = threading.Lock()
+        self._max_retries = max_retries
+
+        self._last_change = self._clock()
+        self._last_decrease = None
+        self._throttle_count = 0
+        self._throttle_events = deque(maxlen=THROTTLE_EVENTS_KEPT)
+
+    def on_success(self):
+
+        """Additive increase after a successful request."""
+
+        with self._lock:
+            now = self._clock()
+            rate = self._rate_limiter.rate
+            if (rate < self._max_rate):
+                elapsed = now - self._last_change
+                self._rate_limiter.rate = \
+                    min(self._max_rate, rate + self._increase * elapsed)
+            self._last_change = now
+
+    def on_throttle(self, attempt):
+
+        """
+        Multiplicative decrease after a throttled request.
+
+        Args:
+            attempt: int, the number of retries of the request so far.
+
+        Returns:
+            float: seconds to wait before retrying, None if the request
+            shouldn't be retried anymore.
+        """
+
+        with self._lock:
+            now = self._clock()
+            rate = self._rate_limiter.rate
+            new_rate = rate
+
+            if (self._last_decrease is None) \
+                    or (now - self._last_decrease >= DECREASE_COOLDOWN):
+                new_rate = max(self._min_rate, rate * self._decrease_factor)
+                self._rate_limiter.rate = new_rate
+                self._last_decrease = now
+
+            self._last_change = now
+            self._throttle_count += 1
+            self._throttle_events.append((now, attempt, rate, new_rate))
+
+        if (attempt >= self._max_retries):
+            return None
+
+        # Equal jitter: half of the exponential delay, plus a random part
+        # of the other half.
+        delay = min(self._backoff_max, self._backoff_base * 2 ** attempt)
+
+        return delay / 2 + self._jitter() * delay / 2
+
+    def stats(self):
+
+        """
+        Returns:
+            a dictionary of the current rate and throttling counters.
+        """
+
+        return {
+            'max_rate': self._max_rate,
+            'min_rate': self._min_rate,
+            'rate': self.rate,
+            'throttle_count': self._throttle_count
+        }
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+
+from aweber_tools.include.msg import ERROR_RATE_BURST, ERROR_RATE_VALUE
+from aweber_tools.utils.py_compat import monotonic
+
+import threading
+import time
+
+DEFAULT_BURST = 10
+DEFAULT_RATE = 1.0
+
+class RateLimiterException(Exception):
+    pass
+
+class RateLimiterData(object):
+
+    @property
+    def burst(self):
+        return self._burst
+
+    @property
+    def rate(self):
+        return self._rate
+
+    @rate.setter
+    def rate(self, rate):
+        if (rate is None) or (rate <= 0):
+            raise RateLimiterException(ERROR_RATE_VALUE)
+        with self._lock:
+            self._refill()
+            self._rate = float(rate)
+
+    @property
+    def tokens(self):
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+class RateLimiter(RateLimiterData):
+
+    """
+    Token bucket request rate limiter.
+
+    The bucket holds up to 'burst' tokens and refills at 'rate' tokens per
+    second. Every API request takes a token; when the bucket is empty the
+    caller sleeps until its token has been refilled. Safe to share between
+    threads.
+
+    Constructor args:
+        rate: float, sustained number of requests per second;
+        burst: int, bucket capacity, the number of requests allowed to go
+               through back to back;
+        clock: callable returning monotonic time in seconds, default:
+               aweber_tools.utils.py_compat.monotonic;
+        sleep: callable used to wait, default: time.sleep.
+
+    Constructor raises:
+        RateLimiterException.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, clock=None,
+                 sleep=None):
+
+        if (rate is None) or (rate <= 0):
+            raise RateLimiterException(ERROR_RATE_VALUE)
+
+        if (burst is None) or (burst < 1):
+            raise RateLimiterException(ERROR_RATE_BURST)
+
+        self._burst = int(burst)
+        self._clock = clock or monotonic
+        self._lock = threading.Lock()
+        self._rate = float(rate)
+        self._sleep = sleep or time.sleep
+
+        self._tokens = float(self._burst)
+        self._last_refill = self._clock()
+
+    def acquire(self, tokens=1):
+
+        """
+        Takes 'tokens' from the bucket, sleeping until they are available.
+
+        Tokens are reserved before sleeping, so concurrent callers are
+        served in the order they arrived and never exceed the rate.
+
+        Args:
+            tokens: int, default: 1.
+
+        Returns:
+            float: seconds spent sleeping.
+        """
+
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            delay = 0.0
+            if (self._tokens < 0):
+                delay = -self._tokens / self._rate
+
+        if (delay > 0):
+            self._sleep(delay)
+
+        return delay
+
+    def try_acquire(self, tokens=1):
+
+        """
+        Takes 'tokens' from the bucket if they are available right now.
+
+        Args:
+            tokens: int, default: 1.
+
+        Returns:
+            True if the tokens were taken.
+        """
+
+        with self._lock:
+            self._refill()
+            if (self._tokens < tokens):
+                return False
+            self._tokens -= tokens
+
+        return True
+
+    def _refill(self):
+
+        # Must be called with self._lock held.
+
+        now = self._clock()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+
+        if (elapsed > 0):
+            self._tokens = min(
+                float(self._burst), self._tokens + elapsed * self._rate)
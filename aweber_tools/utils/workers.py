@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+from aweber_tools.utils.lazy_import import LazyModule
+
+from collections import deque
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+PREFETCH_FACTOR = 2
+
+# Imported by the first concurrent run.
+_pool = LazyModule('multiprocessing.pool')
+
+def imap_ordered(func, iterable, workers, prefetch=PREFETCH_FACTOR):
+
+    """
+    Applies 'func' to the items of 'iterable' on a thread pool.
+
+    At most 'workers' * 'prefetch' items are in flight at a time. The input
+    is consumed in the calling thread, so exceptions raised by 'iterable'
+    and by 'func' both propagate to the caller, in input order.
+
+    Args:
+        func: callable taking one item;
+        iterable: the items;
+        workers: int, thread pool size;
+        prefetch: int, in-flight items per worker, default: PREFETCH_FACTOR.
+
+    Returns:
+        a generator of 'func' results, in input order.
+    """
+
+    items = iter(iterable)
+    pending = deque()
+    pool = _pool.ThreadPool(workers)
+
+    def submit():
+        for item in items:
+            pending.append(pool.apply_async(func, (item,)))
+            return
+
+    try:
+        for i in range(workers * prefetch):
+            submit()
+
+        while pending:
+            result = pending.popleft().get()
+            submit()
+            yield result
+    finally:
+        pool.terminate()
+
+def imap_unordered(func, iterable, workers, prefetch=PREFETCH_FACTOR):
+
+    """
+    Applies 'func' to the items of 'iterable' on a thread pool, yielding
+    results as they complete.
+
+    Like 'imap_ordered', at most 'workers' * 'prefetch' items are in flight
+    and exceptions propagate to the caller, but a slow item doesn't hold
+    back the results of the items after it: a new item is submitted as soon
+    as any one completes.
+
+    Args:
+        func: callable taking one item;
+        iterable: the items;
+        workers: int, thread pool size;
+        prefetch: int, in-flight items per worker, default: PREFETCH_FACTOR.
+
+    Returns:
+        a generator of 'func' results, in completion order.
+    """
+
+    items = iter(iterable)
+    done = Queue()
+    pool = _pool.ThreadPool(workers)
+
+    def call(item):
+        try:
+            done.put((func(item), None))
+        except Exception as e:
+            done.put((None, e))
+
+    def submit():
+        for item in items:
+            pool.apply_async(call, (item,))
+            return 1
+        return 0
+
+    try:
+        in_flight = 0
+        for i in range(workers * prefetch):
+            in_flight += submit()
+
+        while in_flight:
+            result, error = done.get()
+            if (error is not None):
+                raise error
+            in_flight += submit() - 1
+            yield result
+    finally:
+        pool.terminate()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+"""
+Parsing speed of aweber_tools.utils.date_format.DateFormat against the
+previous 'strptime' implementation of 'get_date'.
+
+    python benchmarks/date_format.py [--count 100000] [--distinct 5000]
+
+'--distinct' is the number of different date strings among '--count'
+parsed values; activity event times repeat a lot, subscription dates less.
+"""
+
+from __future__ import print_function
+
+from aweber_tools.utils.date_format import DateFormat, FORMAT_DATETIME
+
+from datetime import datetime, timedelta
+
+import argparse
+import random
+import time
+
+DEFAULT_COUNT = 100000
+DEFAULT_DISTINCT = 5000
+
+def legacy_get_date(date_string):
+
+    # DateFormat.get_date before the positional parser and the cache.
+
+    formatted_timezone = date_string[:-3] + date_string[-2:]
+
+    timezone_offset_str = formatted_timezone[-5:]
+    timezone_offset = \
+        int(timezone_offset_str[-4:-2])*60 + int(timezone_offset_str[-2:])
+    timezone_offset *= 60
+
+    if timezone_offset_str[0] == '-':
+        timezone_offset = -timezone_offset
+
+    formatted_date = datetime.strptime(formatted_timezone[:-5],
+                                       FORMAT_DATETIME)
+    formatted_date += timedelta(seconds=timezone_offset)
+
+    return formatted_date
+
+def make_dates(count, distinct):
+
+    start = datetime(2010, 1, 1)
+    offsets = ['-05:00', '-04:00', '+00:00', '+05:30']
+    values = [
+        (start + timedelta(seconds=random.randint(0, 10 ** 9))).strftime(
+            FORMAT_DATETIME) + random.choice(offsets)
+        for i in range(distinct)]
+
+    return [random.choice(values) for i in range(count)]
+
+def timed(name, func, count):
+
+    started = time.time()
+    result = func()
+    elapsed = time.time() - started
+
+    print('{0:<28} {1:8.3f} s {2:12.0f} dates/s'.format(
+        name, elapsed, count / max(elapsed, 1e-9)))
+
+    return result
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--count', type=int, default=DEFAULT_COUNT,
+                        help='dates to parse')
+    parser.add_argument('--distinct', type=int, default=DEFAULT_DISTINCT,
+                        help='different date strings')
+    args = parser.parse_args()
+
+    random.seed(0)
+    dates = make_dates(args.count, args.distinct)
+    formatter = DateFormat()
+
+    legacy = timed('legacy get_date', lambda: [
+        legacy_get_date(date) for date in dates], args.count)
+    current = timed('get_date', lambda: [
+        formatter.get_date(date) for date in dates], args.count)
+    timed('get_dates', lambda: formatter.get_dates(dates), args.count)
+    timed('get_timestamps', lambda: formatter.get_timestamps(dates),
+          args.count)
+
+    if (legacy != current):
+        raise SystemExit('get_date results differ from the legacy ones')
+
+if __name__ == '__main__':
+    main()
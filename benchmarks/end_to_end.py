@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+
+"""
+Throughput of the application's actions against a local fake AWeber API,
+see benchmarks/fake_aweber.py.
+
+    python benchmarks/end_to_end.py [--subscribers 10000] [--latency 0.05]
+        [--server-rate 60] [--page-workers 4] [--actions download,delete]
+
+Each action runs in its own process against the same fake account, in the
+given order, so deletions are seen by the following actions. Reported per
+action: wall time, API calls answered by the server, 'Rate limit exceeded'
+responses, retries made by the client's rate controller and the action
+process' peak RSS.
+
+Needs the packages in README's 'Requires'.
+"""
+
+from __future__ import print_function
+
+from fake_aweber import \
+    DEFAULT_SUBSCRIBERS, FakeAccount, FakeAWeberServer, KIND_THROTTLED
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ACTIONS = ('download', 'delete')
+RESULT_PREFIX = 'RESULT '
+
+def run_action(args):
+
+    # Child process side: runs one action with its output discarded and
+    # prints the measurements as a JSON line on the real standard output.
+
+    from aweber_tools.actions import DeleteInactive, DownloadAll
+    from aweber_tools.client import Client
+    from aweber_tools.utils.config import Config
+
+    config = Config('benchmark', 'benchmark', 'benchmark', 'benchmark',
+                    args.backup_path)
+    config.rate = args.rate
+    config.burst = args.burst
+    config.page_workers = args.page_workers
+    config.activity_workers = args.activity_workers
+    config.delete_workers = args.delete_workers
+    config.export_format = args.export_format
+    config.api_base = args.api_base
+
+    client = Client(config)
+
+    action = {'download': DownloadAll,
+              'delete': DeleteInactive}[args.run_action](client)
+    action.interactive = False
+    if (args.run_action == 'delete'):
+        action.confirm_delete = True
+
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+
+    try:
+        started = time.time()
+        client.connect()
+        action.execute()
+        elapsed = time.time() - started
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    peak_rss = None
+    if (resource is not None):
+        # Kilobytes on Linux, bytes on macOS.
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if (sys.platform != 'darwin'):
+            peak_rss *= 1024
+
+    print(RESULT_PREFIX + json.dumps({
+        'elapsed': elapsed,
+        'retries': client.rate_controller.throttle_count,
+        'peak_rss': peak_rss
+    }))
+
+def run_benchmark(args):
+
+    server = FakeAWeberServer(
+        FakeAccount(args.subscribers, seed=args.seed), latency=args.latency,
+        rate=args.server_rate, burst=args.server_burst,
+        throttle_share=args.throttle_share)
+    server.start()
+
+    backup_path = tempfile.mkdtemp(prefix='aweber_tools_bench_')
+
+    print('{0} subscribers, {1} s latency, server rate {2}, client rate {3}, '
+          'page/activity/delete workers {4}/{5}/{6}\n'.format(
+              args.subscribers, args.latency, args.server_rate or 'unlimited',
+              args.rate, args.page_workers, args.activity_workers,
+              args.delete_workers))
+    print('{0:<10} {1:>9} {2:>9} {3:>9} {4:>10} {5:>8} {6:>10}'.format(
+        'action', 'wall s', 'calls', 'calls/s', 'throttled', 'retries',
+        'peak MiB'))
+
+    try:
+        for name in args.actions.split(','):
+            before = server.stats()
+            result = run_child(args, name, server.base_url, backup_path)
+            after = server.stats()
+
+            calls = sum(after.values()) - sum(before.values())
+            throttled = after.get(KIND_THROTTLED, 0) \
+                - before.get(KIND_THROTTLED, 0)
+            peak_rss = '-'
+            if (result['peak_rss'] is not None):
+                peak_rss = '{0:.1f}'.format(result['peak_rss'] / 1048576.0)
+
+            print('{0:<10} {1:>9.2f} {2:>9} {3:>9.1f} {4:>10} {5:>8} '
+                  '{6:>10}'.format(
+                      name, result['elapsed'], calls,
+                      calls / max(result['elapsed'], 1e-9), throttled,
+                      result['retries'], peak_rss))
+    finally:
+        server.stop()
+        shutil.rmtree(backup_path, ignore_errors=True)
+
+def run_child(args, name, api_base, backup_path):
+
+    command = [sys.executable, os.path.abspath(__file__),
+               '--run-action', name, '--api-base', api_base,
+               '--backup-path', backup_path]
+    for option in ('rate', 'burst', 'page_workers', 'activity_workers',
+                   'delete_workers', 'export_format'):
+        command += ['--' + option.replace('_', '-'),
+                    str(getattr(args, option))]
+
+    output = subprocess.check_output(command).decode('utf-8')
+
+    for line in output.splitlines():
+        if (line.startswith(RESULT_PREFIX)):
+            return json.loads(line[len(RESULT_PREFIX):])
+
+    raise SystemExit('{0}: no result in\n{1}'.format(name, output))
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--subscribers', type=int,
+                        default=DEFAULT_SUBSCRIBERS, help='account size')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds added to every API response')
+    parser.add_argument('--server-rate', type=float, default=None,
+                        help='API requests per second before throttling')
+    parser.add_argument('--server-burst', type=int, default=10,
+                        help='API requests allowed back to back')
+    parser.add_argument('--throttle-share', type=float, default=0.0,
+                        help='share of API requests throttled at random')
+    parser.add_argument('--rate', type=float, default=100.0,
+                        help="client's [api] rate")
+    parser.add_argument('--burst', type=int, default=10,
+                        help="client's [api] burst")
+    parser.add_argument('--page-workers', type=int, default=1)
+    parser.add_argument('--activity-workers', type=int, default=1)
+    parser.add_argument('--delete-workers', type=int, default=1)
+    parser.add_argument('--export-format', default='csv')
+    parser.add_argument('--actions', default=','.join(ACTIONS),
+                        help='comma separated, of: ' + ', '.join(ACTIONS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--run-action', choices=ACTIONS,
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--api-base', help=argparse.SUPPRESS)
+    parser.add_argument('--backup-path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if (args.run_action):
+        run_action(args)
+    else:
+        run_benchmark(args)
+
+if __name__ == '__main__':
+    main()
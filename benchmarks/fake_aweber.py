@@ -0,0 +1,580 @@
+#!/usr/bin/env python
+
+"""
+Local stand-in for the parts of the AWeber API used by aweber_tools: OAuth
+tokens, the account, 'findSubscribers' pagination, subscriber activity and
+subscriber deletion. Requests are answered after a configurable latency and
+can be rate limited with 'ForbiddenError: Rate limit exceeded' responses.
+
+    python benchmarks/fake_aweber.py [--port 8080] [--subscribers 10000]
+
+Point a client at it with the config's [api] api_base value, e.g.
+http://127.0.0.1:8080/1.0. OAuth signatures are not checked, only that the
+request carries OAuth parameters.
+"""
+
+from __future__ import print_function
+
+from array import array
+from datetime import datetime, timedelta
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlsplit
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlsplit
+
+ACCOUNT_ID = 1001
+LIST_ID = 2002
+API_PATH = '/1.0'
+DATE_FORMAT_API = '%Y-%m-%d %H:%M:%S+00:00'
+DATE_FORMAT_PARAM = '%Y-%m-%d'
+DEFAULT_EVENTS = 4
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_SUBSCRIBERS = 10000
+
+EVENT_TYPES = ('sent', 'open', 'click')
+STATUSES = (('subscribed', 0.8), ('unsubscribed', 0.15), ('unconfirmed', 0.05))
+
+# Request kinds counted by FakeAWeberServer.stats().
+KIND_ACCOUNT = 'account'
+KIND_ACTIVITY = 'activity'
+KIND_DELETE = 'delete'
+KIND_FIND = 'find'
+KIND_OAUTH = 'oauth'
+KIND_SUBSCRIBER = 'subscriber'
+KIND_THROTTLED = 'throttled'
+KIND_TOTAL_SIZE = 'total_size'
+
+RE_SUBSCRIBER = re.compile(
+    r'^/accounts/(\d+)/lists/(\d+)/subscribers/(\d+)$')
+
+class FakeAccount(object):
+
+    """
+    Deterministic subscribers of a fake account.
+
+    Subscriber data and activity are derived from the seed and the id on
+    every request instead of being stored, only deleted ids are kept, so
+    large accounts are cheap to serve.
+
+    Constructor args:
+        size: number of subscribers;
+        days: subscription dates are spread over that many days up to now;
+        seed: random seed;
+        events: maximum number of events per subscriber.
+    """
+
+    def __init__(self, size=DEFAULT_SUBSCRIBERS, days=1000, seed=0,
+                 events=DEFAULT_EVENTS):
+
+        self._size = size
+        self._days = days
+        self._events = events
+        self._seed = seed
+        self._now = datetime.utcnow().replace(microsecond=0)
+        self._deleted = set()
+        self._queries = {}
+        self._lock = threading.Lock()
+
+    def activity(self, subscriber_id, base_url):
+
+        """Returns the subscriber's events, oldest first."""
+
+        rnd = self._random(subscriber_id, 1)
+        subscribed_at = self._subscribed_at(subscriber_id)
+        seconds = max(1, int((self._now - subscribed_at).total_seconds()))
+        offsets = sorted(
+            rnd.randint(0, seconds)
+            for i in range(rnd.randint(0, self._events)))
+
+        return [
+            {
+                'event_time': (subscribed_at + timedelta(seconds=offset))
+                              .strftime(DATE_FORMAT_API),
+                'type': rnd.choice(EVENT_TYPES),
+                'self_link': '{0}/accounts/{1}/lists/{2}/subscribers/{3}'
+                             '/activity/{4}'.format(
+                                 base_url, ACCOUNT_ID, LIST_ID,
+                                 subscriber_id, i),
+                'resource_type_link': self._type_link('tracked_event')
+            }
+            for i, offset in enumerate(offsets)
+        ]
+
+    def delete(self, subscriber_id):
+
+        """Deletes a subscriber, returns False if there is no such one."""
+
+        with self._lock:
+            if (not self.exists(subscriber_id)):
+                return False
+            self._deleted.add(subscriber_id)
+            self._queries.clear()
+
+        return True
+
+    def exists(self, subscriber_id):
+        return (0 < subscriber_id <= self._size) \
+            and (subscriber_id not in self._deleted)
+
+    def find(self, params):
+
+        """
+        Returns the ids matching 'findSubscribers' parameters, supported
+        are 'status', 'email' and the 'subscribed_*' / 'unsubscribed_*'
+        date bounds. The result is kept until the next deletion.
+        """
+
+        key = tuple(sorted(params.items()))
+
+        with self._lock:
+            ids = self._queries.get(key)
+            if (ids is None):
+                ids = array('l', (
+                    subscriber_id for subscriber_id in range(1, self._size + 1)
+                    if (subscriber_id not in self._deleted)
+                    and self._matches(subscriber_id, params)))
+                self._queries[key] = ids
+
+        return ids
+
+    def subscriber(self, subscriber_id, base_url):
+
+        """Returns a subscriber's entry data."""
+
+        rnd = self._random(subscriber_id, 0)
+        status = self._status(subscriber_id)
+        subscribed_at = self._subscribed_at(subscriber_id)
+        unsubscribed_at = None
+        if (status == 'unsubscribed'):
+            unsubscribed_at = (subscribed_at + timedelta(
+                days=rnd.randint(0, 30))).strftime(DATE_FORMAT_API)
+
+        return {
+            'id': subscriber_id,
+            'ad_tracking': 'benchmark',
+            'area_code': rnd.randint(200, 999),
+            'city': 'City {0}'.format(subscriber_id % 100),
+            'country': 'United States',
+            'custom_fields': {},
+            'dma_code': rnd.randint(500, 881),
+            'email': 'subscriber{0}@example.com'.format(subscriber_id),
+            'ip_address': '10.{0}.{1}.{2}'.format(
+                subscriber_id >> 16 & 255, subscriber_id >> 8 & 255,
+                subscriber_id & 255),
+            'is_verified': status != 'unconfirmed',
+            'last_followup_message_number_sent': rnd.randint(0, 10),
+            'last_followup_sent_at': None,
+            'last_followup_sent_link': None,
+            'latitude': round(rnd.uniform(25, 49), 4),
+            'longitude': round(rnd.uniform(-124, -67), 4),
+            'misc_notes': '',
+            'name': 'Subscriber {0}'.format(subscriber_id),
+            'postal_code': '{0:05d}'.format(rnd.randint(0, 99999)),
+            'region': 'PA',
+            'self_link': '{0}/accounts/{1}/lists/{2}/subscribers/{3}'.format(
+                base_url, ACCOUNT_ID, LIST_ID, subscriber_id),
+            'status': status,
+            'subscribed_at': subscribed_at.strftime(DATE_FORMAT_API),
+            'subscription_method': 'api',
+            'subscription_url': None,
+            'tags': [],
+            'unsubscribe_method': unsubscribed_at and 'unsubscribe link',
+            'unsubscribed_at': unsubscribed_at,
+            'verified_at': subscribed_at.strftime(DATE_FORMAT_API),
+            'resource_type_link': self._type_link('subscriber'),
+            'http_etag': '"{0}"'.format(subscriber_id)
+        }
+
+    def _matches(self, subscriber_id, params):
+
+        status = params.get('status')
+        if (status is not None) and (self._status(subscriber_id) != status):
+            return False
+
+        email = params.get('email')
+        if (email is not None) and \
+                (email != 'subscriber{0}@example.com'.format(subscriber_id)):
+            return False
+
+        subscribed_at = self._subscribed_at(subscriber_id)
+        for name, after in (('subscribed_after', True),
+                            ('subscribed_before', False)):
+            if (name in params) and \
+                    not self._date_matches(subscribed_at, params[name], after):
+                return False
+
+        for name, after in (('unsubscribed_after', True),
+                            ('unsubscribed_before', False)):
+            if (name not in params):
+                continue
+            if (self._status(subscriber_id) != 'unsubscribed'):
+                return False
+            unsubscribed_at = datetime.strptime(
+                self.subscriber(subscriber_id, '')['unsubscribed_at'],
+                DATE_FORMAT_API)
+            if (not self._date_matches(unsubscribed_at, params[name], after)):
+                return False
+
+        return True
+
+    def _date_matches(self, date, value, after):
+
+        # Date parameters have a granularity of one day, bounds inclusive.
+
+        bound = datetime.strptime(value, DATE_FORMAT_PARAM).date()
+
+        if (after):
+            return date.date() >= bound
+
+        return date.date() <= bound
+
+    def _random(self, subscriber_id, stream):
+        return random.Random((self._seed * 1000003 + subscriber_id) * 2
+                             + stream)
+
+    def _status(self, subscriber_id):
+
+        value = self._random(subscriber_id, 2).random()
+        for status, share in STATUSES:
+            if (value < share):
+                return status
+            value -= share
+
+        return STATUSES[0][0]
+
+    def _subscribed_at(self, subscriber_id):
+
+        seconds = self._random(subscriber_id, 3).randint(
+            0, self._days * 86400)
+
+        return self._now - timedelta(seconds=seconds)
+
+    def _type_link(self, name):
+        return 'https://api.aweber.com/1.0/#{0}'.format(name)
+
+class TokenBucket(object):
+
+    """Server side request rate limit, 'rate' requests per second."""
+
+    def __init__(self, rate, burst):
+
+        self._rate = float(rate)
+        self._burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def take(self):
+
+        with self._lock:
+            now = time.time()
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+            if (self._tokens < 1):
+                return False
+
+            self._tokens -= 1
+            return True
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+class FakeAWeberServer(object):
+
+    """
+    Serves a FakeAccount over HTTP from a background thread.
+
+    Constructor args:
+        account: FakeAccount;
+        host, port: address to listen on, port 0 picks a free one;
+        latency: seconds every response is delayed by;
+        rate: requests per second allowed before answering 'Rate limit
+              exceeded', None for no limit;
+        burst: requests allowed back to back under 'rate';
+        throttle_share: share of requests answered 'Rate limit exceeded'
+                        regardless of the rate, 0 to 1.
+    """
+
+    def __init__(self, account, host='127.0.0.1', port=0, latency=0.0,
+                 rate=None, burst=10, throttle_share=0.0):
+
+        self.account = account
+        self.latency = latency
+        self.throttle_share = throttle_share
+        self._bucket = TokenBucket(rate, burst) if rate else None
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._thread = None
+
+    @property
+    def base_url(self):
+
+        host, port = self._httpd.server_address[:2]
+
+        return 'http://{0}:{1}{2}'.format(host, port, API_PATH)
+
+    def count(self, kind):
+
+        with self._lock:
+            self._counts[kind] = self._counts.get(kind, 0) + 1
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def start(self):
+
+        """Starts serving in a daemon thread."""
+
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stats(self):
+
+        """Returns a copy of the request counts by kind."""
+
+        with self._lock:
+            return dict(self._counts)
+
+    def stop(self):
+
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def throttled(self):
+
+        """Tells if the current request is to be refused."""
+
+        if (self.throttle_share > 0):
+            with self._lock:
+                if (self._random.random() < self.throttle_share):
+                    return True
+
+        return (self._bucket is not None) and (not self._bucket.take())
+
+def _make_handler(server):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        protocol_version = 'HTTP/1.1'
+
+        # Responses are written in one piece: unbuffered header lines
+        # would meet the client's delayed ACKs on kept-alive connections.
+        wbufsize = -1
+
+        def do_DELETE(self):
+            self._handle('DELETE')
+
+        def do_GET(self):
+            self._handle('GET')
+
+        def do_POST(self):
+            self._handle('POST')
+
+        def log_message(self, format, *args):
+            pass
+
+        def _handle(self, method):
+
+            parts = urlsplit(self.path)
+            path = parts.path
+            # The API library appends page parameters with '&' or '?'.
+            query = parse_qs(parts.query.replace('?', '&'))
+
+            body = ''
+            length = int(self.headers.get('Content-Length') or 0)
+            if (length):
+                body = self.rfile.read(length).decode('utf-8')
+                query.update(parse_qs(body))
+
+            params = dict((key, values[-1]) for key, values in query.items()
+                          if not key.startswith('oauth_'))
+
+            if (server.latency):
+                time.sleep(server.latency)
+
+            if (not path.startswith(API_PATH)):
+                return self._error(404, 'NotFoundError', 'Not found')
+            path = path[len(API_PATH):].rstrip('/')
+
+            if (path.startswith('/oauth/')):
+                server.count(KIND_OAUTH)
+                return self._send(
+                    200, 'oauth_token=fake-token&oauth_token_secret='
+                    'fake-secret&oauth_callback_confirmed=true', 'text/plain')
+
+            if ('oauth_consumer_key' not in query) and \
+                    ('oauth_consumer_key' not in
+                     (self.headers.get('Authorization') or '')):
+                return self._error(401, 'UnauthorizedError',
+                                   'Missing OAuth parameters')
+
+            if (server.throttled()):
+                server.count(KIND_THROTTLED)
+                return self._error(403, 'ForbiddenError',
+                                   'Rate limit exceeded')
+
+            try:
+                return self._route(method, path, params)
+            except (KeyError, ValueError) as e:
+                return self._error(400, 'WebServiceError', str(e))
+
+        def _collection(self, entries, start, size, total, url, params):
+
+            data = {
+                'entries': entries,
+                'start': start,
+                'total_size': total,
+                'resource_type_link': 'https://api.aweber.com/1.0/#'
+                                      'collection'
+            }
+
+            if (start + size < total):
+                page = dict(params)
+                page.update({'ws.start': start + size, 'ws.size': size})
+                data['next_collection_link'] = '{0}?{1}'.format(
+                    url, '&'.join('{0}={1}'.format(key, page[key])
+                                  for key in sorted(page)))
+
+            return data
+
+        def _error(self, status, error_type, message):
+
+            return self._send(status, json.dumps({'error': {
+                'type': error_type, 'message': message, 'status': status}}))
+
+        def _route(self, method, path, params):
+
+            base_url = server.base_url
+            account_url = '{0}/accounts/{1}'.format(base_url, ACCOUNT_ID)
+            op = params.pop('ws.op', None)
+            show = params.pop('ws.show', None)
+            start = int(params.pop('ws.start', 0))
+            size = min(int(params.pop('ws.size', DEFAULT_PAGE_SIZE)),
+                       DEFAULT_PAGE_SIZE)
+
+            account = {
+                'id': ACCOUNT_ID,
+                'self_link': account_url,
+                'lists_collection_link': account_url + '/lists',
+                'resource_type_link': 'https://api.aweber.com/1.0/#account'
+            }
+
+            if (method == 'GET') and (path == '/accounts'):
+                server.count(KIND_ACCOUNT)
+                return self._json(self._collection(
+                    [account], 0, 1, 1, base_url + '/accounts', {}))
+
+            if (method == 'GET') and \
+                    (path == '/accounts/{0}'.format(ACCOUNT_ID)):
+                if (op != 'findSubscribers'):
+                    server.count(KIND_ACCOUNT)
+                    return self._json(account)
+
+                ids = server.account.find(params)
+                if (show == 'total_size'):
+                    server.count(KIND_TOTAL_SIZE)
+                    return self._json(len(ids))
+
+                server.count(KIND_FIND)
+                entries = [server.account.subscriber(subscriber_id, base_url)
+                           for subscriber_id in ids[start:start + size]]
+                params['ws.op'] = op
+                return self._json(self._collection(
+                    entries, start, size, len(ids), account_url, params))
+
+            match = RE_SUBSCRIBER.match(path)
+            if (match is None):
+                return self._error(404, 'NotFoundError', 'Not found')
+
+            subscriber_id = int(match.group(3))
+            if (not server.account.exists(subscriber_id)):
+                return self._error(404, 'NotFoundError',
+                                   'Subscriber not found')
+
+            if (method == 'DELETE'):
+                server.count(KIND_DELETE)
+                server.account.delete(subscriber_id)
+                return self._send(200, '')
+
+            if (op != 'getActivity'):
+                server.count(KIND_SUBSCRIBER)
+                return self._json(
+                    server.account.subscriber(subscriber_id, base_url))
+
+            events = server.account.activity(subscriber_id, base_url)
+            if (show == 'total_size'):
+                server.count(KIND_TOTAL_SIZE)
+                return self._json(len(events))
+
+            server.count(KIND_ACTIVITY)
+            return self._json(self._collection(
+                events[start:start + size], start, size, len(events),
+                base_url + path, {'ws.op': op}))
+
+        def _json(self, data):
+            return self._send(200, json.dumps(data))
+
+        def _send(self, status, body, content_type='application/json'):
+
+            body = body.encode('utf-8')
+
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--subscribers', type=int,
+                        default=DEFAULT_SUBSCRIBERS, help='account size')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds added to every response')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='requests per second before throttling')
+    parser.add_argument('--burst', type=int, default=10,
+                        help='requests allowed back to back')
+    parser.add_argument('--throttle-share', type=float, default=0.0,
+                        help='share of requests throttled at random')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--events', type=int, default=DEFAULT_EVENTS,
+                        help='maximum number of events per subscriber')
+    args = parser.parse_args()
+
+    server = FakeAWeberServer(
+        FakeAccount(args.subscribers, seed=args.seed, events=args.events),
+        args.host, args.port, args.latency, args.rate, args.burst,
+        args.throttle_share)
+
+    print('Serving {0}'.format(server.base_url))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+
+"""
+Import time of aweber_tools modules, with a budget check.
+
+    python benchmarks/import_time.py [--module aweber_tools.cli]
+                                     [--runs 5] [--budget 60] [--top 25]
+
+Each run imports '--module' in a fresh interpreter. The best run's wall
+time is compared with '--budget' milliseconds, and the modules listed in
+DEFERRED, loaded on first use only, must not have been imported. A separate,
+instrumented run prints a breakdown in the format of 'python -X importtime'
+(which Python 2 lacks): self and cumulative microseconds per imported
+module, nested under their importer, '--top' slowest top-level imports
+first. The instrumentation slows imports down, so its total is higher than
+the wall time.
+
+Exits with status 1 if the budget is exceeded or a deferred module was
+imported.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = 60.0
+DEFAULT_MODULE = 'aweber_tools.cli'
+DEFAULT_RUNS = 5
+DEFAULT_TOP = 25
+
+# Dependencies of rarely used features, imported on first use.
+DEFERRED = (
+    'HTMLParser',
+    'aweber_api',
+    'aweber_tools.utils.auth_verifier',
+    'future',
+    'html.parser',
+    'httplib2',
+    'oauth2',
+    'urllib2',
+    'webbrowser'
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Child process code: prints the import's wall time and loaded modules.
+TIMED = '''
+import json, sys, time
+started = time.time()
+import {0}
+elapsed = time.time() - started
+print(json.dumps({{'elapsed': elapsed, 'modules': sorted(
+    name for name, module in sys.modules.items() if module is not None)}}))
+'''
+
+# Child process code: times every '__import__' call loading a new module
+# and prints (depth, name, self, cumulative) rows in import order.
+TRACED = '''
+import json, sys, time
+try:
+    import __builtin__ as builtins
+except ImportError:
+    import builtins
+rows = []
+stack = [0.0]
+original = builtins.__import__
+def traced(name, *args, **kwargs):
+    if (name in sys.modules):
+        return original(name, *args, **kwargs)
+    row = [len(stack) - 1, name, 0.0, 0.0]
+    rows.append(row)
+    stack.append(0.0)
+    started = time.time()
+    try:
+        return original(name, *args, **kwargs)
+    finally:
+        elapsed = time.time() - started
+        row[2] = elapsed - stack.pop()
+        row[3] = elapsed
+        stack[-1] += elapsed
+builtins.__import__ = traced
+import {0}
+builtins.__import__ = original
+print(json.dumps(rows))
+'''
+
+def run_child(code):
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT] + [path for path in [env.get('PYTHONPATH')] if path])
+
+    output = subprocess.check_output(
+        [sys.executable, '-c', code], env=env, cwd=ROOT)
+
+    return json.loads(output.decode('utf-8').strip().split('\n')[-1])
+
+def print_breakdown(rows, top):
+
+    # Top-level imports sorted by cumulative time, each followed by the
+    # imports it triggered, like 'python -X importtime'.
+
+    groups = []
+    for row in rows:
+        if (row[0] == 0):
+            groups.append([])
+        groups[-1].append(row)
+
+    groups.sort(key=lambda group: -group[0][3])
+
+    print('import time: self [us] | cumulative | imported package')
+    for group in groups[:top]:
+        for depth, name, own, cumulative in group:
+            print('import time: {0:>9.0f} | {1:>10.0f} | {2}{3}'.format(
+                own * 1e6, cumulative * 1e6, '  ' * depth, name))
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--module', default=DEFAULT_MODULE,
+                        help='module to import')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS,
+                        help='timed imports, the best one counts')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_MS,
+                        help='milliseconds the import may take')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP,
+                        help='top-level imports in the breakdown')
+    args = parser.parse_args()
+
+    print_breakdown(run_child(TRACED.format(args.module)), args.top)
+
+    results = [run_child(TIMED.format(args.module))
+               for i in range(max(args.runs, 1))]
+    best = min(result['elapsed'] for result in results) * 1000
+    modules = results[0]['modules']
+
+    deferred = [name for name in modules
+                if name.split('.')[0] in DEFERRED or name in DEFERRED]
+
+    print('\n{0}: best of {1} imports {2:.1f} ms, budget {3:.1f} ms, '
+          '{4} modules'.format(args.module, len(results), best, args.budget,
+                               len(modules)))
+
+    failed = False
+
+    if (best > args.budget):
+        print('FAILED: over budget by {0:.1f} ms'.format(best - args.budget))
+        failed = True
+
+    if (deferred):
+        print('FAILED: deferred modules imported: ' + ', '.join(deferred))
+        failed = True
+
+    if (failed):
+        sys.exit(1)
+
+    print('OK')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+
+"""
+Memory used by a list of subscribers: aweber_tools.models.subscribers.
+Subscriber against the previous representation, which copied every field
+into the instance __dict__ and kept the API entry alive as well.
+
+    python benchmarks/subscriber_memory.py [--count 1000000]
+
+Needs the packages in README's 'Requires'. Uses tracemalloc where available
+and the process' peak RSS otherwise.
+"""
+
+from __future__ import print_function
+
+from aweber_api.entry import AWeberEntry
+
+from aweber_tools.models.subscribers import Subscriber
+
+import argparse
+import gc
+import sys
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_COUNT = 1000000
+ENTRY_URL = 'https://api.aweber.com/1.0/accounts/1/lists/1/subscribers/{0}'
+# The API library looks attributes missing from an entry's data up in the
+# child collections of the entry's type, so entries need one.
+ENTRY_TYPE_LINK = 'https://api.aweber.com/1.0/#subscriber'
+
+FIELDS = (
+    'ad_tracking', 'area_code', 'city', 'country', 'custom_fields',
+    'dma_code', 'email', 'id', 'ip_address', 'is_verified',
+    'last_followup_message_number_sent', 'last_followup_sent',
+    'last_followup_sent_at', 'latitude', 'longitude', 'misc_notes', 'name',
+    'postal_code', 'region', 'self_link', 'status', 'subscribed_at',
+    'subscription_method', 'subscription_url', 'tags', 'unsubscribe_method',
+    'unsubscribed_at', 'verified_at'
+)
+
+class LegacySubscriber(object):
+
+    """The previous layout: fields in __dict__ plus the entry itself."""
+
+    def __init__(self, client, data):
+        self._client = client
+        self._data = data
+        for name in FIELDS:
+            setattr(self, '_' + name, getattr(data, name, None))
+
+class NoClient(object):
+    pass
+
+def make_entry(i):
+
+    # Values are built per entry, like they are when decoded from JSON.
+
+    data = {
+        'ad_tracking': 'form-{0}'.format(i % 10),
+        'area_code': 555,
+        'city': 'City {0}'.format(i % 1000),
+        'country': 'Country {0}'.format(i % 100),
+        'custom_fields': {'field': 'value {0}'.format(i)},
+        'dma_code': 501,
+        'email': 'subscriber{0}@example.com'.format(i),
+        'id': i,
+        'ip_address': '10.0.{0}.{1}'.format(i // 256 % 256, i % 256),
+        'is_verified': True,
+        'last_followup_message_number_sent': 1001,
+        'last_followup_sent': None,
+        'last_followup_sent_at': '2017-01-02 03:04:05-05:00',
+        'latitude': 40.0,
+        'longitude': -75.0,
+        'misc_notes': '',
+        'name': 'Subscriber {0}'.format(i),
+        'postal_code': '{0:05d}'.format(i % 100000),
+        'region': 'Region {0}'.format(i % 50),
+        'resource_type_link': ENTRY_TYPE_LINK,
+        'self_link': ENTRY_URL.format(i),
+        'status': 'subscribed',
+        'subscribed_at': '2016-01-02 03:04:05-05:00',
+        'subscription_method': 'webform',
+        'subscription_url': 'https://example.com/form',
+        'tags': ['tag{0}'.format(i % 5)],
+        'unsubscribe_method': None,
+        'unsubscribed_at': None,
+        'verified_at': '2016-01-02 03:05:05-05:00'
+    }
+
+    return AWeberEntry(data['self_link'], data, None)
+
+def measure(subscriber_class, count):
+
+    # Entries are dropped as they are wrapped, like in a streamed download,
+    # so only what the wrappers keep alive is measured.
+
+    gc.collect()
+
+    if (tracemalloc is not None):
+        tracemalloc.start()
+        subscribers = [subscriber_class(NoClient(), make_entry(i))
+                       for i in range(count)]
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    else:
+        before = peak_rss()
+        subscribers = [subscriber_class(NoClient(), make_entry(i))
+                       for i in range(count)]
+        current = peak_rss() - before
+
+    del subscribers
+    gc.collect()
+
+    return current
+
+def peak_rss():
+
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Kilobytes on Linux, bytes on macOS.
+    if (sys.platform != 'darwin'):
+        usage *= 1024
+
+    return usage
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--count', type=int, default=DEFAULT_COUNT,
+                        help='synthetic subscribers to create')
+    args = parser.parse_args()
+
+    # The compact representation is measured first, the peak RSS fallback
+    # can only grow.
+    compact = measure(Subscriber, args.count)
+    legacy = measure(LegacySubscriber, args.count)
+
+    print('subscribers:        {0}'.format(args.count))
+    print('legacy  (MiB):      {0:.1f}'.format(legacy / 1048576.0))
+    print('compact (MiB):      {0:.1f}'.format(compact / 1048576.0))
+    print('bytes / subscriber: {0:.0f} -> {1:.0f}'.format(
+        float(legacy) / args.count, float(compact) / args.count))
+    if (compact):
+        print('reduction:          {0:.1f}x'.format(float(legacy) / compact))
+
+if __name__ == '__main__':
+    main()
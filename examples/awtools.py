@@ -1,8 +1,16 @@
 from aweber_tools import App, AppException
-from future.builtins.misc import input
+from aweber_tools.utils.profiler import PROFILERS
+from aweber_tools.utils.py_compat import input
+
+import argparse
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--profile', choices=PROFILERS,
+                    help='profile each action, see config [profile]')
+args = parser.parse_args()
 
 try:
-    app = App('config.cfg')
+    app = App('config.cfg', args.profile)
     app.run()
 except AppException as exception:
     print(str(exception))
@@ -5,6 +5,9 @@ setup(
     version          = '0.1.1',
     description      = 'AWeber API Python tools',
     packages         = find_packages(),
+    entry_points     = {
+        'console_scripts': ['aweber-tools = aweber_tools.cli:main'],
+    },
     classifiers = [
         'Programming Language :: Python :: 2',
         'Programming Language :: Python :: 2.6',
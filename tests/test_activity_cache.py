@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+from aweber_tools.utils.activity_cache import \
+    ActivityCache, ActivityCacheException
+
+import os
+import shutil
+import tempfile
+import unittest
+
+EVENTS = [{'type': 'open', 'event_time': '2026-01-01T00:00:00-05:00'}]
+
+class FakeClock(object):
+
+    # Wall clock moved by hand.
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class ActivityCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def create(self, ttl=60, max_size=2, filename=None):
+        if (filename is not None):
+            filename = os.path.join(self.path, filename)
+        return ActivityCache(ttl, max_size, filename, clock=self.clock)
+
+    def test_hit_and_miss(self):
+
+        cache = self.create()
+
+        self.assertEqual(cache.get(1), None)
+        cache.put(1, EVENTS)
+
+        self.assertEqual(cache.get(1), EVENTS)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_entry_expires_after_ttl(self):
+
+        cache = self.create(ttl=60)
+        cache.put(1, EVENTS)
+
+        self.clock.now += 59.9
+        self.assertEqual(cache.get(1), EVENTS)
+
+        self.clock.now += 0.1
+        self.assertEqual(cache.get(1), None)
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_least_recently_used_is_evicted(self):
+
+        cache = self.create(max_size=2)
+        cache.put(1, EVENTS)
+        cache.put(2, EVENTS)
+
+        # Reading 1 makes 2 the least recently used.
+        cache.get(1)
+        cache.put(3, EVENTS)
+
+        self.assertEqual(cache.get(2), None)
+        self.assertEqual(cache.get(1), EVENTS)
+        self.assertEqual(cache.get(3), EVENTS)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_disk_tier_keeps_evicted_entries(self):
+
+        cache = self.create(max_size=1, filename='activity.db')
+        cache.put(1, EVENTS)
+        cache.put(2, EVENTS)
+
+        self.assertEqual(cache.get(1), EVENTS)
+        self.assertEqual(cache.disk_hits, 1)
+        cache.close()
+
+    def test_disk_tier_is_shared_between_runs(self):
+
+        cache = self.create(filename='activity.db')
+        cache.put(1, EVENTS)
+        cache.close()
+
+        cache = self.create(filename='activity.db')
+        self.assertEqual(cache.get(1), EVENTS)
+        cache.close()
+
+        # Expired entries are dropped when the file is opened.
+        self.clock.now += 60
+        cache = self.create(filename='activity.db')
+        self.assertEqual(cache.get(1), None)
+        cache.close()
+
+    def test_invalid_arguments(self):
+
+        self.assertRaises(ActivityCacheException, self.create, ttl=0)
+        self.assertRaises(ActivityCacheException, self.create, max_size=0)
+
+if __name__ == '__main__':
+    unittest.main()
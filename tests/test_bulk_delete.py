@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+
+from aweber_tools.client import ClientException
+from aweber_tools.models import bulk_delete
+from aweber_tools.models.bulk_delete import \
+    BulkDelete, BulkDeleteException, DeleteJournal
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+PLAN = [('1', 'link/1'), ('2', 'link/2'), ('3', 'link/3')]
+
+class FakeClient(object):
+
+    # Deletes by id: ids in 'gone' are unknown to the API, ids in 'broken'
+    # always fail.
+
+    def __init__(self, gone=(), broken=()):
+        self.broken = set(broken)
+        self.deleted = []
+        self.gone = set(gone)
+
+    def make_subscriber_entry(self, data):
+        return data
+
+    def delete_subscriber(self, entry):
+        if (entry['id'] in self.broken):
+            raise ClientException('API error: [ServiceError] broken')
+        if (entry['id'] in self.gone):
+            return False
+        self.deleted.append(entry['id'])
+        return True
+
+class JournalTestBase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'test.journal')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def lines(self):
+        with io.open(self.filename, encoding='UTF-8') as fp:
+            return fp.read().split('\n')[:-1]
+
+    def reopen(self, journal):
+        journal.close()
+        return DeleteJournal(self.filename)
+
+class DeleteJournalTest(JournalTestBase):
+
+    def test_replay(self):
+
+        journal = DeleteJournal(self.filename)
+        journal.plan(PLAN)
+        journal.done('1')
+        journal.fail('2', 'API error:\n broken')
+        journal = self.reopen(journal)
+
+        self.assertEqual(journal.pending, [('3', 'link/3')])
+        self.assertEqual(journal.failed, {'2': 'API error: broken'})
+        self.assertFalse(journal.ended)
+        journal.close()
+
+    def test_failed_is_not_pending(self):
+
+        journal = DeleteJournal(self.filename)
+        journal.plan(PLAN)
+        for subscriber_id, link in PLAN:
+            journal.fail(subscriber_id, 'broken')
+
+        self.assertEqual(journal.pending, [])
+        journal.close()
+
+    def test_done_after_fail_clears_failure(self):
+
+        journal = DeleteJournal(self.filename)
+        journal.plan(PLAN[:1])
+        journal.fail('1', 'broken')
+        journal.done('1')
+        journal = self.reopen(journal)
+
+        self.assertEqual(journal.failed, {})
+        self.assertEqual(journal.pending, [])
+        journal.close()
+
+    def test_end_once_every_id_is_done_or_failed(self):
+
+        journal = DeleteJournal(self.filename)
+        journal.plan(PLAN)
+        journal.done('1')
+        journal.fail('2', 'broken')
+        journal.end()
+        self.assertFalse(journal.ended)
+
+        journal.done('3')
+        journal.end()
+        journal.end()
+        journal = self.reopen(journal)
+
+        self.assertTrue(journal.ended)
+        self.assertEqual(self.lines().count('END'), 1)
+        journal.close()
+
+    def test_plan_skips_planned_ids(self):
+
+        journal = DeleteJournal(self.filename)
+
+        self.assertEqual(journal.plan(PLAN[:2]), 2)
+        self.assertEqual(journal.plan([(3, 'link/3'), (1, 'link/1')]), 1)
+        self.assertEqual(journal.pending, PLAN)
+        journal.close()
+
+    def test_truncated_last_line_is_ignored(self):
+
+        journal = DeleteJournal(self.filename)
+        journal.plan(PLAN[:1])
+        journal.close()
+
+        with io.open(self.filename, 'a', encoding='UTF-8') as fp:
+            fp.write(u'DON')
+
+        journal = DeleteJournal(self.filename)
+        self.assertEqual(journal.pending, PLAN[:1])
+        journal.close()
+
+    def test_invalid_line(self):
+
+        with io.open(self.filename, 'w', encoding='UTF-8') as fp:
+            fp.write(u'PLAN\t1\tlink/1\nBOGUS\n')
+
+        self.assertRaises(BulkDeleteException, DeleteJournal, self.filename)
+
+class BulkDeleteTest(JournalTestBase):
+
+    def setUp(self):
+        super(BulkDeleteTest, self).setUp()
+        self.retry_delay = bulk_delete.RETRY_DELAY
+        bulk_delete.RETRY_DELAY = 0
+
+    def tearDown(self):
+        bulk_delete.RETRY_DELAY = self.retry_delay
+        super(BulkDeleteTest, self).tearDown()
+
+    def run_journal(self, client, workers=1, resume=False):
+
+        journal = DeleteJournal(self.filename)
+        deleted_ids = []
+
+        try:
+            deleter = BulkDelete(client, journal, workers,
+                                 on_deleted=deleted_ids.append)
+            if (not resume):
+                journal.plan(PLAN)
+            counts = deleter.resume()
+        finally:
+            journal.close()
+
+        return counts, deleted_ids
+
+    def test_unknown_subscriber_counts_as_deleted(self):
+
+        client = FakeClient(gone=[2])
+        counts, deleted_ids = self.run_journal(client)
+
+        self.assertEqual(counts, (3, 0))
+        self.assertEqual(sorted(deleted_ids), [1, 2, 3])
+        self.assertEqual(client.deleted, [1, 3])
+
+    def test_failure_ends_the_journal(self):
+
+        counts, deleted_ids = self.run_journal(FakeClient(broken=[2]), 4)
+
+        self.assertEqual(counts, (2, 1))
+        self.assertEqual(self.lines()[-1], 'END')
+
+        client = FakeClient()
+        self.assertEqual(self.run_journal(client, resume=True)[0], (0, 0))
+        self.assertEqual(client.deleted, [])
+
+    def test_resume_after_crash(self):
+
+        journal = DeleteJournal(self.filename)
+        journal.plan(PLAN)
+        journal.done('1')
+        journal.close()
+
+        client = FakeClient()
+        counts, deleted_ids = self.run_journal(client, resume=True)
+
+        self.assertEqual(counts, (2, 0))
+        self.assertEqual(client.deleted, [2, 3])
+        self.assertEqual(self.lines()[-1], 'END')
+
+if __name__ == '__main__':
+    unittest.main()
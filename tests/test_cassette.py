@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+from aweber_tools.client import Client, ClientException
+from aweber_tools.utils.cassette import \
+    Cassette, CassetteException, EXCEPTION_CASSETTE_TYPE, MODE_RECORD, \
+    MODE_REPLAY
+from aweber_tools.utils.config import Config
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'benchmarks'))
+
+from fake_aweber import FakeAccount, FakeAWeberServer
+
+SUBSCRIBERS = 12
+
+class CassetteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.filename = os.path.join(self.path, 'api.cassette')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_put_and_get(self):
+
+        cassette = Cassette(self.filename, MODE_RECORD)
+        key = cassette.request_key('GET', '/accounts', {}, 'body')
+        cassette.put(key, {'entries': [1, 2]})
+        cassette.close()
+
+        cassette = Cassette(self.filename, MODE_REPLAY)
+        self.assertEqual(cassette.get(key), (True, {'entries': [1, 2]}))
+        self.assertEqual(cassette.get(key + 1), (False, None))
+        self.assertEqual((cassette.hits, cassette.misses), (1, 1))
+        cassette.close()
+
+    def test_request_key_ignores_parameter_order(self):
+
+        cassette = Cassette(self.filename, MODE_RECORD)
+
+        self.assertEqual(
+            cassette.request_key('GET', '/s?a=1&b=2', {}, 'body'),
+            cassette.request_key('GET', '/s?b=2&a=1', {}, 'body'))
+        self.assertNotEqual(
+            cassette.request_key('GET', '/s?a=1', {}, 'body'),
+            cassette.request_key('GET', '/s?a=2', {}, 'body'))
+        cassette.close()
+
+    def test_invalid_mode(self):
+
+        self.assertRaises(CassetteException, Cassette, self.filename, 'play')
+
+class ClientCassetteTest(unittest.TestCase):
+
+    # Records a client session against the fake API, then replays it with
+    # the server stopped.
+
+    def setUp(self):
+
+        self.path = tempfile.mkdtemp()
+        self.account = FakeAccount(SUBSCRIBERS, seed=1)
+        self.server = FakeAWeberServer(self.account)
+        self.server.start()
+        self.base_url = self.server.base_url
+
+    def tearDown(self):
+
+        if (self.server is not None):
+            self.server.stop()
+        shutil.rmtree(self.path)
+
+    def create(self, mode):
+
+        config = Config('token', 'secret', 'key', 'consumer', self.path)
+        config.api_base = self.base_url
+        config.cassette_file = 'api.cassette'
+        config.cassette_mode = mode
+        config.rate = 1000.0
+        config.burst = 100
+
+        client = Client(config)
+        client.connect()
+
+        return client
+
+    def close(self, client):
+
+        # Idle kept-alive connections would hold server threads.
+        client.http_pool.close()
+        client.cassette.close()
+
+    def test_record_then_replay(self):
+
+        client = self.create(MODE_RECORD)
+        recorded = [entry.email for entry in client.find_subscribers({})]
+        self.assertEqual(len(recorded), SUBSCRIBERS)
+        self.assertTrue(client.cassette.recorded > 0)
+        self.close(client)
+
+        self.server.stop()
+        self.server = None
+
+        client = self.create(MODE_REPLAY)
+        replayed = [entry.email for entry in client.find_subscribers({})]
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(client.cassette.misses, 0)
+
+        # A request that wasn't recorded fails like an API error.
+        try:
+            client.find_subscribers({'status': 'unconfirmed'})
+            self.fail('replay miss not raised')
+        except ClientException as e:
+            self.assertTrue('[' + EXCEPTION_CASSETTE_TYPE + ']' in str(e))
+
+        self.assertEqual(client.cassette.misses, 1)
+        self.close(client)
+
+if __name__ == '__main__':
+    unittest.main()
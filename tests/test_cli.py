@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+from aweber_tools.cli import Cli, EXIT_ERROR, EXIT_OK
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'benchmarks'))
+
+from fake_aweber import FakeAccount, FakeAWeberServer
+
+CONFIG = '''[account]
+consumer_key = key
+consumer_secret = consumer
+access_token = token
+access_secret = secret
+
+[files]
+{files}
+
+[api]
+api_base = {api_base}
+rate = 1000
+burst = 100
+'''
+
+# Nothing listens on the discard port: connecting fails.
+DEAD_API_BASE = 'http://127.0.0.1:9/1.0'
+
+SUBSCRIBERS = 12
+
+class CliAccountsTest(unittest.TestCase):
+
+    # Runs an action for several accounts on the process pool, against the
+    # fake API.
+
+    def setUp(self):
+
+        self.path = tempfile.mkdtemp()
+        self.server = FakeAWeberServer(FakeAccount(SUBSCRIBERS, seed=1))
+        self.server.start()
+
+    def tearDown(self):
+
+        self.server.stop()
+        shutil.rmtree(self.path)
+
+    def config(self, name, api_base, files=''):
+
+        filename = os.path.join(self.path, name + '.cfg')
+        with open(filename, 'w') as fp:
+            fp.write(CONFIG.format(api_base=api_base, files=files))
+
+        return filename
+
+    def run_accounts(self, configs, *args):
+
+        report = os.path.join(self.path, 'report.json')
+        argv = ['download', '--backup-path', os.path.join(self.path, 'out'),
+                '--report', report] + list(args)
+        for config in configs:
+            argv += ['-c', config]
+
+        # The accounts report is printed, errors to the standard error.
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout = sys.stderr = open(os.devnull, 'w')
+        try:
+            status = Cli(argv).run()
+        finally:
+            sys.stdout.close()
+            sys.stdout, sys.stderr = stdout, stderr
+
+        with open(report) as fp:
+            return status, dict((os.path.basename(row['config']), row)
+                                for row in json.load(fp))
+
+    def test_failing_account_is_reported(self):
+
+        # The dead account's connection error isn't a CliException.
+
+        status, reports = self.run_accounts(
+            [self.config('live', self.server.base_url),
+             self.config('dead', DEAD_API_BASE)])
+
+        self.assertEqual(status, EXIT_ERROR)
+
+        self.assertEqual(reports['live.cfg']['status'], EXIT_OK)
+        self.assertEqual(reports['live.cfg']['subscribers'], SUBSCRIBERS)
+        self.assertEqual(reports['live.cfg']['error'], None)
+
+        self.assertEqual(reports['dead.cfg']['status'], EXIT_ERROR)
+        self.assertTrue(reports['dead.cfg']['error'])
+
+    def test_store_subscribers_are_reported(self):
+
+        # The second run's sync only fetches changes, the report counts
+        # the subscribers read from the store.
+
+        configs = [self.config('a', self.server.base_url,
+                               'store_file = store.db'),
+                   self.config('b', self.server.base_url)]
+
+        for i in range(2):
+            status, reports = self.run_accounts(configs)
+            self.assertEqual(status, EXIT_OK)
+            self.assertEqual(reports['a.cfg']['subscribers'], SUBSCRIBERS)
+            self.assertEqual(reports['b.cfg']['subscribers'], SUBSCRIBERS)
+
+if __name__ == '__main__':
+    unittest.main()
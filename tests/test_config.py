@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+from aweber_tools.client import Client, ClientException
+from aweber_tools.utils.config import Config, ConfigException
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+class ConfigTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def write_config(self, api):
+        filename = os.path.join(self.path, 'config.cfg')
+        with io.open(filename, 'w', encoding='UTF-8') as fp:
+            fp.write(u'[account]\nconsumer_key = key\n[api]\n' + api)
+        return filename
+
+    def test_settings_default_to_none(self):
+
+        config = Config('token', 'secret', 'key', 'consumer', 'backup')
+
+        self.assertEqual(config.access_token, 'token')
+        self.assertEqual(config.backup_path, 'backup')
+        self.assertEqual(config.rate, None)
+        self.assertEqual(config.export_format, None)
+        config.validate()
+
+    def test_load_from_file(self):
+
+        config = Config(
+            filename=self.write_config(u'rate = 2.5\nburst = 4\n'))
+
+        self.assertEqual(config.consumer_key, 'key')
+        self.assertEqual(config.rate, 2.5)
+        self.assertEqual(config.burst, 4)
+        self.assertEqual(config.page_workers, None)
+
+    def test_malformed_number(self):
+
+        self.assertRaises(ConfigException, Config,
+                          filename=self.write_config(u'rate = fast\n'))
+
+    def test_validate_rejects_non_positive_values(self):
+
+        for name, value in (('rate', 0), ('rate', -1.0), ('burst', 0),
+                            ('page_workers', 0), ('activity_ttl', 0),
+                            ('http_timeout', -5), ('delete_workers', '4'),
+                            ('activity_size', True)):
+            config = Config()
+            setattr(config, name, value)
+            self.assertRaises(ConfigException, config.validate)
+
+    def test_validate_file_values(self):
+
+        config = Config(filename=self.write_config(u'rate = 0\n'))
+
+        self.assertRaises(ConfigException, config.validate)
+
+class ClientConfigTest(unittest.TestCase):
+
+    def test_invalid_rate_is_rejected(self):
+
+        config = Config()
+        config.rate = 0
+
+        self.assertRaises(ClientException, Client, config,
+                          http_pool=object())
+
+    def test_settings_reach_the_rate_limiter(self):
+
+        config = Config()
+        config.rate = 2.0
+        config.burst = 3
+        config.page_workers = 4
+
+        client = Client(config, http_pool=object())
+
+        self.assertTrue(client.config is config)
+        self.assertEqual(client.rate_limiter.rate, 2.0)
+        self.assertEqual(client.rate_limiter.burst, 3)
+        self.assertEqual(client.page_workers, 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+from aweber_tools.utils import date_format
+from aweber_tools.utils.date_format import DateFormat, DateFormatException
+
+from datetime import datetime
+
+import unittest
+
+SAMPLES = (
+    '2017-03-09 14:25:07+01:00',
+    '2017-03-09 14:25:07-05:30',
+    '1999-12-31 23:59:59+00:00',
+    '2020-02-29 00:00:00-00:00',
+    '2024-07-01 08:00:00+14:00'
+)
+
+class DateFormatTest(unittest.TestCase):
+
+    def setUp(self):
+        self.formatter = DateFormat()
+
+    def test_positional_parser_matches_strptime(self):
+
+        for sample in SAMPLES:
+            self.assertEqual(date_format._parse(sample),
+                             date_format._parse_strptime(sample), sample)
+
+    def test_get_date_shifts_by_offset(self):
+
+        self.assertEqual(
+            self.formatter.get_date('2017-03-09 14:25:07+01:00'),
+            datetime(2017, 3, 9, 15, 25, 7))
+        self.assertEqual(
+            self.formatter.get_date('2017-03-09 14:25:07-05:30'),
+            datetime(2017, 3, 9, 8, 55, 7))
+
+    def test_get_timestamp_is_utc(self):
+
+        self.assertEqual(
+            self.formatter.get_timestamp('1970-01-01 01:00:00+01:00'), 0)
+        self.assertEqual(
+            self.formatter.get_timestamp('1970-01-01 00:00:00-00:30'), 1800)
+
+    def test_sequences(self):
+
+        self.assertEqual(self.formatter.get_dates(SAMPLES),
+                         [self.formatter.get_date(s) for s in SAMPLES])
+        self.assertEqual(self.formatter.get_timestamps(SAMPLES),
+                         [self.formatter.get_timestamp(s) for s in SAMPLES])
+
+    def test_other_layouts_fall_back_to_strptime(self):
+
+        # Unpadded fields miss the positional layout.
+        self.assertEqual(self.formatter.get_date('2017-3-9 14:25:07+01:00'),
+                         datetime(2017, 3, 9, 15, 25, 7))
+
+    def test_invalid_dates(self):
+
+        for value in ('', 'garbage', '2017-13-09 14:25:07+01:00',
+                      '2017-02-30 14:25:07+01:00',
+                      '2017-03-09 24:25:07+01:00',
+                      '2017-0x-09 14:25:07+01:00'):
+            self.assertRaises(DateFormatException,
+                              self.formatter.get_date, value)
+            self.assertRaises(DateFormatException,
+                              self.formatter.get_timestamp, value)
+
+        self.assertRaises(DateFormatException, self.formatter.get_date, None)
+
+    def test_memoize_fallback(self):
+
+        calls = []
+        lru_cache = date_format.lru_cache
+        cache_size = date_format.CACHE_SIZE
+        date_format.lru_cache = None
+        date_format.CACHE_SIZE = 2
+
+        try:
+            memoized = date_format._memoize(
+                lambda value: calls.append(value) or value * 2)
+            results = [memoized(value) for value in (1, 1, 2, 3, 1)]
+        finally:
+            date_format.lru_cache = lru_cache
+            date_format.CACHE_SIZE = cache_size
+
+        self.assertEqual(results, [2, 2, 4, 6, 2])
+        # Full at 3: emptied, so 1 is computed again.
+        self.assertEqual(calls, [1, 2, 3, 1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+
+from aweber_tools.utils.export import \
+    ExportException, FIELDS_EXPORT, STDOUT_FILENAME
+from aweber_tools.utils.export_csv import COLS_SUBSCRIBER
+from aweber_tools.utils.export_formats import \
+    EXPORT_FORMATS, FORMAT_CSV, FORMAT_CSV_GZIP, FORMAT_JSON_LINES, \
+    FORMAT_SQLITE, create_exporter
+
+import csv
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+SUBSCRIBERS = 3
+
+class FakeSubscriber(object):
+
+    # Holds every FIELDS_EXPORT value, as Subscriber does.
+
+    def __init__(self, i):
+
+        for field in FIELDS_EXPORT:
+            setattr(self, field, None)
+
+        self.id = i
+        self.email = 'user{0}@example.com'.format(i)
+        self.name = 'User {0}'.format(i)
+        self.status = 'subscribed'
+        self.subscribed_at = '2026-01-0{0}T10:00:00-05:00'.format(i + 1)
+        self.custom_fields = {'plan': 'gold'}
+        self.tags = ['a', 'b']
+
+def subscribers(count=SUBSCRIBERS):
+    return (FakeSubscriber(i) for i in range(count))
+
+class ExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def export(self, export_format, filename, count=SUBSCRIBERS):
+
+        exporter = create_exporter(export_format)
+        rows, rate = exporter.export(subscribers(count), self.path, filename)
+        self.assertEqual(rows, count)
+
+        return os.path.join(self.path, filename)
+
+    def read_csv(self, lines):
+
+        rows = list(csv.reader(lines))
+        self.assertEqual(rows[0], COLS_SUBSCRIBER)
+
+        return rows[1:]
+
+    def test_csv(self):
+
+        filename = self.export(FORMAT_CSV, 'export.csv')
+
+        with open(filename) as fp:
+            rows = self.read_csv(fp.read().splitlines())
+
+        self.assertEqual(len(rows), SUBSCRIBERS)
+        self.assertEqual(rows[1][:2], ['user1@example.com', 'User 1'])
+        self.assertEqual(rows[1][3], '2026-01-02T10:00:00-05:00')
+        self.assertEqual(rows[1][6], 'subscribed')
+        # None is written as an empty value.
+        self.assertEqual(rows[1][2], '')
+
+    def test_csv_gzip_has_the_csv_layout(self):
+
+        csv_filename = self.export(FORMAT_CSV, 'export.csv')
+        gzip_filename = self.export(FORMAT_CSV_GZIP, 'export.csv.gz')
+
+        with open(csv_filename, 'rb') as fp:
+            expected = fp.read()
+
+        gzip_file = gzip.open(gzip_filename, 'rb')
+        try:
+            self.assertEqual(gzip_file.read(), expected)
+        finally:
+            gzip_file.close()
+
+    def test_json_lines(self):
+
+        filename = self.export(FORMAT_JSON_LINES, 'export.jsonl')
+
+        with open(filename) as fp:
+            lines = fp.read().splitlines()
+
+        self.assertEqual(len(lines), SUBSCRIBERS)
+
+        record = json.loads(lines[2])
+        self.assertEqual(sorted(record), sorted(FIELDS_EXPORT))
+        self.assertEqual(record['id'], 2)
+        self.assertEqual(record['email'], 'user2@example.com')
+        self.assertEqual(record['custom_fields'], {'plan': 'gold'})
+        self.assertEqual(record['tags'], ['a', 'b'])
+        self.assertEqual(record['unsubscribed_at'], None)
+
+    def test_sqlite(self):
+
+        filename = self.export(FORMAT_SQLITE, 'export.sqlite')
+
+        db = sqlite3.connect(filename)
+        try:
+            rows = db.execute(
+                'SELECT id, email, custom_fields, tags FROM subscribers '
+                'ORDER BY id').fetchall()
+            indexes = db.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' "
+                "AND tbl_name = 'subscribers'").fetchone()[0]
+        finally:
+            db.close()
+
+        self.assertEqual([row[0] for row in rows], list(range(SUBSCRIBERS)))
+        self.assertEqual(rows[0][1], 'user0@example.com')
+        self.assertEqual(json.loads(rows[0][2]), {'plan': 'gold'})
+        self.assertEqual(json.loads(rows[0][3]), ['a', 'b'])
+        self.assertTrue(indexes > 0)
+
+    def test_sqlite_replaces_the_table(self):
+
+        self.export(FORMAT_SQLITE, 'export.sqlite', 5)
+        filename = self.export(FORMAT_SQLITE, 'export.sqlite', 2)
+
+        db = sqlite3.connect(filename)
+        try:
+            count = db.execute('SELECT COUNT(*) FROM subscribers').fetchone()
+        finally:
+            db.close()
+
+        self.assertEqual(count[0], 2)
+
+    def test_generated_file_names(self):
+
+        # Named after the current time, with the format's extension.
+        for export_format in EXPORT_FORMATS:
+            export_path = os.path.join(self.path, export_format)
+            os.mkdir(export_path)
+            create_exporter(export_format).export(subscribers(), export_path)
+
+            names = os.listdir(export_path)
+            self.assertEqual(len(names), 1)
+            self.assertTrue(names[0].endswith('.' + export_format))
+
+    def test_progress(self):
+
+        reports = []
+        exporter = EXPORT_FORMATS[FORMAT_JSON_LINES](
+            lambda rows, rate: reports.append(rows), progress_rows=1000)
+        exporter.export(subscribers(2500), self.path, 'export.jsonl')
+
+        self.assertEqual(reports, [1000, 2000])
+
+    def test_unknown_format(self):
+
+        self.assertRaises(ExportException, create_exporter, 'xml')
+
+    def test_sqlite_to_standard_output(self):
+
+        exporter = create_exporter(FORMAT_SQLITE)
+
+        self.assertRaises(ExportException, exporter.export,
+                          subscribers(), self.path, STDOUT_FILENAME)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+from aweber_tools.models.filters.combinators import FilterAnd
+from aweber_tools.models.filters.planner import QueryPlanner
+from aweber_tools.models.filters.subscribers import \
+    COST_API, FilterAddedBeforeDaysAgo, FilterNoOpensSinceDaysAgo, \
+    FilterStatus
+from aweber_tools.models.subscribers import FindSubscribed
+
+import unittest
+
+class FakeSubscribers(object):
+
+    # Estimates from a table of params to (records, requests).
+
+    def __init__(self, estimates, find_params):
+        self._estimates = estimates
+        self._find_params = find_params
+
+    def estimate(self):
+        params = {}
+        if (self._find_params is not None):
+            params = self._find_params.params()
+        return self._estimates[tuple(sorted(params.items()))]
+
+class QueryPlannerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.planner = QueryPlanner(1)
+
+    def test_exact_filter_is_pushed_down_only(self):
+
+        status = FilterStatus('unsubscribed')
+        plan = self.planner.plan([status])
+
+        self.assertEqual(plan.find_params.params(),
+                         {'status': 'unsubscribed'})
+        self.assertEqual(plan.pushed, [status])
+        self.assertEqual(plan.local.filters, [])
+
+    def test_superset_filter_also_runs_locally(self):
+
+        added = FilterAddedBeforeDaysAgo(30)
+        plan = self.planner.plan([added], FindSubscribed())
+
+        params = plan.find_params.params()
+        self.assertEqual(params['status'], 'subscribed')
+        self.assertEqual(params['subscribed_before'],
+                         added.find_params()[0]['subscribed_before'])
+        self.assertEqual(plan.pushed, [added])
+        self.assertEqual(plan.local.filters, [added])
+
+    def test_conflicting_filter_runs_locally(self):
+
+        status = FilterStatus('unsubscribed')
+        plan = self.planner.plan([status], FindSubscribed())
+
+        self.assertEqual(plan.find_params.params(), {'status': 'subscribed'})
+        self.assertEqual(plan.pushed, [])
+        self.assertEqual(plan.local.filters, [status])
+
+    def test_local_filters_are_flattened_cheapest_first(self):
+
+        opens = FilterNoOpensSinceDaysAgo(1, 30)
+        added = FilterAddedBeforeDaysAgo(30)
+        plan = self.planner.plan([FilterAnd([opens, added], 1)])
+
+        self.assertEqual(plan.pushed, [added])
+        self.assertEqual(plan.local.filters, [added, opens])
+        self.assertEqual(plan.local.cost(), COST_API + 1)
+
+    def test_base_params_are_not_modified(self):
+
+        find_params = FindSubscribed()
+        plan = self.planner.plan([FilterAddedBeforeDaysAgo(30)], find_params)
+
+        self.assertTrue(plan.base_params is find_params)
+        self.assertEqual(find_params.params(), {'status': 'subscribed'})
+
+    def test_savings(self):
+
+        plan = self.planner.plan([FilterStatus('subscribed')])
+        estimates = {
+            (('status', 'subscribed'),): (120, 3),
+            (): (1000, 11)
+        }
+
+        savings = plan.savings(
+            lambda find_params: FakeSubscribers(estimates, find_params))
+
+        self.assertEqual(savings, {
+            'records': 120,
+            'requests': 3,
+            'records_saved': 880,
+            'requests_saved': 8
+        })
+
+if __name__ == '__main__':
+    unittest.main()
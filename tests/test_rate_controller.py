@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+
+from aweber_tools.utils.rate_controller import RateController
+from aweber_tools.utils.rate_limiter import RateLimiter
+
+import unittest
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class RateControllerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def create(self, rate, **kwargs):
+        limiter = RateLimiter(rate, 10, clock=self.clock)
+        return RateController(limiter, clock=self.clock,
+                              jitter=lambda: 0.5, **kwargs)
+
+    def test_throttle_halves_the_rate(self):
+
+        controller = self.create(200.0)
+        controller.on_throttle(0)
+
+        self.assertAlmostEqual(controller.rate, 100.0)
+        self.assertEqual(controller.throttle_count, 1)
+
+    def test_throttles_within_cooldown_count_once(self):
+
+        controller = self.create(200.0)
+        controller.on_throttle(0)
+        self.clock.now += 0.5
+        controller.on_throttle(0)
+
+        self.assertAlmostEqual(controller.rate, 100.0)
+        self.clock.now += 0.5
+        controller.on_throttle(0)
+        self.assertAlmostEqual(controller.rate, 50.0)
+
+    def test_rate_never_drops_below_min_rate(self):
+
+        controller = self.create(100.0, min_rate=30.0)
+        for i in range(5):
+            controller.on_throttle(0)
+            self.clock.now += 1
+
+        self.assertAlmostEqual(controller.rate, 30.0)
+
+    def test_recovery_time_does_not_depend_on_rate(self):
+
+        for rate in (1.0, 200.0):
+            controller = self.create(rate, increase=0.05)
+            controller.on_throttle(0)
+            self.clock.now += 5
+            controller.on_success()
+            self.assertAlmostEqual(controller.rate, rate * 0.75)
+            self.clock.now += 5
+            controller.on_success()
+            self.assertAlmostEqual(controller.rate, rate)
+
+    def test_increase_is_capped_at_max_rate(self):
+
+        controller = self.create(10.0)
+        controller.on_throttle(0)
+        self.clock.now += 1000
+        controller.on_success()
+
+        self.assertAlmostEqual(controller.rate, 10.0)
+
+    def test_backoff(self):
+
+        controller = self.create(10.0, max_retries=3, backoff_base=1.0,
+                                 backoff_max=3.0)
+
+        # Half the exponential delay plus half of the other half.
+        self.assertAlmostEqual(controller.on_throttle(0), 0.75)
+        self.assertAlmostEqual(controller.on_throttle(1), 1.5)
+        self.assertAlmostEqual(controller.on_throttle(2), 2.25)
+        self.assertIsNone(controller.on_throttle(3))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+from aweber_tools.utils.rate_limiter import \
+    RateLimiter, RateLimiterException
+
+import threading
+import unittest
+
+class FakeClock(object):
+
+    # Monotonic clock advanced by the fake sleep only.
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class RateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def create(self, rate=2.0, burst=3):
+        return RateLimiter(rate, burst, clock=self.clock,
+                           sleep=self.clock.sleep)
+
+    def test_burst_goes_through_without_waiting(self):
+
+        limiter = self.create(burst=3)
+
+        self.assertEqual(
+            [limiter.acquire() for i in range(3)], [0.0, 0.0, 0.0])
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_waits_for_refill_when_empty(self):
+
+        limiter = self.create(rate=2.0, burst=1)
+        limiter.acquire()
+
+        self.assertAlmostEqual(limiter.acquire(), 0.5)
+        self.assertAlmostEqual(self.clock.now, 0.5)
+
+    def test_sustained_rate(self):
+
+        limiter = self.create(rate=4.0, burst=2)
+
+        for i in range(42):
+            limiter.acquire()
+
+        # 2 requests from the burst, the other 40 at 4 per second.
+        self.assertAlmostEqual(self.clock.now, 10.0)
+
+    def test_refill_is_capped_at_burst(self):
+
+        limiter = self.create(rate=2.0, burst=3)
+        limiter.acquire(3)
+        self.clock.now += 100
+
+        self.assertAlmostEqual(limiter.tokens, 3.0)
+
+    def test_try_acquire(self):
+
+        limiter = self.create(rate=1.0, burst=1)
+
+        self.assertTrue(limiter.try_acquire())
+        self.assertFalse(limiter.try_acquire())
+        self.clock.now += 1
+        self.assertTrue(limiter.try_acquire())
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_rate_change_keeps_refilled_tokens(self):
+
+        limiter = self.create(rate=1.0, burst=10)
+        limiter.acquire(10)
+        self.clock.now += 2
+        limiter.rate = 100.0
+
+        # The 2 seconds before the change refill at the old rate.
+        self.assertAlmostEqual(limiter.tokens, 2.0)
+
+    def test_invalid_values(self):
+
+        self.assertRaises(RateLimiterException, self.create, rate=0)
+        self.assertRaises(RateLimiterException, self.create, rate=None)
+        self.assertRaises(RateLimiterException, self.create, burst=0)
+
+        limiter = self.create()
+        with self.assertRaises(RateLimiterException):
+            limiter.rate = -1
+
+    def test_concurrent_callers_never_exceed_rate(self):
+
+        # Real clock: 3 + 8 tokens at 40 per second take at least 0.2 s.
+        limiter = RateLimiter(40.0, 3)
+        started = limiter._clock()
+
+        threads = [threading.Thread(target=limiter.acquire)
+                   for i in range(11)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertGreaterEqual(limiter._clock() - started, 0.19)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+from aweber_tools.client import Client
+from aweber_tools.models.filters.subscribers import FilterNoOpensSinceDaysAgo
+from aweber_tools.models.store import \
+    STATE_FULL_SYNC, SubscriberStore, SubscribersStored
+from aweber_tools.models.subscribers import SubscriberNotFoundException
+from aweber_tools.utils.config import Config
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'benchmarks'))
+
+from fake_aweber import FakeAccount, FakeAWeberServer
+
+SUBSCRIBERS = 12
+
+class SubscriberStoreTest(unittest.TestCase):
+
+    # Syncs a store from the fake API and reads the subscribers back, as
+    # DeleteInactive does with a store file set.
+
+    def setUp(self):
+
+        self.path = tempfile.mkdtemp()
+        self.account = FakeAccount(SUBSCRIBERS, seed=1)
+        self.server = FakeAWeberServer(self.account)
+        self.server.start()
+
+        config = Config('token', 'secret', 'key', 'consumer', self.path)
+        config.api_base = self.server.base_url
+        config.rate = 1000.0
+        config.burst = 100
+
+        self.client = Client(config)
+        self.client.connect()
+        self.store = SubscriberStore(os.path.join(self.path, 'store.db'))
+
+    def tearDown(self):
+
+        self.store.close()
+        # Idle kept-alive connections would hold server threads.
+        self.client.http_pool.close()
+        self.server.stop()
+        shutil.rmtree(self.path)
+
+    def test_round_trip(self):
+
+        self.assertEqual(self.store.sync(self.client), SUBSCRIBERS)
+
+        subscribers = list(SubscribersStored(self.client, self.store).iter())
+        self.assertEqual(len(subscribers), SUBSCRIBERS)
+
+        subscriber = subscribers[0]
+        expected = self.account.subscriber(
+            int(subscriber.id), self.server.base_url)
+        self.assertEqual(subscriber.email, expected['email'])
+        self.assertEqual(subscriber.self_link, expected['self_link'])
+        self.assertEqual(subscriber.custom_fields, {})
+        self.assertTrue(type(subscriber.custom_fields) is dict)
+        self.assertEqual(subscriber.tags, [])
+
+    def test_get_activity(self):
+
+        self.store.sync(self.client)
+
+        for subscriber in SubscribersStored(self.client, self.store).iter():
+            expected = self.account.activity(
+                int(subscriber.id), self.server.base_url)
+            activity = subscriber.get_activity()
+            self.assertEqual([event.self_link for event in activity],
+                             [event['self_link'] for event in expected])
+
+    def test_stored_entry_get_activity(self):
+
+        # The entry bound to a stored subscriber is typed: the API library
+        # checks its type before getting its activity.
+
+        self.store.sync(self.client)
+
+        data = next(self.store.iter())
+        entry = self.client.make_subscriber_entry(data)
+        expected = self.account.activity(data['id'], self.server.base_url)
+
+        self.assertEqual(entry.type, 'subscriber')
+        self.assertEqual(entry.get_activity().total_size, len(expected))
+
+    def test_remove(self):
+
+        self.store.sync(self.client)
+        subscriber_id = next(self.store.iter())['id']
+
+        self.store.remove(subscriber_id)
+
+        self.assertEqual(self.store.count(), SUBSCRIBERS - 1)
+        self.assertTrue(all(data['id'] != subscriber_id
+                            for data in self.store.iter()))
+
+    def test_deleted_upstream(self):
+
+        # A subscriber deleted on the AWeber website stays in the store
+        # after a sync of changes. Its activity lookup skips and removes
+        # it instead of failing the filter.
+
+        self.store.sync(self.client)
+        subscriber_id = next(self.store.iter())['id']
+
+        self.account.delete(subscriber_id)
+        self.store.sync(self.client)
+        self.assertEqual(self.store.count(), SUBSCRIBERS)
+
+        subscribers = SubscribersStored(self.client, self.store).iter()
+        selected = FilterNoOpensSinceDaysAgo(days_ago=0).filter(subscribers)
+
+        self.assertTrue(all(subscriber.id != subscriber_id
+                            for subscriber in selected))
+        self.assertEqual(self.store.count(), SUBSCRIBERS - 1)
+        self.assertEqual(self.store.count({'id': subscriber_id}), 0)
+
+    def test_deleted_upstream_get_activity(self):
+
+        self.store.sync(self.client)
+        subscriber = next(SubscribersStored(self.client, self.store).iter())
+
+        self.account.delete(int(subscriber.id))
+
+        self.assertRaises(SubscriberNotFoundException,
+                          subscriber.get_activity)
+        self.assertEqual(self.store.count(), SUBSCRIBERS - 1)
+
+    def test_full_sync(self):
+
+        self.store.sync(self.client)
+        self.account.delete(next(self.store.iter())['id'])
+
+        self.store.sync(self.client, full=True)
+
+        self.assertEqual(self.store.count(), SUBSCRIBERS - 1)
+
+    def test_full_sync_days(self):
+
+        self.store.sync(self.client)
+        self.account.delete(next(self.store.iter())['id'])
+
+        # The last full sync is today's.
+        self.store.sync(self.client, full_sync_days=1)
+        self.assertEqual(self.store.count(), SUBSCRIBERS)
+
+        self.store._set_state(STATE_FULL_SYNC, '2000-01-01')
+        self.store.sync(self.client, full_sync_days=1)
+        self.assertEqual(self.store.count(), SUBSCRIBERS - 1)
+
+if __name__ == '__main__':
+    unittest.main()